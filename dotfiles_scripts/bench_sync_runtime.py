@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""Benchmark ``sync-private-runtime`` against synthetic runtime trees.
+
+Builds a throwaway ``$HOME`` in a temp dir containing a synthetic
+``~/.claude/projects`` tree (many small JSONL sessions, a few large ones,
+configurable nesting), the repo-side history files, and a local directory
+standing in for the Google Drive root
+(``~/Library/CloudStorage/GoogleDrive-bench/My Drive``). It then times
+``push`` / ``pull`` through these phases:
+
+* ``push_cold``    — empty bucket, everything transfers
+* ``push_warm``    — nothing changed since the last push
+* ``pull_warm``    — nothing changed on either side
+* ``push_changed_<N>pct`` — N% of local files appended to
+* ``pull_changed_<N>pct`` — N% of bucket files appended to
+* ``pull_cold``    — local runtime state and sync caches wiped
+
+Results are printed as JSON; ``--output`` appends one JSON line per run to
+a file so runs can be compared over time.
+
+The timed code runs in a child interpreter with ``HOME`` pointed at the
+temp dir: ``sync_private_runtime`` and ``setup_utils`` resolve their paths
+from ``Path.home()`` at import time, so importing them here would aim the
+benchmark at the real home directory.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import cast
+
+import click
+
+DEVICE_ID = "bench"
+_GDRIVE_ROOT = Path("Library") / "CloudStorage" / "GoogleDrive-bench" / "My Drive"
+
+# Repo-side runtime files to seed (relative to ~/.dotfiles-private), with sizes.
+_REPO_FILES: tuple[tuple[str, int], ...] = (
+    (f"zsh_history/.zsh_history.{DEVICE_ID}", 2 * 1024 * 1024),
+    ("home/.pry_history", 16 * 1024),
+    ("home/.node_repl_history", 16 * 1024),
+    ("home/.psql_history", 256 * 1024),
+    ("home/.ssh/known_hosts", 8 * 1024),
+)
+
+
+# ---------------------------------------------------------------------------
+# Synthetic tree
+# ---------------------------------------------------------------------------
+
+
+def _jsonl_blob(rng: random.Random, size: int) -> bytes:
+    """``size`` bytes of JSONL-looking lines (compressible, newline-terminated)."""
+    lines: list[str] = []
+    total = 0
+    while total < size:
+        line = json.dumps(
+            {"type": "message", "id": rng.getrandbits(64), "text": "x" * rng.randint(40, 400)}
+        )
+        lines.append(line)
+        total += len(line) + 1
+    return ("\n".join(lines) + "\n").encode()[:size]
+
+
+def _build_tree(
+    home: Path,
+    *,
+    projects: int,
+    small_files: int,
+    small_kb: int,
+    large_files: int,
+    large_mb: int,
+    depth: int,
+    seed: int,
+) -> list[Path]:
+    """Populate ``home`` with the synthetic runtime state. Returns all local runtime files."""
+    rng = random.Random(seed)
+    (home / ".device_id").write_text(f"{DEVICE_ID}\n")
+    (home / _GDRIVE_ROOT).mkdir(parents=True)
+    config = home / ".config" / "dotfiles" / ".dotfiles-config"
+    config.parent.mkdir(parents=True)
+    config.write_text("export SSH_IDENTITY_BACKEND=1password\n")
+
+    files: list[Path] = []
+    repo = home / ".dotfiles-private"
+    for rel, size in _REPO_FILES:
+        path = repo / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(_jsonl_blob(rng, size))
+        files.append(path)
+
+    claude = home / ".claude"
+    claude.mkdir()
+    history = claude / "history.jsonl"
+    history.write_bytes(_jsonl_blob(rng, 512 * 1024))
+    files.append(history)
+
+    project_dirs = [
+        claude / "projects" / f"-Users-bench-projects-repo{i}" for i in range(max(projects, 1))
+    ]
+    for i in range(small_files):
+        base = project_dirs[i % len(project_dirs)]
+        nest = rng.randint(0, max(depth - 1, 0))
+        subdir = base.joinpath(*(f"d{rng.randint(0, 3)}" for _ in range(nest)))
+        subdir.mkdir(parents=True, exist_ok=True)
+        path = subdir / f"session-{i:06d}.jsonl"
+        path.write_bytes(_jsonl_blob(rng, rng.randint(small_kb // 2, small_kb * 2) * 1024))
+        files.append(path)
+    for i in range(large_files):
+        base = project_dirs[i % len(project_dirs)]
+        base.mkdir(parents=True, exist_ok=True)
+        path = base / f"large-{i:03d}.jsonl"
+        path.write_bytes(_jsonl_blob(rng, large_mb * 1024 * 1024))
+        files.append(path)
+    return files
+
+
+def _tree_totals(files: list[Path]) -> dict[str, int]:
+    return {"files": len(files), "bytes": sum(p.stat().st_size for p in files)}
+
+
+# ---------------------------------------------------------------------------
+# Worker (runs with HOME = the synthetic home)
+# ---------------------------------------------------------------------------
+
+
+def _append_to(paths: list[Path], rng: random.Random, pct: int) -> int:
+    """Append a JSONL line to ``pct``% of ``paths``; bump mtimes past the last sync."""
+    chosen = rng.sample(paths, k=max(1, len(paths) * pct // 100)) if paths else []
+    later = time.time() + 2
+    for path in chosen:
+        with path.open("ab") as f:
+            f.write(_jsonl_blob(rng, 256))
+        os.utime(path, (later, later))
+    return len(chosen)
+
+
+def _runtime_files(root: Path) -> list[Path]:
+    return [p for p in root.rglob("*") if p.is_file() and not p.is_symlink()]
+
+
+def _worker(spec: dict[str, object]) -> dict[str, object]:
+    from dotfiles_scripts import sync_private_runtime as spr
+
+    home = Path.home()
+    engine = cast(str, spec["engine"])
+    options = spr.SyncOptions(concurrency=cast(int, spec["jobs"]), engine=engine)
+    rng = random.Random(cast(int, spec["seed"]) + 1)
+    phases: list[dict[str, object]] = []
+
+    def timed(name: str, op: str, **extra: object) -> None:
+        fn = spr.push if op == "push" else spr.pull
+        start = time.perf_counter()
+        ok, summary, results = fn(options)
+        elapsed = time.perf_counter() - start
+        phases.append(
+            {
+                "phase": name,
+                "seconds": round(elapsed, 4),
+                "ok": ok,
+                "summary": summary,
+                "paths": {r.label: round(r.elapsed, 4) for r in results},
+                **extra,
+            }
+        )
+
+    local_files = [Path(p) for p in cast("list[str]", spec["files"])]
+    runtime = home / _GDRIVE_ROOT / spr.RUNTIME_DIR_NAME / DEVICE_ID
+
+    timed("push_cold", "push")
+    timed("push_warm", "push")
+    timed("pull_warm", "pull")
+    for pct in cast("list[int]", spec["changed_pcts"]):
+        n = _append_to(local_files, rng, pct)
+        timed(f"push_changed_{pct}pct", "push", files_changed=n)
+        n = _append_to(_runtime_files(runtime / "home"), rng, pct)
+        timed(f"pull_changed_{pct}pct", "pull", files_changed=n)
+
+    # Cold pull: drop everything local the sync owns, including its caches.
+    shutil.rmtree(home / ".claude" / "projects")
+    for path in local_files:
+        if path.exists():
+            path.unlink()
+    shutil.rmtree(spr.CACHE_DIR, ignore_errors=True)
+    timed("pull_cold", "pull")
+    return {"phases": phases}
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+@click.command()
+@click.option(
+    "--projects", default=20, show_default=True, help="Project dirs under ~/.claude/projects."
+)
+@click.option(
+    "--small-files", default=2000, show_default=True, help="Number of small session files."
+)
+@click.option("--small-kb", default=8, show_default=True, help="Typical small-file size (KiB).")
+@click.option("--large-files", default=3, show_default=True, help="Number of large session files.")
+@click.option("--large-mb", default=20, show_default=True, help="Size of each large file (MiB).")
+@click.option("--depth", default=3, show_default=True, help="Max nesting depth inside a project.")
+@click.option(
+    "--changed-pct",
+    "changed_pcts",
+    multiple=True,
+    type=click.IntRange(1, 100),
+    default=(1, 10),
+    show_default=True,
+    help="Percent of files changed between runs (repeatable).",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(("rsync", "native")),
+    default="rsync",
+    show_default=True,
+    help="Copy engine under test.",
+)
+@click.option("--jobs", default=4, show_default=True, help="Worker pool size.")
+@click.option("--seed", default=0, show_default=True, help="RNG seed for the synthetic tree.")
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Append the result as one JSON line to this file.",
+)
+@click.option("--keep", is_flag=True, help="Keep the temp home dir for inspection.")
+@click.option("--worker-spec", hidden=True, default=None)
+def cli(
+    projects: int,
+    small_files: int,
+    small_kb: int,
+    large_files: int,
+    large_mb: int,
+    depth: int,
+    changed_pcts: tuple[int, ...],
+    engine: str,
+    jobs: int,
+    seed: int,
+    output: Path | None,
+    keep: bool,
+    worker_spec: str | None,
+) -> None:
+    """Time runtime pull/push against a synthetic tree; emit JSON."""
+    if worker_spec is not None:
+        spec = cast("dict[str, object]", json.loads(Path(worker_spec).read_text()))
+        print(json.dumps(_worker(spec)))
+        return
+
+    has_rsync = shutil.which("rsync") is not None or Path("/opt/homebrew/bin/rsync").is_file()
+    if engine == "rsync" and not has_rsync:
+        raise click.ClickException("rsync not found; use --engine native")
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-sync-runtime-"))
+    try:
+        home = tmp / "home"
+        home.mkdir()
+        build_start = time.perf_counter()
+        files = _build_tree(
+            home,
+            projects=projects,
+            small_files=small_files,
+            small_kb=small_kb,
+            large_files=large_files,
+            large_mb=large_mb,
+            depth=depth,
+            seed=seed,
+        )
+        build_seconds = time.perf_counter() - build_start
+        totals = _tree_totals(files)
+        spec_path = tmp / "spec.json"
+        spec_path.write_text(
+            json.dumps(
+                {
+                    "engine": engine,
+                    "jobs": jobs,
+                    "seed": seed,
+                    "changed_pcts": list(changed_pcts),
+                    "files": [str(p) for p in files],
+                }
+            )
+        )
+        env = dict(os.environ, HOME=str(home))
+        package_root = str(Path(__file__).resolve().parent.parent)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, (package_root, env.get("PYTHONPATH"))))
+        worker = [sys.executable, "-m", "dotfiles_scripts.bench_sync_runtime"]
+        proc = subprocess.run(
+            [*worker, "--worker-spec", str(spec_path)],
+            env=env,
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise click.ClickException(f"benchmark worker failed:\n{proc.stderr.strip()}")
+        measured = cast("dict[str, object]", json.loads(proc.stdout.strip().splitlines()[-1]))
+    finally:
+        if keep:
+            click.echo(f"kept synthetic home: {tmp}", err=True)
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    result: dict[str, object] = {
+        "timestamp": datetime.now().astimezone().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "engine": engine,
+        "jobs": jobs,
+        "tree": {
+            "projects": projects,
+            "small_files": small_files,
+            "small_kb": small_kb,
+            "large_files": large_files,
+            "large_mb": large_mb,
+            "depth": depth,
+            "seed": seed,
+            **totals,
+            "build_seconds": round(build_seconds, 3),
+        },
+        **measured,
+    }
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with output.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(result, sort_keys=True) + "\n")
+    click.echo(json.dumps(result, indent=2))
+
+
+def main() -> None:
+    cli()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,25 @@
 """Verify and repair dotfile symlinks across both home/ trees.
 
 Walks ``~/.dotfiles/home/`` and ``~/.dotfiles-private/home/``, running the
-shared idempotent walker (``symlink_home_dir``) against each to make sure
-every file there is correctly symlinked into ``$HOME``.
-
-Additionally scans ``$HOME`` (up to a shallow depth) for *stale* symlinks
+shared idempotent walker (``symlink_home_dirs``) against both to make sure
+every file there is correctly symlinked into ``$HOME``. The two trees are
+verified concurrently, so a slow cloud mount behind the private tree
+doesn't hold up the public one. Directories whose
+source side, ``$HOME`` side and ``.dotfiles.yaml`` are unchanged since the
+last verified run are skipped via the symlink-state cache; ``--full``
+re-verifies everything.
+
+Additionally reports *stale* symlinks under ``$HOME`` (up to ``--depth``)
 pointing at older layouts that have no replacement in the current trees
-(e.g. ``~/Dropbox/dotfiles/home/...``). Stale symlinks are reported by
-default; pass ``--clean`` to remove broken ones.
+(e.g. ``~/Dropbox/dotfiles/home/...``).
+``--managed-only`` limits the report to directories the walker manages.
+Stale symlinks are reported by default; pass ``--clean`` to remove broken
+ones.
+
+``--json`` prints one JSON object on stdout for tracking walker cost over
+time: per tree, the action counts, plan/apply time and the slowest
+directories and link checks (``WalkResult``), plus the stale-scan stats
+and findings. The usual progress output moves to stderr.
 
 This is the maintenance counterpart to ``symlink-home-files``: re-runs the
 same walker against both trees and surfaces cruft left over from older
@@ -17,22 +29,29 @@ layouts.
 
 from __future__ import annotations
 
+import contextlib
+import json
 import sys
+from collections.abc import Callable
+from dataclasses import asdict
 from pathlib import Path
 
 import click
 
+from dotfiles_scripts.home_crawl import CrawlStats, crawl_home, invalidate
 from dotfiles_scripts.setup_utils import (
     DOTFILES,
     DROPBOX_DIR,
     PRIVATE_DOTFILES,
+    WalkResult,
     print_error,
     print_header,
     print_step,
     print_success,
     print_warning,
-    symlink_home_dir,
+    symlink_home_dirs,
 )
+from dotfiles_scripts.symlink_state import load_managed_dirs
 
 # Symlink targets starting with any of these prefixes are treated as stale.
 # Keep these as literal string prefixes (matched against the symlink's raw
@@ -42,73 +61,105 @@ _STALE_TARGET_PREFIXES: tuple[str, ...] = (
     f"{DROPBOX_DIR}/dotfiles/",
 )
 
-# Top-level directories under $HOME that we never descend into when scanning
-# for stale symlinks — either too large, too noisy, or known not to contain
-# managed dotfiles.
-_SCAN_SKIP_TOPLEVEL: tuple[str, ...] = (
-    "Library",
-    "Dropbox",
-    ".Trash",
-    ".cache",
-    ".npm",
-    ".pnpm-store",
-    ".cargo",
-    ".rustup",
-    "node_modules",
-    ".venv",
-)
-
 # Maximum depth (relative to $HOME) to walk when looking for stale symlinks.
 # 4 is enough to catch e.g. ``~/projects/<org>/<repo>/mise.toml``.
 _SCAN_MAX_DEPTH = 4
 
 
-def _walk_tree(label: str, home_dir: Path) -> bool:
-    print_header(f"Verifying symlinks from {label}")
-    if not home_dir.is_dir():
-        print_warning(f"{home_dir} is not a directory; skipping")
+def _walk_trees(trees: dict[Path, str], full: bool, walks: list[WalkResult]) -> bool:
+    """Verify every tree (``home_dir`` → label); planned concurrently, applied in order.
+
+    A ``WalkResult`` per tree walked is appended to ``walks``.
+    """
+    present: list[Path] = []
+    for home_dir, label in trees.items():
+        if home_dir.is_dir():
+            present.append(home_dir)
+        else:
+            print_header(f"Verifying symlinks from {label}")
+            print_warning(f"{home_dir} is not a directory; skipping")
+    if not present:
         return True
-    return symlink_home_dir(home_dir)
+    results = symlink_home_dirs(
+        present,
+        full=full,
+        before_apply=lambda d: print_header(f"Verifying symlinks from {trees[d]}"),
+        results=walks,
+    )
+    return all(results)
 
 
 def _is_stale_target(target_text: str) -> bool:
     return any(target_text.startswith(prefix) for prefix in _STALE_TARGET_PREFIXES)
 
 
-def _scan_stale_symlinks(home: Path) -> list[Path]:
-    """Return symlinks under $HOME (depth <= _SCAN_MAX_DEPTH) with a stale target."""
-    stale: list[Path] = []
-
-    def is_backup_dir(name: str) -> bool:
-        return name.startswith(".dotfiles.") and name.endswith(".bck")
-
-    def walk(directory: Path, depth: int) -> None:
-        if depth > _SCAN_MAX_DEPTH:
-            return
-        try:
-            entries = list(directory.iterdir())
-        except (PermissionError, OSError):
-            return
-        for entry in entries:
-            if entry.is_symlink():
-                try:
-                    target_text = str(entry.readlink())
-                except OSError:
-                    continue
-                if _is_stale_target(target_text):
-                    stale.append(entry)
-                continue
-            # Don't descend into symlinked directories (avoids loops via
-            # ``home/.symlink-dir`` wholesale symlinks).
-            if not entry.is_dir():
-                continue
-            if depth == 0:
-                if entry.name in _SCAN_SKIP_TOPLEVEL or is_backup_dir(entry.name):
-                    continue
-            walk(entry, depth + 1)
-
-    walk(home, 0)
-    return stale
+def _managed_index(home: Path, trees: list[Path]) -> set[Path]:
+    """$HOME-side directories (below $HOME itself) the symlink walker last verified.
+
+    Built from the symlink-state cache, so it costs no filesystem walk.
+    Empty when there is no cache yet.
+    """
+    index: set[Path] = set()
+    for src_dir in load_managed_dirs():
+        for root in trees:
+            if root in src_dir.parents:
+                index.add(home / src_dir.relative_to(root))
+                break
+    return index
+
+
+def _managed_filter(home: Path, managed: set[Path]) -> Callable[[Path], bool]:
+    """Keep links in $HOME itself, in a managed directory, or on the way to one."""
+    on_path = {parent for d in managed for parent in d.parents}
+
+    def keep(link: Path) -> bool:
+        directory = link.parent
+        if directory == home or directory in managed or directory in on_path:
+            return True
+        return any(parent in managed for parent in directory.parents)
+
+    return keep
+
+
+def _scan_stale_symlinks(
+    home: Path,
+    *,
+    max_depth: int = _SCAN_MAX_DEPTH,
+    managed: set[Path] | None = None,
+) -> tuple[list[Path], CrawlStats]:
+    """Return symlinks under $HOME (``max_depth`` dirs down) with a stale target.
+
+    Filters the shared ``home_crawl`` walk, so within one process, or
+    within ``SNAPSHOT_MAX_AGE_SECONDS`` of another crawl, $HOME isn't
+    walked again. With ``managed`` (see ``_managed_index``), only links in
+    directories inside a managed one or on the way to one are reported.
+    """
+    stats = CrawlStats()
+    keep = None if managed is None else _managed_filter(home, managed)
+    stale = [
+        link.path
+        for link in crawl_home(home, snapshot=True, stats=stats)
+        # Links up to max_depth directories below $HOME sit at depth max_depth + 1.
+        if link.depth <= max_depth + 1
+        and (keep is None or keep(link.path))
+        and _is_stale_target(link.target)
+    ]
+    if stats.cached:
+        # A snapshot may predate a relink; only trust what's still on disk.
+        stale = [p for p in stale if p.is_symlink() and _is_stale_target(str(p.readlink()))]
+    return stale, stats
+
+
+def _print_walk(walk: WalkResult) -> None:
+    counts = ", ".join(f"{n} {action}" for action, n in walk.counts.items() if n)
+    print_step(
+        f"{walk.tree}: {counts or 'nothing to do'}; planned {walk.dirs} dir(s) "
+        f"in {walk.plan_seconds:.2f}s, applied in {walk.apply_seconds:.2f}s"
+    )
+    slowest = walk.slowest_dirs()
+    if slowest:
+        seconds, path = slowest[0]
+        print(f"  slowest dir: {path} ({seconds * 1000:.1f}ms)")
 
 
 def _print_link(p: Path) -> None:
@@ -130,26 +181,92 @@ def _print_link(p: Path) -> None:
     is_flag=True,
     help="Skip the symlink walk; just scan for stale links.",
 )
-def main(clean: bool, scan_only: bool) -> None:
+@click.option(
+    "--full",
+    is_flag=True,
+    help="Re-verify every link, ignoring the cached state of unchanged directories.",
+)
+@click.option(
+    "--depth",
+    type=click.IntRange(0),
+    default=_SCAN_MAX_DEPTH,
+    show_default=True,
+    help="How deep below $HOME to report stale symlinks.",
+)
+@click.option(
+    "--managed-only",
+    is_flag=True,
+    help="Only report links in directories the symlink walker manages (from its cache).",
+)
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    help="Print walk counts, timings and scan results as JSON on stdout.",
+)
+def main(
+    clean: bool, scan_only: bool, full: bool, depth: int, managed_only: bool, as_json: bool
+) -> None:
     """Verify dotfile symlinks across public + private trees, then report stale ones."""
+    report: dict[str, object] = {}
+    if not as_json:
+        sys.exit(0 if _check(clean, scan_only, full, depth, managed_only, report) else 1)
+    with contextlib.redirect_stdout(sys.stderr):
+        ok = _check(clean, scan_only, full, depth, managed_only, report)
+    report["ok"] = ok
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    sys.exit(0 if ok else 1)
+
+
+def _check(
+    clean: bool,
+    scan_only: bool,
+    full: bool,
+    depth: int,
+    managed_only: bool,
+    report: dict[str, object],
+) -> bool:
+    """The whole check; fills ``report`` for ``--json``. Returns False on any failure."""
     home = Path.home()
     ok = True
+    trees = {
+        DOTFILES / "home": "~/.dotfiles/home",
+        PRIVATE_DOTFILES / "home": "~/.dotfiles-private/home",
+    }
 
     if not scan_only:
-        if not _walk_tree("~/.dotfiles/home", DOTFILES / "home"):
-            ok = False
-        if not _walk_tree("~/.dotfiles-private/home", PRIVATE_DOTFILES / "home"):
+        walks: list[WalkResult] = []
+        if not _walk_trees(trees, full, walks):
             ok = False
+        for walk in walks:
+            _print_walk(walk)
+        report["trees"] = [walk.as_json() for walk in walks]
 
     print_header("Scanning $HOME for stale symlinks")
-    stale = _scan_stale_symlinks(home)
+    managed = _managed_index(home, list(trees)) if managed_only else None
+    if managed is not None and not managed:
+        print_warning("No symlink-state cache yet; scanning without --managed-only")
+        managed = None
+    stale, stats = _scan_stale_symlinks(home, max_depth=depth, managed=managed)
+    if stats.cached:
+        print_step("Reused this run's (or a recent) $HOME crawl")
+    else:
+        print_step(
+            f"Scanned {stats.dirs} dir(s), {stats.entries} entries ({stats.links} symlinks) "
+            f"in {stats.seconds:.2f}s; pruned {stats.pruned} subtree(s)"
+        )
+    broken = [p for p in stale if not p.exists()]
+    live = [p for p in stale if p.exists()]
+    report["scan"] = {
+        **asdict(stats),
+        "broken": [str(p) for p in broken],
+        "live": [str(p) for p in live],
+    }
 
     if not stale:
         print_success("No stale symlinks found")
-        sys.exit(0 if ok else 1)
-
-    broken = [p for p in stale if not p.exists()]
-    live = [p for p in stale if p.exists()]
+        return ok
 
     if broken:
         print_warning(f"{len(broken)} broken symlink(s) pointing at old layouts:")
@@ -173,6 +290,7 @@ def main(clean: bool, scan_only: bool) -> None:
                 except OSError as exc:
                     print_error(f"failed to remove {p}: {exc}")
                     ok = False
+            invalidate()
         else:
             print_step("Re-run with --clean to remove broken symlinks")
 
@@ -181,8 +299,7 @@ def main(clean: bool, scan_only: bool) -> None:
             "Live-but-stale symlinks left alone — repoint or remove them manually"
         )
 
-    sys.exit(0 if ok else 1)
-
+    return ok
 
 if __name__ == "__main__":
     main()
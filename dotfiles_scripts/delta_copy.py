@@ -0,0 +1,401 @@
+"""In-process ``rsync -a --update`` equivalent for small local trees.
+
+Used by ``sync_private_runtime`` when ``SYNC_RUNTIME_ENGINE=native``: no
+subprocess per path and no dependency on which rsync binary is installed
+(see the openrsync/FileProvider note in ``sync_private_runtime``).
+
+Semantics match what the runtime sync relies on from rsync:
+
+* ``--update``: a destination file newer than the source is left alone; an
+  equal mtime with an equal size is treated as unchanged (rsync's quick
+  check), an equal mtime with a different size is re-copied.
+* ``-a``: permissions and mtimes are carried over, symlinks are copied as
+  symlinks, directories are created as needed. Nothing is ever deleted from
+  the destination.
+* Every file lands atomically: contents go to a temp file in the destination
+  directory, which is then renamed over the target.
+
+``append_tail`` / ``prefix_digest`` support append-only files (shell and
+REPL histories): when the destination is known to be a prefix of the
+source, only the new tail bytes are copied.
+
+``copy_tree_parallel`` / ``verify_tree`` serve ``detach_cloud_cache``'s
+cross-device moves: the same per-file copy on a thread pool, resumable
+because files already copied pass the quick check, then a size/mtime
+comparison before the caller deletes the source.
+
+Contents are copied with ``copy_file_range`` / ``sendfile`` where the
+kernel supports them, falling back to plain ``read``/``write`` — never
+``mmap``, which is what trips FileProvider stubs.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import errno
+import hashlib
+import os
+import stat
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Collection
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+_CHUNK = 1024 * 1024
+
+# Bytes sampled from each end of a prefix by ``prefix_digest``. Reading the
+# whole prefix would cost as much I/O as the full copy tail sync avoids.
+PREFIX_WINDOW = 4096
+
+# errnos meaning "this fast path isn't available here", as opposed to a real I/O error.
+_UNSUPPORTED_ERRNOS = frozenset(
+    e
+    for e in (
+        errno.EXDEV,
+        errno.ENOSYS,
+        errno.EINVAL,
+        errno.EOPNOTSUPP,
+        getattr(errno, "ENOTSUP", errno.EOPNOTSUPP),
+        errno.EBADF,
+    )
+)
+
+
+@dataclass
+class CopyStats:
+    """What one ``sync_tree`` call looked at and moved."""
+
+    files_seen: int = 0
+    files_copied: int = 0
+    bytes_copied: int = 0
+
+
+def _never_excluded(_name: str) -> bool:
+    return False
+
+
+def _copy_contents(src_fd: int, dst_fd: int, size: int) -> None:
+    """Copy ``size`` bytes between two fds using the fastest available syscall."""
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while copied < size:
+                n = os.copy_file_range(src_fd, dst_fd, min(_CHUNK * 8, size - copied))
+                if n == 0:
+                    break
+                copied += n
+            if copied >= size:
+                return
+        except OSError as e:
+            if copied or e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+    if copied == 0 and sys.platform.startswith("linux"):
+        # Linux sendfile accepts a regular-file destination; macOS only
+        # supports sockets, so it's skipped there.
+        try:
+            while copied < size:
+                n = os.sendfile(dst_fd, src_fd, copied, min(_CHUNK * 8, size - copied))
+                if n == 0:
+                    break
+                copied += n
+            if copied >= size:
+                return
+        except OSError as e:
+            if copied or e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+    os.lseek(src_fd, copied, os.SEEK_SET)
+    os.lseek(dst_fd, copied, os.SEEK_SET)
+    while True:
+        buf = os.read(src_fd, _CHUNK)
+        if not buf:
+            return
+        view = memoryview(buf)
+        while view:
+            written = os.write(dst_fd, view)
+            view = view[written:]
+
+
+def _needs_update(src: os.stat_result, dst: os.stat_result | None) -> bool:
+    """rsync ``--update`` + quick-check decision for one regular file."""
+    if dst is None:
+        return True
+    # Whole seconds: cloud mounts don't round-trip sub-second mtimes.
+    src_mtime = src.st_mtime_ns // 1_000_000_000
+    dst_mtime = dst.st_mtime_ns // 1_000_000_000
+    if dst_mtime > src_mtime:
+        return False
+    return not (dst_mtime == src_mtime and dst.st_size == src.st_size)
+
+
+def copy_file_atomic(source: Path, dest: Path, src_stat: os.stat_result) -> int:
+    """Copy ``source`` over ``dest`` via temp file + rename. Returns bytes copied."""
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{dest.name}.", dir=dest.parent)
+    tmp = Path(tmp_name)
+    try:
+        with source.open("rb") as src_f:
+            _copy_contents(src_f.fileno(), fd, src_stat.st_size)
+        os.fchmod(fd, stat.S_IMODE(src_stat.st_mode))
+        os.close(fd)
+        fd = -1
+        os.utime(tmp, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        tmp.replace(dest)
+    except BaseException:
+        if fd >= 0:
+            os.close(fd)
+        with contextlib.suppress(OSError):
+            tmp.unlink()
+        raise
+    return src_stat.st_size
+
+
+def _copy_symlink(source: Path, dest: Path, src_stat: os.stat_result) -> bool:
+    link = source.readlink()
+    try:
+        dst_stat = dest.lstat()
+    except FileNotFoundError:
+        dst_stat = None
+    if dst_stat is not None:
+        if stat.S_ISLNK(dst_stat.st_mode) and dest.readlink() == link:
+            return False
+        if dst_stat.st_mtime_ns // 1_000_000_000 > src_stat.st_mtime_ns // 1_000_000_000:
+            return False
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.symlink")
+    with contextlib.suppress(FileNotFoundError):
+        tmp.unlink()
+    tmp.symlink_to(link)
+    with contextlib.suppress(NotImplementedError, OSError):
+        os.utime(tmp, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns), follow_symlinks=False)
+    tmp.replace(dest)
+    return True
+
+
+def _sync_entry(
+    source: Path,
+    dest: Path,
+    src_stat: os.stat_result,
+    stats: CopyStats,
+) -> None:
+    mode = src_stat.st_mode
+    if stat.S_ISLNK(mode):
+        stats.files_seen += 1
+        if _copy_symlink(source, dest, src_stat):
+            stats.files_copied += 1
+        return
+    if not stat.S_ISREG(mode):
+        return  # sockets, fifos, devices: rsync -a without --specials skips these too
+    stats.files_seen += 1
+    try:
+        dst_stat: os.stat_result | None = dest.lstat()
+    except FileNotFoundError:
+        dst_stat = None
+    if dst_stat is not None and stat.S_ISDIR(dst_stat.st_mode):
+        raise IsADirectoryError(errno.EISDIR, "cannot overwrite directory with file", str(dest))
+    if not _needs_update(src_stat, dst_stat):
+        return
+    stats.bytes_copied += copy_file_atomic(source, dest, src_stat)
+    stats.files_copied += 1
+
+
+def sync_tree(
+    source: Path,
+    dest: Path,
+    *,
+    exclude: Callable[[str], bool] | None = None,
+    skip: Collection[str] = (),
+    timeout: float | None = None,
+) -> CopyStats:
+    """Make ``dest`` an ``--update`` mirror of ``source`` (file or directory).
+
+    ``exclude`` is matched against entry names at every depth, like rsync's
+    unanchored ``--exclude``; ``skip`` holds POSIX relpaths under ``source``
+    to leave out, like anchored ones. Raises ``TimeoutError`` once ``timeout``
+    seconds have elapsed (checked between files) and ``OSError`` on the
+    first I/O failure; files already copied stay copied.
+    """
+    excluded = exclude or _never_excluded
+    deadline = None if timeout is None else time.monotonic() + timeout
+    stats = CopyStats()
+    # A top-level symlink to a directory is followed (rsync's ``src/`` form);
+    # anything else at the top is synced as the entry it is.
+    root_stat = source.stat() if source.is_dir() else source.lstat()
+    if not stat.S_ISDIR(root_stat.st_mode):
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        _sync_entry(source, dest, root_stat, stats)
+        return stats
+
+    # Directory mtimes are applied bottom-up after their contents are written,
+    # since creating files inside a directory bumps its mtime.
+    skipped = frozenset(skip)
+    dir_times: list[tuple[Path, os.stat_result]] = []
+    stack: list[tuple[Path, Path, os.stat_result, str]] = [(source, dest, root_stat, "")]
+    while stack:
+        src_dir, dst_dir, dir_stat, rel = stack.pop()
+        dst_dir.mkdir(parents=True, exist_ok=True)
+        with contextlib.suppress(OSError):
+            dst_dir.chmod(stat.S_IMODE(dir_stat.st_mode))
+        dir_times.append((dst_dir, dir_stat))
+        with os.scandir(src_dir) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+            if excluded(entry.name) or entry_rel in skipped:
+                continue
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"timeout after {timeout}s")
+            entry_stat = entry.stat(follow_symlinks=False)
+            target = dst_dir / entry.name
+            if stat.S_ISDIR(entry_stat.st_mode):
+                stack.append((Path(entry.path), target, entry_stat, entry_rel))
+            else:
+                _sync_entry(Path(entry.path), target, entry_stat, stats)
+    for dst_dir, dir_stat in reversed(dir_times):
+        with contextlib.suppress(OSError):
+            os.utime(dst_dir, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+    return stats
+
+
+def copy_tree_parallel(
+    source: Path,
+    dest: Path,
+    *,
+    workers: int,
+    progress: Callable[[CopyStats, int, int], None] | None = None,
+) -> CopyStats:
+    """Copy directory ``source`` to ``dest``, ``workers`` files at a time.
+
+    Same per-file semantics as ``sync_tree`` (so a re-run after an
+    interruption skips every file that already landed), without excludes
+    or a timeout. ``progress`` is called after each file with the running
+    stats and the total file and byte counts. Raises ``OSError`` on the
+    first failure, once in-flight copies finish.
+    """
+    root_stat = source.stat()
+    dirs: list[tuple[Path, os.stat_result]] = [(dest, root_stat)]
+    files: list[tuple[Path, Path, os.stat_result]] = []
+    stack = [(source, dest)]
+    while stack:
+        src_dir, dst_dir = stack.pop()
+        dst_dir.mkdir(parents=True, exist_ok=True)
+        with os.scandir(src_dir) as it:
+            for entry in it:
+                entry_stat = entry.stat(follow_symlinks=False)
+                target = dst_dir / entry.name
+                if stat.S_ISDIR(entry_stat.st_mode):
+                    dirs.append((target, entry_stat))
+                    stack.append((Path(entry.path), target))
+                else:
+                    files.append((Path(entry.path), target, entry_stat))
+    total_bytes = sum(st.st_size for _, _, st in files if stat.S_ISREG(st.st_mode))
+    stats = CopyStats()
+    lock = threading.Lock()
+
+    def copy_one(src: Path, dst: Path, src_stat: os.stat_result) -> None:
+        one = CopyStats()
+        _sync_entry(src, dst, src_stat, one)
+        with lock:
+            stats.files_seen += one.files_seen
+            stats.files_copied += one.files_copied
+            stats.bytes_copied += one.bytes_copied
+            if progress is not None:
+                progress(stats, len(files), total_bytes)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(copy_one, *item) for item in files]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+    # Bottom-up, as in ``sync_tree``: writing files bumped these mtimes.
+    for dst_dir, dir_stat in reversed(dirs):
+        with contextlib.suppress(OSError):
+            dst_dir.chmod(stat.S_IMODE(dir_stat.st_mode))
+            os.utime(dst_dir, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+    return stats
+
+
+def verify_tree(source: Path, dest: Path) -> list[str]:
+    """Relpaths under ``source`` that ``dest`` doesn't match; empty when it's a full copy.
+
+    Regular files must have the same size and whole-second mtime, symlinks
+    the same link text.
+    """
+    mismatched: list[str] = []
+    stack = [(source, dest, "")]
+    while stack:
+        src_dir, dst_dir, rel = stack.pop()
+        with os.scandir(src_dir) as it:
+            entries = list(it)
+        for entry in entries:
+            entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+            src_stat = entry.stat(follow_symlinks=False)
+            target = dst_dir / entry.name
+            try:
+                dst_stat = target.lstat()
+            except FileNotFoundError:
+                mismatched.append(entry_rel)
+                continue
+            if stat.S_ISDIR(src_stat.st_mode):
+                if stat.S_ISDIR(dst_stat.st_mode):
+                    stack.append((Path(entry.path), target, entry_rel))
+                else:
+                    mismatched.append(entry_rel)
+            elif stat.S_ISLNK(src_stat.st_mode):
+                link = Path(entry.path).readlink()
+                if not stat.S_ISLNK(dst_stat.st_mode) or target.readlink() != link:
+                    mismatched.append(entry_rel)
+            elif stat.S_ISREG(src_stat.st_mode) and (
+                dst_stat.st_size != src_stat.st_size
+                or dst_stat.st_mtime_ns // 1_000_000_000 != src_stat.st_mtime_ns // 1_000_000_000
+            ):
+                mismatched.append(entry_rel)
+    return mismatched
+
+
+def prefix_digest(path: Path, length: int) -> str:
+    """Cheap checksum of ``path[:length]``: its length plus both end windows.
+
+    History rewrites (zsh ``HIST_SAVE_NO_DUPS`` compaction, a REPL trimming
+    to its max size) change the head or shrink the file, so sampling the
+    first and last ``PREFIX_WINDOW`` bytes catches them without reading
+    megabytes of history on every tick.
+    """
+    h = hashlib.sha256(str(length).encode())
+    with path.open("rb") as f:
+        h.update(f.read(min(PREFIX_WINDOW, length)))
+        tail_start = max(0, length - PREFIX_WINDOW)
+        f.seek(tail_start)
+        h.update(f.read(length - tail_start))
+    return h.hexdigest()
+
+
+def append_tail(source: Path, dest: Path, offset: int, length: int) -> int:
+    """Append ``source[offset:length]`` to ``dest``, which must be ``offset`` bytes long.
+
+    ``length`` is the source size the caller stat'ed, so bytes written after
+    that are left for the next run. Carries the source mtime over so the
+    rsync quick check treats the pair as in sync. Not atomic — an
+    interrupted append leaves ``dest`` at an unexpected size, which the
+    caller's offset check turns into a full copy next time. Returns bytes
+    appended.
+    """
+    src_stat = source.stat()
+    with source.open("rb") as src_f, dest.open("r+b") as dst_f:
+        dst_f.seek(0, os.SEEK_END)
+        if dst_f.tell() != offset:
+            raise OSError(errno.EAGAIN, "destination changed size", str(dest))
+        src_f.seek(offset)
+        remaining = length - offset
+        while remaining > 0:
+            buf = src_f.read(min(_CHUNK, remaining))
+            if not buf:
+                break
+            dst_f.write(buf)
+            remaining -= len(buf)
+    os.utime(dest, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    return length - offset - remaining
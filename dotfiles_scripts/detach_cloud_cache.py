@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """Detach regenerable build artifacts from the cloud-synced private dotfiles.
 
-Walks ``~/.dotfiles-private/`` for known cache/build directories
-(``node_modules``, ``.venv``, ``venv``, ``__pycache__``, etc.) and moves them
-out to ``~/.cache/dotfiles-private/<mirror-path>/``. The cloud copy is
-replaced with an absolute-target symlink, so the cloud carries only the
-(small) symlink and not the gigabytes of regenerable artifacts.
+Walks ``~/.dotfiles-private/`` for regenerable cache/build directories
+(``node_modules``, ``.venv``, ``__pycache__``, anything with a
+``CACHEDIR.TAG`` or ``pyvenv.cfg``, ``target/`` beside a ``Cargo.toml``…;
+see ``regenerable``) and moves them out to
+``~/.cache/dotfiles-private/<mirror-path>/``. The cloud copy is replaced
+with an absolute-target symlink, so the cloud carries only the (small)
+symlink and not the gigabytes of regenerable artifacts.
 
 On other machines: when the cloud syncs the symlink, the local cache target
 won't exist initially. This script also ensures empty cache target dirs
@@ -14,31 +16,80 @@ so the symlink resolves (to an empty dir) instead of dangling. Re-running
 whatever populated the original directory (``npm install`` / ``uv sync`` /
 etc.) will fill it back in.
 
+Both jobs share one ``os.scandir`` pass over the cloud tree: every
+directory is listed once, and each entry's type comes from that listing,
+so on a FileProvider-backed Drive an hourly run costs one metadata
+round-trip per directory rather than one per path. ``readlink`` is only
+called on symlinks.
+
+Between runs, ``INDEX_FILE`` records each directory's mtime, its
+subdirectories and the cache links in it. A directory whose mtime hasn't
+changed can't have gained a pattern dir or an incoming link, so it is
+not listed again: the run stats it, re-checks its known links' cache
+targets (local disk) and descends into its known subdirectories. An
+unchanged tree costs one ``stat`` per directory. Every
+``DETACH_FULL_RESCAN_HOURS`` (``.dotfiles-config``, default 24; 0 = every
+run), or with ``--full``, the index is ignored and the whole tree is
+listed again, to catch anything mtimes missed.
+
+Moves are a plain ``os.rename`` when the cloud tree and the cache share a
+device. Otherwise the directory is copied into ``<target>.partial`` on a
+thread pool (``DETACH_COPY_WORKERS``), checked file by file against the
+source, and only then renamed into place and deleted from the cloud. An
+interrupted copy leaves the ``.partial`` behind and the source untouched;
+the next run resumes it, skipping files that already landed.
+
 Designed to run on a launchd schedule (hourly). Idempotent.
 """
 
 from __future__ import annotations
 
+import json
 import os
 import shutil
 import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import cast
 
 import click
 
+from dotfiles_scripts.delta_copy import CopyStats, copy_tree_parallel, verify_tree
+from dotfiles_scripts.disk_usage import dir_sizes, format_size
+from dotfiles_scripts.regenerable import match_contents, match_name
 from dotfiles_scripts.setup_utils import (
     PRIVATE_DOTFILES,
     print_header,
     print_step,
     print_success,
     print_warning,
+    read_dotfiles_config,
 )
 
 CACHE_ROOT = Path.home() / ".cache" / "dotfiles-private"
+INDEX_FILE = CACHE_ROOT / "detach-index.json"
+
+# Hours between full listings of the cloud tree; in between, the index
+# stands in for directories whose mtime hasn't changed.
+DEFAULT_FULL_RESCAN_HOURS = 24
+
+# Threads copying files for a cross-device move (I/O-bound; a Drive mount
+# handles several reads in flight far better than one at a time).
+DETACH_COPY_WORKERS = 8
+
+# Seconds between progress lines while a cross-device copy runs.
+_PROGRESS_INTERVAL = 5.0
+
+# Bump when the index layout changes so old indexes are ignored.
+_INDEX_VERSION = 1
 
 # Default patterns: directory *names* that mean "regenerable build/cache state".
 # Conservative on purpose — does not include `dist`, `build`, or `target`,
-# which are common project directory names that may be intentional.
+# which are common project directory names that may be intentional. Those
+# are detached only when a sibling build file vouches for them (see
+# ``regenerable.SIBLING_MARKERS``; ``--names-only`` turns that off).
 DEFAULT_PATTERNS: tuple[str, ...] = (
     "node_modules",
     ".venv",
@@ -56,6 +107,32 @@ DEFAULT_PATTERNS: tuple[str, ...] = (
 )
 
 
+@dataclass
+class DetachStats:
+    """What one pass over the cloud tree visited and changed."""
+
+    dirs: int = 0
+    entries: int = 0
+    detached: int = 0
+    detached_bytes: int = 0  # measured in the cache once the pass is done
+    # Cache directories detached into, sized together at the end of the pass.
+    moved: list[Path] = field(default_factory=list)
+    ensured: int = 0
+    # Directories taken from the index instead of being listed.
+    unchanged: int = 0
+    full: bool = True
+    seconds: float = 0.0
+
+
+@dataclass
+class DirRecord:
+    """A cloud directory as last listed: its mtime, subdirectories and cache links."""
+
+    mtime_ns: int
+    subdirs: list[str] = field(default_factory=list)
+    links: dict[str, str] = field(default_factory=dict)  # name → cache target
+
+
 def _resolve_private_root() -> Path | None:
     """Return the resolved cloud-synced private dotfiles root, or None."""
     if not PRIVATE_DOTFILES.is_dir():
@@ -66,10 +143,147 @@ def _resolve_private_root() -> Path | None:
     return PRIVATE_DOTFILES.resolve()
 
 
-def _detach_one(source: Path, root: Path, dry_run: bool) -> bool:
-    """Detach ``source`` (a real directory) to the local cache.
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+
+def _full_rescan_hours() -> int:
+    """Full-rescan interval from ``DETACH_FULL_RESCAN_HOURS``, else the default."""
+    raw = read_dotfiles_config("DETACH_FULL_RESCAN_HOURS")
+    if raw is None:
+        return DEFAULT_FULL_RESCAN_HOURS
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        print_warning(f"ignoring invalid DETACH_FULL_RESCAN_HOURS={raw!r}")
+        return DEFAULT_FULL_RESCAN_HOURS
+
 
-    Returns True if action was taken (or would be in dry-run).
+def _parse_record(raw: object) -> DirRecord | None:
+    if not isinstance(raw, dict):
+        return None
+    entry = cast("dict[str, object]", raw)
+    mtime, subdirs, links = entry.get("mtime_ns"), entry.get("subdirs"), entry.get("links")
+    if not isinstance(mtime, int) or not isinstance(subdirs, list) or not isinstance(links, dict):
+        return None
+    return DirRecord(
+        mtime,
+        [str(x) for x in cast("list[object]", subdirs)],
+        {str(k): str(v) for k, v in cast("dict[object, object]", links).items()},
+    )
+
+
+def load_index(
+    root: Path, patterns: set[str], markers: bool, max_age_hours: int
+) -> tuple[dict[str, DirRecord], float]:
+    """The saved index (relpath → ``DirRecord``; ``""`` is ``root``) and its last full scan.
+
+    Returns ``({}, 0.0)`` when a full rescan is due: the index is missing,
+    was built for other patterns or marker settings, or its last full listing is
+    older than ``max_age_hours``.
+    """
+    try:
+        with INDEX_FILE.open("r", encoding="utf-8") as f:
+            data: object = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}, 0.0
+    if not isinstance(data, dict):
+        return {}, 0.0
+    top = cast("dict[str, object]", data)
+    if top.get("version") != _INDEX_VERSION or top.get("root") != str(root):
+        return {}, 0.0
+    if top.get("patterns") != sorted(patterns) or top.get("markers") != markers:
+        return {}, 0.0
+    full_scan, dirs = top.get("full_scan"), top.get("dirs")
+    if not isinstance(full_scan, (int, float)) or time.time() - full_scan > max_age_hours * 3600:
+        return {}, 0.0
+    if not isinstance(dirs, dict):
+        return {}, 0.0
+    index: dict[str, DirRecord] = {}
+    for rel, raw in cast("dict[str, object]", dirs).items():
+        record = _parse_record(raw)
+        if record is not None:
+            index[rel] = record
+    return index, float(full_scan)
+
+
+def _save_index(
+    root: Path,
+    patterns: set[str],
+    markers: bool,
+    full_scan: float,
+    dirs: dict[str, DirRecord],
+) -> None:
+    payload = {
+        "version": _INDEX_VERSION,
+        "root": str(root),
+        "patterns": sorted(patterns),
+        "markers": markers,
+        "full_scan": full_scan,
+        "dirs": {rel: vars(record) for rel, record in sorted(dirs.items())},
+    }
+    try:
+        INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = INDEX_FILE.with_suffix(".json.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        tmp.replace(INDEX_FILE)
+    except OSError as exc:
+        print_warning(f"could not write {INDEX_FILE}: {exc}")
+
+
+# ---------------------------------------------------------------------------
+# Detach
+# ---------------------------------------------------------------------------
+
+
+def _copy_progress(rel: Path) -> Callable[[CopyStats, int, int], None]:
+    """A ``copy_tree_parallel`` progress callback printing at most every few seconds."""
+    last = time.monotonic()
+
+    def report(stats: CopyStats, files: int, total_bytes: int) -> None:
+        nonlocal last
+        now = time.monotonic()
+        if now - last < _PROGRESS_INTERVAL and stats.files_seen < files:
+            return
+        last = now
+        print_step(
+            f"  {rel}: {stats.files_seen}/{files} files, "
+            f"{stats.bytes_copied / 1e6:.0f}/{total_bytes / 1e6:.0f} MB copied"
+        )
+
+    return report
+
+
+def _move_dir(source: Path, target: Path, rel: Path) -> None:
+    """Move directory ``source`` to ``target`` (whose parent exists). Raises OSError."""
+    if source.stat().st_dev == target.parent.stat().st_dev:
+        source.rename(target)
+        return
+    partial = target.with_name(f"{target.name}.partial")
+    if partial.exists():
+        print_step(f"  resuming copy into {partial}")
+    copy_tree_parallel(
+        source, partial, workers=DETACH_COPY_WORKERS, progress=_copy_progress(rel)
+    )
+    mismatched = verify_tree(source, partial)
+    if mismatched:
+        raise OSError(
+            f"copy of {source} does not match ({len(mismatched)} path(s), e.g. "
+            f"{mismatched[0]}); left {partial} to resume"
+        )
+    partial.rename(target)
+    shutil.rmtree(source)
+
+
+def _detach_one(
+    source: Path, root: Path, dry_run: bool, stats: DetachStats, reason: str = ""
+) -> bool:
+    """Detach ``source`` (a real directory) to the local cache, counting it in ``stats``.
+
+    Returns True if action was taken (or would be in dry-run). A failed move
+    is reported and leaves ``source`` in place.
     """
     if source.is_symlink() or not source.is_dir():
         return False
@@ -77,56 +291,192 @@ def _detach_one(source: Path, root: Path, dry_run: bool) -> bool:
     rel = source.relative_to(root)
     target = CACHE_ROOT / rel
 
+    why = f" ({reason})" if reason else ""
     if dry_run:
-        print_step(f"[dry-run] {source} → {target}")
+        print_step(f"[dry-run] {source} → {target}{why}")
+        stats.detached += 1
         return True
 
-    print_step(f"detach {rel}")
-    target.parent.mkdir(parents=True, exist_ok=True)
-
-    if target.exists():
-        # Previous detach ran here. Trust the cache copy; drop the cloud copy.
-        # (If the user had newer content in the cloud copy, they'd see it after
-        # populating the cache via their normal install flow.)
-        shutil.rmtree(source)
-    else:
-        shutil.move(str(source), str(target))
+    print_step(f"detach {rel}{why}")
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            # Previous detach ran here. Trust the cache copy; drop the cloud copy.
+            # (If the user had newer content in the cloud copy, they'd see it after
+            # populating the cache via their normal install flow.)
+            shutil.rmtree(source)
+        else:
+            _move_dir(source, target, rel)
+    except OSError as exc:
+        print_warning(f"could not detach {rel}: {exc}")
+        return False
 
     # Use an absolute symlink target so other machines (and this machine across
     # symlink-resolution boundaries) all interpret the link the same way.
-    os.symlink(target, source)
+    source.symlink_to(target)
+    stats.detached += 1
+    stats.moved.append(target)
     return True
 
 
-def _ensure_symlink_targets(root: Path, dry_run: bool) -> int:
-    """Create empty cache directories for any symlinks pointing into the cache.
+def _cache_link_target(path: Path) -> Path | None:
+    """Where ``path`` (a symlink) points, if that is inside the cache."""
+    try:
+        link = path.readlink()
+    except OSError:
+        return None
+    target = link if link.is_absolute() else (path.parent / link).resolve()
+    try:
+        target.relative_to(CACHE_ROOT)
+    except ValueError:
+        return None
+    return target
+
+
+def _ensure_symlink_target(target: Path, dry_run: bool) -> bool:
+    """Create an empty cache directory at ``target`` if nothing is there yet.
 
     Used on the receiving end after a peer machine detaches and syncs the
     symlink: that symlink's local target won't exist until something populates
     it. Creating it as an empty directory makes the symlink resolve cleanly.
+    Returns True if a target was (or would be) created.
     """
-    count = 0
-    for path in root.rglob("*"):
-        if not path.is_symlink():
-            continue
+    if target.exists():
+        return False
+    if dry_run:
+        print_step(f"[dry-run] mkdir empty {target}")
+    else:
+        target.mkdir(parents=True, exist_ok=True)
+        print_step(f"created empty cache target {target}")
+    return True
+
+
+def _list_dir(
+    directory: Path,
+    root: Path,
+    patterns: set[str],
+    markers: bool,
+    dry_run: bool,
+    stats: DetachStats,
+) -> DirRecord | None:
+    """List ``directory`` once: detach matches, ensure cache link targets, record the rest.
+
+    Returns None when ``directory`` itself turned out to be regenerable
+    (a marker file inside) and was detached, or couldn't be listed.
+    """
+    try:
+        mtime = directory.stat().st_mtime_ns
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError as exc:
+        print_warning(f"cannot list {directory}: {exc}")
+        return None
+    stats.dirs += 1
+    stats.entries += len(entries)
+    listing = [e.name for e in entries]
+    if markers and directory != root:
+        reason = match_contents(listing)
+        if reason is not None:
+            _detach_one(directory, root, dry_run, stats, reason)
+            return None
+    # Sibling-marker rules need the listing; without markers only names match.
+    siblings = listing if markers else ()
+    record = DirRecord(mtime)
+    changed = failed = False
+    for entry in entries:
+        if entry.is_symlink():
+            target = _cache_link_target(Path(entry.path))
+            if target is not None:
+                record.links[entry.name] = str(target)
+                if _ensure_symlink_target(target, dry_run):
+                    stats.ensured += 1
+        elif entry.is_dir(follow_symlinks=False):
+            reason = match_name(entry.name, siblings, patterns)
+            if reason is None:
+                record.subdirs.append(entry.name)
+            elif _detach_one(Path(entry.path), root, dry_run, stats, reason):
+                record.links[entry.name] = str(CACHE_ROOT / Path(entry.path).relative_to(root))
+                changed = True
+            else:
+                failed = True
+    if failed:
+        # An mtime no directory has, so the next run lists this one again
+        # and retries the detach instead of trusting the record.
+        record.mtime_ns = -1
+    elif changed and not dry_run:
+        # Detaching swapped directories for symlinks here; record the mtime
+        # that left behind, or the next run would list this directory again.
         try:
-            link = Path(os.readlink(path))
+            record.mtime_ns = directory.stat().st_mtime_ns
         except OSError:
-            continue
-        target = link if link.is_absolute() else (path.parent / link).resolve()
-        try:
-            target.relative_to(CACHE_ROOT)
-        except ValueError:
-            continue
-        if target.exists():
-            continue
-        if dry_run:
-            print_step(f"[dry-run] mkdir empty {target}")
+            return None
+    return record
+
+
+def detach_tree(
+    root: Path,
+    patterns: set[str],
+    dry_run: bool,
+    *,
+    markers: bool = True,
+    full: bool = False,
+) -> DetachStats:
+    """Detach every regenerable directory under ``root`` and ensure incoming link targets.
+
+    Regenerable means named in ``patterns`` or, with ``markers``, detected
+    by ``regenerable``'s marker-file rules. One pass: symlinks are never
+    followed (each is checked as a possible incoming cache link instead),
+    and matched directories are detached without being descended into.
+    Directories the index vouches for are stat'ed rather than listed;
+    ``full`` ignores the index. The index is rewritten afterwards (not in
+    ``dry_run``).
+    """
+    stats = DetachStats()
+    started = time.perf_counter()
+    index, full_scan = (
+        ({}, 0.0) if full else load_index(root, patterns, markers, _full_rescan_hours())
+    )
+    stats.full = not index
+    if stats.full:
+        full_scan = time.time()
+    seen: dict[str, DirRecord] = {}
+    stack: list[tuple[Path, str]] = [(root, "")]
+    while stack:
+        directory, rel = stack.pop()
+        known = index.get(rel)
+        record: DirRecord | None = None
+        if known is not None:
+            try:
+                if directory.stat().st_mtime_ns == known.mtime_ns:
+                    record = known
+            except OSError:
+                continue  # gone since the last run
+        if record is not None:
+            stats.unchanged += 1
+            for target in record.links.values():
+                if _ensure_symlink_target(Path(target), dry_run):
+                    stats.ensured += 1
         else:
-            target.mkdir(parents=True, exist_ok=True)
-            print_step(f"created empty cache target {target}")
-        count += 1
-    return count
+            record = _list_dir(directory, root, patterns, markers, dry_run, stats)
+            if record is None:
+                continue
+        seen[rel] = record
+        # Reversed so the stack pops them in name order.
+        stack.extend(
+            (directory / name, f"{rel}/{name}" if rel else name)
+            for name in reversed(record.subdirs)
+        )
+    if not dry_run:
+        _save_index(root, patterns, markers, full_scan, seen)
+    if stats.moved:
+        # Sized on the local side, after the moves, in one walk: no extra
+        # walk of the cloud copies, and one read and write of the usage cache.
+        sizes = dir_sizes(stats.moved)
+        for target, size in sizes.items():
+            print_step(f"  {target.relative_to(CACHE_ROOT)}: {format_size(size)} moved to cache")
+        stats.detached_bytes = sum(sizes.values())
+    stats.seconds = time.perf_counter() - started
+    return stats
 
 
 @click.command()
@@ -137,7 +487,17 @@ def _ensure_symlink_targets(root: Path, dry_run: bool) -> int:
     show_default=True,
     help="Comma-separated directory names to detach.",
 )
-def cli(dry_run: bool, patterns: str) -> None:
+@click.option(
+    "--full",
+    is_flag=True,
+    help="List the whole tree again, ignoring the index of unchanged directories.",
+)
+@click.option(
+    "--names-only",
+    is_flag=True,
+    help="Only detach directories named in --patterns (skip marker-file detection).",
+)
+def cli(dry_run: bool, patterns: str, full: bool, names_only: bool) -> None:
     """Detach build artifacts from ~/.dotfiles-private/ to ~/.cache/dotfiles-private/."""
     root = _resolve_private_root()
     if root is None:
@@ -152,25 +512,21 @@ def cli(dry_run: bool, patterns: str) -> None:
     print(f"Cloud tree: {root}")
     print(f"Cache root: {CACHE_ROOT}")
     print(f"Patterns:   {sorted(pattern_set)}")
+    print(f"Markers:    {'off' if names_only else 'on'}")
     print()
 
-    detached = 0
-    # Walk without following symlinks, and skip descending into directories
-    # we just detached (to avoid os.walk choking on the freshly-created link).
-    for current_root, dirs, _files in os.walk(root, followlinks=False):
-        # Don't descend into anything that's already a symlink.
-        dirs[:] = [d for d in dirs if not Path(current_root, d).is_symlink()]
-        # Detach any matched dirs at this level, then prune them so we don't recurse.
-        for name in list(dirs):
-            if name in pattern_set:
-                if _detach_one(Path(current_root, name), root, dry_run):
-                    detached += 1
-                dirs.remove(name)
-
-    ensured = _ensure_symlink_targets(root, dry_run)
+    stats = detach_tree(root, pattern_set, dry_run, markers=not names_only, full=full)
 
     print()
-    print_success(f"Detached {detached} dir(s); ensured {ensured} incoming symlink target(s)")
+    scan = "full scan" if stats.full else f"{stats.unchanged} unchanged dir(s) from index"
+    print_step(
+        f"Listed {stats.dirs} dir(s) ({stats.entries} entries; {scan}) in {stats.seconds:.2f}s"
+    )
+    moved = f" ({format_size(stats.detached_bytes)} off the cloud)" if stats.detached_bytes else ""
+    print_success(
+        f"Detached {stats.detached} dir(s){moved}; "
+        f"ensured {stats.ensured} incoming symlink target(s)"
+    )
 
 
 def main() -> None:
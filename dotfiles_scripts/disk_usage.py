@@ -0,0 +1,186 @@
+"""In-process directory sizes, concurrent and cached across runs.
+
+Used by ``dotfiles-doctor`` (ranking regenerable dirs), ``setup-gstack``
+(reporting what a cleanup frees) and ``detach-cloud-cache`` (what a detach
+moved), instead of forking ``du`` or re-walking with ``os.walk`` per
+directory.
+
+Directories are listed with ``os.scandir`` on a thread pool, one level of
+the tree per round: stat latency on a cloud mount, not CPU, is the cost.
+Sizes are apparent sizes (``st_size``), symlinks counted as themselves.
+
+``USAGE_CACHE_FILE`` records, per directory, its mtime, the bytes of the
+files directly in it and its subdirectories. A directory whose mtime
+hasn't changed is not listed again; only ``stat``'ed, then its recorded
+subdirectories are visited. Adding, removing or renaming an entry bumps
+the mtime; rewriting a file in place does not, so a cached size can lag
+behind edits inside an otherwise unchanged directory. That's fine for
+reporting, which is all this is used for.
+
+Each call rewrites the cache with just the directories it walked, so the
+file stays the size of one call's trees rather than growing with every
+tree ever sized. Callers size everything they need in one ``dir_sizes``
+call.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import stat
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import cast
+
+USAGE_CACHE_FILE = Path.home() / ".cache" / "dotfiles-private" / "disk-usage.json"
+
+# Directories listed concurrently.
+USAGE_WORKERS = 8
+
+# Bump when the cache layout changes so old entries are ignored.
+_FORMAT_VERSION = 1
+
+
+@dataclass
+class UsageStats:
+    """What one ``dir_sizes`` call cost."""
+
+    dirs: int = 0
+    listed: int = 0  # the rest came from the cache
+    seconds: float = 0.0
+
+
+@dataclass
+class _DirUsage:
+    mtime_ns: int
+    files: int  # bytes of the non-directory entries directly inside
+    subdirs: list[str] = field(default_factory=list)
+
+
+def format_size(n: float) -> str:
+    """``du -h``-style size: ``512B``, ``40K``, ``3M``…"""
+    for unit in ("B", "K", "M", "G"):
+        if n < 1024:
+            return f"{n:.0f}{unit}"
+        n /= 1024
+    return f"{n:.0f}T"
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+
+def _load_cache() -> dict[str, _DirUsage]:
+    try:
+        with USAGE_CACHE_FILE.open("r", encoding="utf-8") as f:
+            data: object = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    top = cast("dict[str, object]", data)
+    dirs = top.get("dirs")
+    if top.get("version") != _FORMAT_VERSION or not isinstance(dirs, dict):
+        return {}
+    cache: dict[str, _DirUsage] = {}
+    for key, raw in cast("dict[str, object]", dirs).items():
+        if not isinstance(raw, dict):
+            continue
+        entry = cast("dict[str, object]", raw)
+        mtime, files, subdirs = entry.get("mtime_ns"), entry.get("files"), entry.get("subdirs")
+        if isinstance(mtime, int) and isinstance(files, int) and isinstance(subdirs, list):
+            cache[key] = _DirUsage(mtime, files, [str(x) for x in cast("list[object]", subdirs)])
+    return cache
+
+
+def _save_cache(cache: dict[str, _DirUsage]) -> None:
+    payload = {
+        "version": _FORMAT_VERSION,
+        "dirs": {k: vars(v) for k, v in sorted(cache.items())},
+    }
+    try:
+        USAGE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = USAGE_CACHE_FILE.with_suffix(".json.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        tmp.replace(USAGE_CACHE_FILE)
+    except OSError:
+        pass  # a cache; the next call just lists again
+
+
+# ---------------------------------------------------------------------------
+# Sizing
+# ---------------------------------------------------------------------------
+
+
+def _scan(directory: Path, known: _DirUsage | None) -> tuple[_DirUsage, bool] | None:
+    """``directory``'s usage and whether it had to be listed; None if it's unreadable."""
+    try:
+        mtime = directory.lstat().st_mtime_ns
+    except OSError:
+        return None
+    if known is not None and known.mtime_ns == mtime:
+        return known, False
+    usage = _DirUsage(mtime, 0)
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return None
+    for entry in entries:
+        with contextlib.suppress(OSError):
+            st = entry.stat(follow_symlinks=False)
+            if stat.S_ISDIR(st.st_mode):
+                usage.subdirs.append(entry.name)
+            else:
+                usage.files += st.st_size
+    return usage, True
+
+
+def dir_sizes(
+    paths: Iterable[Path],
+    *,
+    workers: int = USAGE_WORKERS,
+    stats: UsageStats | None = None,
+) -> dict[Path, int]:
+    """Apparent size in bytes of each directory in ``paths`` (0 if unreadable).
+
+    All the trees are sized in one concurrent walk. The cache is replaced
+    by this walk's directories; entries for other trees are dropped.
+    """
+    stats = stats if stats is not None else UsageStats()
+    started = time.perf_counter()
+    roots = list(dict.fromkeys(paths))
+    cache = _load_cache()
+    seen: dict[str, _DirUsage] = {}
+    sizes = dict.fromkeys(roots, 0)
+    # (root being sized, directory under it)
+    frontier = [(root, root) for root in roots]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while frontier:
+            results = pool.map(lambda item: _scan(item[1], cache.get(str(item[1]))), frontier)
+            next_frontier: list[tuple[Path, Path]] = []
+            for (root, directory), result in zip(frontier, results):
+                if result is None:
+                    continue
+                usage, listed = result
+                stats.dirs += 1
+                stats.listed += listed
+                seen[str(directory)] = usage
+                sizes[root] += usage.files
+                next_frontier.extend((root, directory / n) for n in usage.subdirs)
+            frontier = next_frontier
+
+    _save_cache(seen)
+    stats.seconds = time.perf_counter() - started
+    return sizes
+
+
+def dir_size(path: Path) -> int:
+    """Apparent size in bytes of one directory; see ``dir_sizes``."""
+    return dir_sizes([path])[path]
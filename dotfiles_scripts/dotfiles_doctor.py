@@ -4,8 +4,10 @@
 Detects common cruft that accumulates in cloud-synced dotfiles trees and
 offers per-category fixes:
 
-* Regenerable build artifacts (``node_modules``, ``.venv``, etc.) that should
-  not be cloud-synced — fix delegates to ``detach-cloud-cache``.
+* Regenerable build artifacts (``node_modules``, ``.venv``, marker-file
+  matches like ``target/`` beside ``Cargo.toml``; see ``regenerable``) that
+  should not be cloud-synced, largest first — fix delegates to
+  ``detach-cloud-cache``.
 * Dropbox/Drive conflicted-copy files (e.g. ``foo (Mac's conflicted copy
   2024-01-01).db``) — fix deletes them.
 * Stale top-level junk files (zero-byte ``.warprc``, decade-old ``.DS_Store``,
@@ -21,7 +23,6 @@ Run with ``--check`` to skip prompts and exit non-zero if any findings exist
 
 from __future__ import annotations
 
-import os
 import re
 import shutil
 import subprocess
@@ -35,6 +36,8 @@ from dotfiles_scripts.detach_cloud_cache import (
     CACHE_ROOT,
     DEFAULT_PATTERNS as DETACH_PATTERNS,
 )
+from dotfiles_scripts.disk_usage import format_size
+from dotfiles_scripts.regenerable import find_regenerable, rank_by_size
 from dotfiles_scripts.setup_utils import (
     PRIVATE_DOTFILES,
     print_error,
@@ -83,15 +86,10 @@ def detect_build_artifacts(root: Path) -> Category:
         fix_label="run `detach-cloud-cache` to move them to ~/.cache/dotfiles-private/",
         fixer=_fix_detach,
     )
-    pattern_set = set(DETACH_PATTERNS)
-    for current_root, dirs, _ in os.walk(root, followlinks=False):
-        # Don't descend through symlinks (already detached) or detached dirs.
-        dirs[:] = [d for d in dirs if not Path(current_root, d).is_symlink()]
-        for name in list(dirs):
-            if name in pattern_set:
-                p = Path(current_root, name)
-                cat.add(p, note=f"size: {_du(p)}")
-                dirs.remove(name)
+    # Same rules detach-cloud-cache applies, so the fix clears every finding.
+    found = find_regenerable(root, set(DETACH_PATTERNS))
+    for match, size in rank_by_size(found):
+        cat.add(match.path, note=f"size: {format_size(size)}; {match.reason}")
     return cat
 
 
@@ -212,25 +210,11 @@ def _fix_delete(findings: list[Finding]) -> bool:
 # ---------------------------------------------------------------- helpers
 
 
-def _du(path: Path) -> str:
-    """Human-readable directory size; quiet on errors."""
-    try:
-        out = subprocess.check_output(["du", "-sh", str(path)], stderr=subprocess.DEVNULL)
-        return out.decode().split()[0]
-    except (OSError, subprocess.CalledProcessError):
-        return "?"
-
-
 def _size(path: Path) -> str:
     try:
-        n = path.stat().st_size
+        return format_size(path.stat().st_size)
     except OSError:
         return "?"
-    for unit in ("B", "K", "M", "G"):
-        if n < 1024:
-            return f"{n:.0f}{unit}"
-        n /= 1024
-    return f"{n:.0f}T"
 
 
 def _active_device_ids(root: Path) -> set[str]:
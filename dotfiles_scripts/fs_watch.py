@@ -0,0 +1,377 @@
+"""Filesystem change watchers for the long-running ``--watch`` modes.
+
+``make_watcher(roots)`` returns an inotify-backed watcher on Linux and a
+polling watcher everywhere else (macOS FSEvents would need pyobjc, which the
+project deliberately doesn't depend on). Both expose the same API::
+
+    watcher = make_watcher([Path.home() / ".claude/history.jsonl", repo / "zsh_history"])
+    changed = watcher.wait(timeout=5.0)  # -> set of roots that changed
+    paths = watcher.wait_paths(timeout=5.0)  # -> the changed paths themselves
+    watcher.close()
+
+Roots may be files or directories and need not exist yet. Directory roots
+are watched recursively; an ``ignore`` predicate on entry names prunes
+subtrees (e.g. ``node_modules``) from both watching and change reports.
+The polling watcher only reports files edited in place (as opposed to
+added, removed or replaced) when built with ``poll_files``.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import ctypes
+import ctypes.util
+import os
+import select
+import stat
+import struct
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from dotfiles_scripts.setup_utils import is_linux
+
+# inotify(7) event bits. Only what the watcher subscribes to / reacts to.
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _never_ignore(_name: str) -> bool:
+    return False
+
+
+def _is_within(path: Path, root: Path) -> bool:
+    return path == root or root in path.parents
+
+
+class Watcher(ABC):
+    """Common interface; see ``make_watcher``."""
+
+    def __init__(self, roots: Iterable[Path], ignore: Callable[[str], bool] | None = None):
+        self.roots: list[Path] = list(dict.fromkeys(roots))
+        self.ignore: Callable[[str], bool] = ignore or _never_ignore
+
+    def wait(self, timeout: float) -> set[Path]:
+        """Block up to ``timeout`` seconds; return the roots that changed."""
+        return {root for path in self.wait_paths(timeout) for root in self._roots_for(path)}
+
+    @abstractmethod
+    def wait_paths(self, timeout: float) -> set[Path]:
+        """Block like ``wait``; return the changed paths instead of their roots.
+
+        Those are entries created, removed or modified, and directories whose
+        listing changed. A root stands in for everything under it when the
+        detail was lost (inotify queue overflow, a file root).
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release any OS resources held by the watcher."""
+
+    def _roots_for(self, path: Path) -> set[Path]:
+        """Roots affected by a change at ``path``.
+
+        A change inside a root counts, and so does a change to one of a
+        root's ancestors (its parent dir being created or renamed).
+        """
+        return {r for r in self.roots if _is_within(path, r) or _is_within(r, path)}
+
+
+@dataclass
+class _DirState:
+    """What ``PollingWatcher`` last saw of one directory."""
+
+    mtime_ns: int
+    files: dict[str, tuple[int, int]] = field(default_factory=dict)  # name → (size, mtime_ns)
+    subdirs: set[str] = field(default_factory=set)
+
+
+class PollingWatcher(Watcher):
+    """Portable fallback: re-stat the roots every ``interval`` seconds.
+
+    A directory is only listed again when its own mtime changed (an entry
+    was added, removed or renamed), and only then are its files stat'ed;
+    a quiet tree costs one stat per directory per interval. Editing a file
+    in place leaves its directory's mtime alone, so ``poll_files`` also
+    re-stats every known file each interval, for callers that care about
+    content (appends to a log) rather than listings.
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[Path],
+        ignore: Callable[[str], bool] | None = None,
+        interval: float = 5.0,
+        *,
+        poll_files: bool = False,
+    ):
+        super().__init__(roots, ignore)
+        self.interval = interval
+        self.poll_files = poll_files
+        self._dirs: dict[Path, _DirState] = {}
+        # Roots that aren't directories: (size, mtime_ns, inode), None if missing.
+        self._files: dict[Path, tuple[int, int, int] | None] = {}
+        for root in self.roots:
+            self._poll_root(root, set())
+
+    def _list_dir(self, directory: Path) -> _DirState | None:
+        try:
+            mtime = directory.lstat().st_mtime_ns
+            with os.scandir(directory) as it:
+                entries = [e for e in it if not self.ignore(e.name)]
+        except OSError:
+            return None
+        state = _DirState(mtime)
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                state.subdirs.add(entry.name)
+                continue
+            with contextlib.suppress(OSError):
+                st = entry.stat(follow_symlinks=False)
+                state.files[entry.name] = (st.st_size, st.st_mtime_ns)
+        return state
+
+    def _forget(self, directory: Path) -> None:
+        for path in [p for p in self._dirs if _is_within(p, directory)]:
+            del self._dirs[path]
+
+    def _stat_files(self, directory: Path, state: _DirState, changed: set[Path]) -> None:
+        for name, known in state.files.items():
+            try:
+                st = (directory / name).lstat()
+            except OSError:
+                continue  # a removal bumps the directory's mtime; caught there
+            if (st.st_size, st.st_mtime_ns) != known:
+                state.files[name] = (st.st_size, st.st_mtime_ns)
+                changed.add(directory / name)
+
+    def _poll_tree(self, root: Path, changed: set[Path]) -> None:
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            old = self._dirs.get(directory)
+            if old is not None:
+                try:
+                    unchanged = directory.lstat().st_mtime_ns == old.mtime_ns
+                except OSError:
+                    unchanged = False
+                if unchanged:
+                    if self.poll_files:
+                        self._stat_files(directory, old, changed)
+                    stack.extend(directory / name for name in old.subdirs)
+                    continue
+            new = self._list_dir(directory)
+            if new is None:
+                if old is not None:
+                    self._forget(directory)
+                    changed.add(directory)
+                continue
+            self._dirs[directory] = new
+            if old is None:
+                # Newly seen: everything in it is new (the initial poll
+                # passes a throwaway ``changed``).
+                changed.add(directory)
+                changed.update(directory / name for name in (*new.files, *new.subdirs))
+            else:
+                changed.add(directory)
+                for name in old.subdirs - new.subdirs:
+                    self._forget(directory / name)
+                    changed.add(directory / name)
+                for name in (old.files.keys() | new.files.keys()) - new.subdirs:
+                    if old.files.get(name) != new.files.get(name):
+                        changed.add(directory / name)
+                changed.update(directory / name for name in new.subdirs - old.subdirs)
+            stack.extend(directory / name for name in new.subdirs)
+
+    def _poll_root(self, root: Path, changed: set[Path]) -> None:
+        try:
+            st = root.lstat()
+        except OSError:
+            st = None
+        if st is not None and stat.S_ISDIR(st.st_mode):
+            self._files.pop(root, None)
+            self._poll_tree(root, changed)
+            return
+        if root in self._dirs:
+            self._forget(root)
+            changed.add(root)
+        snap = None if st is None else (st.st_size, st.st_mtime_ns, st.st_ino)
+        if root in self._files and self._files[root] != snap:
+            changed.add(root)
+        self._files[root] = snap
+
+    def wait_paths(self, timeout: float) -> set[Path]:
+        deadline = time.monotonic() + timeout
+        while True:
+            changed: set[Path] = set()
+            for root in self.roots:
+                self._poll_root(root, changed)
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        self._dirs.clear()
+        self._files.clear()
+
+
+class InotifyWatcher(Watcher):
+    """Linux inotify via ctypes — no extra dependency.
+
+    inotify is not recursive, so every directory under a directory root gets
+    its own watch, and new subdirectories are armed as they appear. Roots
+    that don't exist yet are covered by watching their nearest existing
+    ancestor; the watch set is re-armed whenever that ancestor changes.
+    """
+
+    def __init__(self, roots: Iterable[Path], ignore: Callable[[str], bool] | None = None):
+        super().__init__(roots, ignore)
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd: int = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1: {os.strerror(err)}")
+        self._wd_paths: dict[int, Path] = {}
+        self._watched: set[Path] = set()
+        self._arm_all()
+
+    def _add_watch(self, directory: Path) -> None:
+        if directory in self._watched:
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            return  # vanished or unreadable; the next re-arm retries
+        self._wd_paths[wd] = directory
+        self._watched.add(directory)
+
+    def _arm_tree(self, directory: Path) -> None:
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            self._add_watch(current)
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if not self.ignore(entry.name) and entry.is_dir(follow_symlinks=False):
+                            stack.append(Path(entry.path))
+            except OSError:
+                continue
+
+    def _arm_all(self) -> None:
+        for root in self.roots:
+            if root.is_dir():
+                self._arm_tree(root)
+                continue
+            # File or not-yet-existing root: watch the closest existing ancestor.
+            anchor = root.parent
+            while not anchor.is_dir() and anchor != anchor.parent:
+                anchor = anchor.parent
+            self._add_watch(anchor)
+
+    def _read_events(self) -> list[tuple[Path, int]]:
+        events: list[tuple[Path, int]] = []
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            if not buf:
+                return events
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buf):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                raw_name = buf[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    events.append((Path("/"), mask))
+                    continue
+                directory = self._wd_paths.get(wd)
+                if directory is None:
+                    continue
+                if mask & _IN_IGNORED:
+                    # Kernel dropped the watch (dir deleted / moved away).
+                    self._wd_paths.pop(wd, None)
+                    self._watched.discard(directory)
+                    continue
+                name = os.fsdecode(raw_name)
+                if name and self.ignore(name):
+                    continue
+                events.append((directory / name if name else directory, mask))
+
+    def wait_paths(self, timeout: float) -> set[Path]:
+        ready, _, _ = select.select([self._fd], [], [], max(timeout, 0.0))
+        if not ready:
+            return set()
+        changed: set[Path] = set()
+        rearm = False
+        for path, mask in self._read_events():
+            if mask & _IN_Q_OVERFLOW:
+                # Events were lost; assume everything changed.
+                changed.update(self.roots)
+                rearm = True
+                continue
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                rearm = True
+            if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF):
+                rearm = True
+            if self._roots_for(path):
+                changed.add(path)
+        if rearm:
+            self._arm_all()
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            with contextlib.suppress(OSError):
+                os.close(self._fd)
+            self._fd = -1
+
+
+def make_watcher(
+    roots: Iterable[Path],
+    ignore: Callable[[str], bool] | None = None,
+    poll_interval: float = 5.0,
+    *,
+    poll_files: bool = False,
+) -> Watcher:
+    """inotify on Linux when available, else a ``PollingWatcher``.
+
+    ``poll_files`` only matters for the polling fallback (inotify always
+    sees in-place edits); see ``PollingWatcher``.
+    """
+    roots = list(roots)
+    if is_linux():
+        try:
+            return InotifyWatcher(roots, ignore)
+        except (OSError, AttributeError):
+            pass  # no inotify (old kernel, sandbox, non-glibc libc) — poll instead
+    return PollingWatcher(roots, ignore, interval=poll_interval, poll_files=poll_files)
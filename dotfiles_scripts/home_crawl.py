@@ -0,0 +1,271 @@
+"""One shared crawl of ``$HOME`` for the symlink checks.
+
+``check-home-symlinks`` (stale links to old layouts), ``setup-dropbox``
+(links into the cloud tree whose file is gone) and ``migrate-to-gdrive``
+(links to retarget) all need the same thing: every symlink under
+``$HOME`` with its target. ``crawl_home`` walks once and yields a
+``HomeLink`` per symlink; each caller filters the results.
+
+The walk is one ``os.scandir`` per directory. Symlinked directories are
+never followed, and ``SkipRule`` callables prune subtrees
+(``DEFAULT_RULES`` covers caches, package stores and backup dirs;
+``skip_git_work_trees`` is available to callers that want it).
+
+The checks all take the standard crawl (``DEFAULT_RULES``, no
+``max_depth``, ``snapshot=True``) and filter the links by depth, name or
+target themselves. Results are memoized in-process, so a setup run that
+does all the checks walks ``$HOME`` once, and the standard crawl is also
+saved as an on-disk snapshot that other processes reuse for
+``SNAPSHOT_MAX_AGE_SECONDS``. Other rules or a ``max_depth`` get a crawl
+of their own. Callers that change links call ``invalidate`` afterwards.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import time
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import cast
+
+SNAPSHOT_FILE = Path.home() / ".cache" / "dotfiles-private" / "home-links.json"
+
+# How long a snapshot stands in for a fresh crawl. Long enough to span one
+# setup run; short enough that hand edits in between are picked up.
+SNAPSHOT_MAX_AGE_SECONDS = 300
+
+# Bump when the snapshot layout or the default rules change.
+_FORMAT_VERSION = 2
+
+# A rule gets a directory entry and its depth below $HOME (top level = 1)
+# and returns True to leave that subtree out of the crawl.
+SkipRule = Callable[[os.DirEntry[str], int], bool]
+
+# Directory names never worth descending into: caches, package stores and
+# virtualenvs hold no managed links, and the cloud roots hold the source
+# trees themselves (walking into them would report or rewrite their
+# internal symlinks).
+SKIP_NAMES = frozenset(
+    {
+        "Library",
+        "Dropbox",
+        ".Trash",
+        ".cache",
+        ".npm",
+        ".pnpm-store",
+        ".cargo",
+        ".rustup",
+        "node_modules",
+        ".venv",
+        "venv",
+        "__pycache__",
+        ".git",
+    }
+)
+
+
+@dataclass(frozen=True)
+class HomeLink:
+    """One symlink found under ``$HOME``."""
+
+    path: Path
+    target: str  # link text, as ``Path.readlink`` returns it
+    resolved: Path
+    exists: bool  # whether the link's final target exists
+    depth: int  # below $HOME; a top-level link is 1
+
+
+@dataclass
+class CrawlStats:
+    """What one crawl cost (all zero when served from a memo or snapshot)."""
+
+    dirs: int = 0
+    entries: int = 0
+    links: int = 0
+    pruned: int = 0
+    seconds: float = 0.0
+    cached: bool = False
+
+
+def skip_names(entry: os.DirEntry[str], _depth: int) -> bool:
+    return entry.name in SKIP_NAMES
+
+
+def skip_backups(entry: os.DirEntry[str], _depth: int) -> bool:
+    """Backup dirs left by setup runs (``.dotfiles.<ts>.bck`` and the like)."""
+    return entry.name.endswith(".bck") or ".bck." in entry.name
+
+
+def skip_git_work_trees(entry: os.DirEntry[str], _depth: int) -> bool:
+    """Git work trees (a ``.git`` inside). Opt-in: costs a stat per directory."""
+    return (Path(entry.path) / ".git").exists()
+
+
+DEFAULT_RULES: tuple[SkipRule, ...] = (skip_names, skip_backups)
+
+# (home, rules, max_depth) → links, for crawls already done in this process.
+_MEMO: dict[tuple[Path, tuple[SkipRule, ...], int | None], list[HomeLink]] = {}
+
+
+def _link(path: str, depth: int) -> HomeLink | None:
+    link = Path(path)
+    try:
+        target = str(link.readlink())
+    except OSError:
+        return None
+    return HomeLink(link, target, link.resolve(), link.exists(), depth)
+
+
+def _walk(
+    home: Path, rules: Sequence[SkipRule], max_depth: int | None, stats: CrawlStats
+) -> list[HomeLink]:
+    links: list[HomeLink] = []
+
+    def walk(directory: str, depth: int) -> None:
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            return
+        stats.dirs += 1
+        stats.entries += len(entries)
+        subdirs: list[os.DirEntry[str]] = []
+        for entry in entries:
+            if entry.is_symlink():
+                link = _link(entry.path, depth + 1)
+                if link is not None:
+                    links.append(link)
+            elif entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry)
+        if max_depth is not None and depth + 1 >= max_depth:
+            stats.pruned += len(subdirs)
+            return
+        for entry in subdirs:
+            if any(rule(entry, depth + 1) for rule in rules):
+                stats.pruned += 1
+                continue
+            walk(entry.path, depth + 1)
+
+    walk(str(home), 0)
+    stats.links = len(links)
+    return links
+
+
+# ---------------------------------------------------------------------------
+# Snapshot
+# ---------------------------------------------------------------------------
+
+
+def _load_snapshot(home: Path, max_depth: int | None) -> list[HomeLink] | None:
+    try:
+        with SNAPSHOT_FILE.open("r", encoding="utf-8") as f:
+            data: object = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    top = cast("dict[str, object]", data)
+    taken, depth = top.get("taken"), top.get("max_depth")
+    if top.get("version") != _FORMAT_VERSION or top.get("home") != str(home):
+        return None
+    if not isinstance(taken, (int, float)) or time.time() - taken > SNAPSHOT_MAX_AGE_SECONDS:
+        return None
+    # A deeper (or unbounded) snapshot can serve a shallower crawl.
+    if depth is not None and (not isinstance(depth, int) or max_depth is None or depth < max_depth):
+        return None
+    raw_links = top.get("links")
+    if not isinstance(raw_links, list):
+        return None
+    links: list[HomeLink] = []
+    for raw in cast("list[object]", raw_links):
+        if not isinstance(raw, dict):
+            return None
+        entry = cast("dict[str, object]", raw)
+        path, target, resolved = entry.get("path"), entry.get("target"), entry.get("resolved")
+        exists, link_depth = entry.get("exists"), entry.get("depth")
+        if not (isinstance(path, str) and isinstance(target, str) and isinstance(resolved, str)):
+            return None
+        if not isinstance(exists, bool) or not isinstance(link_depth, int):
+            return None
+        links.append(HomeLink(Path(path), target, Path(resolved), exists, link_depth))
+    return links
+
+
+def _save_snapshot(home: Path, max_depth: int | None, links: list[HomeLink]) -> None:
+    payload = {
+        "version": _FORMAT_VERSION,
+        "home": str(home),
+        "taken": time.time(),
+        "max_depth": max_depth,
+        "links": [
+            {**asdict(link), "path": str(link.path), "resolved": str(link.resolved)}
+            for link in links
+        ],
+    }
+    try:
+        SNAPSHOT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = SNAPSHOT_FILE.with_suffix(".json.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        tmp.replace(SNAPSHOT_FILE)
+    except OSError:
+        pass  # a cache; the next caller just crawls
+
+
+def invalidate() -> None:
+    """Forget memoized crawls and the snapshot (call after changing links)."""
+    _MEMO.clear()
+    with contextlib.suppress(OSError):
+        SNAPSHOT_FILE.unlink()
+
+
+# ---------------------------------------------------------------------------
+# Crawl
+# ---------------------------------------------------------------------------
+
+
+def crawl_home(
+    home: Path | None = None,
+    *,
+    rules: Sequence[SkipRule] = DEFAULT_RULES,
+    max_depth: int | None = None,
+    snapshot: bool = False,
+    stats: CrawlStats | None = None,
+) -> Iterator[HomeLink]:
+    """Yield every symlink under ``home`` (default ``$HOME``), in walk order.
+
+    ``max_depth`` bounds how deep links are reported (top level = 1).
+    ``snapshot`` allows serving (and refreshing) the on-disk snapshot; only
+    honoured with ``DEFAULT_RULES``, since other rules crawl a different
+    set of directories.
+    """
+    home = home or Path.home()
+    stats = stats if stats is not None else CrawlStats()
+    rules = tuple(rules)
+    use_snapshot = snapshot and rules == DEFAULT_RULES
+
+    links: list[HomeLink] | None = None
+    for (memo_home, memo_rules, memo_depth), memo_links in _MEMO.items():
+        if (memo_home, memo_rules) == (home, rules) and (
+            memo_depth is None or (max_depth is not None and memo_depth >= max_depth)
+        ):
+            links = memo_links
+            break
+    if links is None and use_snapshot:
+        links = _load_snapshot(home, max_depth)
+    if links is not None:
+        stats.cached = True
+    else:
+        start = time.perf_counter()
+        links = _walk(home, rules, max_depth, stats)
+        stats.seconds = time.perf_counter() - start
+        if use_snapshot:
+            _save_snapshot(home, max_depth, links)
+    _MEMO[(home, rules, max_depth)] = links
+
+    for link in links:
+        if max_depth is None or link.depth <= max_depth:
+            yield link
@@ -29,27 +29,29 @@ Usage::
 from __future__ import annotations
 
 import hashlib
-import json
 import os
 import shutil
 import subprocess
 import sys
 import time
 from dataclasses import dataclass, field
-from datetime import datetime
 from pathlib import Path
 
 import click
 
+from dotfiles_scripts.home_crawl import crawl_home, invalidate
 from dotfiles_scripts.setup_utils import (
     DROPBOX_DIR,
     PRIVATE_DOTFILES,
     gdrive_candidates,
+    journal_path,
     print_error,
     print_header,
     print_step,
     print_success,
     print_warning,
+    read_journal,
+    write_journal,
 )
 
 # Where the migrated data lives on Google Drive.
@@ -236,19 +238,6 @@ def _atomic_relink(symlink: Path, target: Path) -> None:
     os.symlink(target, symlink)
 
 
-def _journal_path() -> Path:
-    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-    return Path(f"/tmp/migrate-to-gdrive-{ts}.log")
-
-
-def _write_journal(path: Path, entries: list[dict[str, str]]) -> None:
-    path.write_text(json.dumps(entries, indent=2))
-
-
-def _read_journal(path: Path) -> list[dict[str, str]]:
-    return json.loads(path.read_text())
-
-
 def _rewrite_home_symlinks(
     old_root: Path, new_via: Path, journal: list[dict[str, str]]
 ) -> int:
@@ -263,67 +252,30 @@ def _rewrite_home_symlinks(
     old_resolved = old_root.resolve()
     count = 0
 
-    # Find every symlink under $HOME that resolves into the old cloud source.
-    # Earlier we restricted to top-level + ~/.config, which missed
-    # ~/.claude/{agents,commands,skills}, ~/projects/*/mise.toml, etc. Now we
-    # actually search — but skip dirs that can't possibly contain
-    # cloud-pointing symlinks (Library/, node_modules, .venv, .git, prior
-    # backup dirs from setup runs).
-    #
-    # ``Dropbox`` is in skip_names because descending into ~/Dropbox finds
-    # symlinks INSIDE the cloud source itself (e.g.
+    # Find every symlink under $HOME that resolves into the old cloud source,
+    # via the shared crawl (``home_crawl``). Earlier we restricted to
+    # top-level + ~/.config, which missed ~/.claude/{agents,commands,skills},
+    # ~/projects/*/mise.toml, etc. The crawl's default rules skip dirs that
+    # can't contain cloud-pointing symlinks (Library/, node_modules, .venv,
+    # prior backup dirs from setup runs) and ``Dropbox``: descending into
+    # ~/Dropbox finds symlinks INSIDE the cloud source itself (e.g.
     # ~/Dropbox/dotfiles/home/.claude/skills/agent-browser), and rewriting
     # those corrupts the source tree with broken targets pointing at the new
-    # repo. We additionally skip any directory whose resolved path equals
-    # ``old_resolved`` so callers passing a non-Dropbox source root are
-    # protected too.
-    skip_names = {
-        "Library",
-        "Dropbox",
-        "node_modules",
-        ".venv",
-        "venv",
-        ".git",
-        "__pycache__",
-        ".cache",
-    }
-
-    def walk(d: Path) -> "list[Path]":
-        out: list[Path] = []
-        try:
-            entries = list(d.iterdir())
-        except (OSError, PermissionError):
-            return out
-        for entry in entries:
-            name = entry.name
-            if name in skip_names or name.endswith(".bck") or ".bck." in name:
-                continue
-            # Path-equality skip: if an entry resolves to the cloud source
-            # itself, don't descend (otherwise we'd walk into the source we're
-            # migrating away from and rewrite its internal symlinks).
-            try:
-                if entry.is_dir() and not entry.is_symlink() and entry.resolve() == old_resolved:
-                    continue
-            except OSError:
-                pass
-            if entry.is_symlink():
-                out.append(entry)
-            elif entry.is_dir():
-                out.extend(walk(entry))
-        return out
-
-    candidates = walk(home)
-    for path in candidates:
-        if not path.is_symlink():
+    # repo. Links inside ``old_root`` are dropped here too, so callers
+    # passing a non-Dropbox source root are protected as well.
+    # Materialized up front: relinking below must not race the crawl.
+    for link in list(crawl_home(home, snapshot=True)):
+        path = link.path
+        if not _is_subpath(link.resolved, old_resolved):
             continue
-        try:
-            link_target = Path(os.readlink(path))
-        except OSError:
+        if _is_subpath(path, old_root) or _is_subpath(path, old_resolved):
             continue
+        # The crawl may come from a snapshot; retarget what's on disk now.
         try:
-            link_resolved = path.resolve(strict=False)
+            link_target = path.readlink()
         except OSError:
             continue
+        link_resolved = path.resolve()
         if not _is_subpath(link_resolved, old_resolved):
             continue
         suffix = link_resolved.relative_to(old_resolved)
@@ -337,6 +289,8 @@ def _rewrite_home_symlinks(
         )
         _atomic_relink(path, new_target)
         count += 1
+    if count:
+        invalidate()
     return count
 
 
@@ -454,7 +408,7 @@ def _build_plan() -> MigrationPlan | None:
 
 def _run_apply(plan: MigrationPlan, *, prefer_gdrive: bool, prefer_dropbox: bool) -> int:
     journal_entries: list[dict[str, str]] = []
-    journal = _journal_path()
+    journal = journal_path("migrate-to-gdrive")
 
     print_header("Applying migration")
 
@@ -502,7 +456,7 @@ def _run_apply(plan: MigrationPlan, *, prefer_gdrive: bool, prefer_dropbox: bool
     rewritten = _rewrite_home_symlinks(old_pointer, PRIVATE_DOTFILES, journal_entries)
     print_step(f"Rewrote {rewritten} home-directory symlinks via {PRIVATE_DOTFILES}")
 
-    _write_journal(journal, journal_entries)
+    write_journal(journal, journal_entries)
     print_success(f"Journal written to {journal}")
     print_success("Migration complete. To undo: migrate-to-gdrive --rollback " + str(journal))
     return 0
@@ -510,7 +464,7 @@ def _run_apply(plan: MigrationPlan, *, prefer_gdrive: bool, prefer_dropbox: bool
 
 def _run_rollback(journal: Path) -> int:
     print_header(f"Rolling back from {journal}")
-    entries = _read_journal(journal)
+    entries = read_journal(journal)
     for entry in reversed(entries):
         symlink = Path(entry["symlink"])
         old_target = entry.get("old_target") or ""
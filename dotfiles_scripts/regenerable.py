@@ -0,0 +1,118 @@
+"""Find regenerable directories (build output, caches, virtualenvs) in a tree.
+
+Shared by ``detach-cloud-cache`` (which moves them out of the cloud tree)
+and ``dotfiles-doctor`` (which reports them). A directory is regenerable
+when any of these holds:
+
+* its name is one of the caller's fixed names (``node_modules``, ``.venv``…),
+* it contains a marker file: ``CACHEDIR.TAG`` (the cache directory tagging
+  convention, honoured by cargo, pip, ccache and others) or ``pyvenv.cfg``
+  (any virtualenv, whatever it's called),
+* its name is a common output directory *and* a sibling file shows which
+  build tool produced it: ``target/`` beside ``Cargo.toml``, ``dist/`` or
+  ``build/`` beside ``package.json``, and so on (``SIBLING_MARKERS``).
+  Without that sibling the name alone is too common to trust.
+
+Every rule works from directory listings the caller already has, so
+detection adds no I/O to a walk. ``rank_by_size`` sizes all the matches
+in one ``disk_usage`` walk.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Collection
+from dataclasses import dataclass
+from pathlib import Path
+
+from dotfiles_scripts.disk_usage import dir_sizes
+
+# Files whose presence inside a directory marks the directory regenerable.
+CONTENT_MARKERS: dict[str, str] = {
+    "CACHEDIR.TAG": "cache dir (CACHEDIR.TAG)",
+    "pyvenv.cfg": "virtualenv (pyvenv.cfg)",
+}
+
+# Output directory name → sibling files (any one) naming the tool that
+# regenerates it.
+SIBLING_MARKERS: dict[str, tuple[str, ...]] = {
+    "target": ("Cargo.toml", "pom.xml"),
+    "dist": ("package.json", "pyproject.toml", "setup.py"),
+    "build": ("package.json", "pyproject.toml", "setup.py", "build.gradle", "build.gradle.kts"),
+    ".gradle": ("build.gradle", "build.gradle.kts", "settings.gradle"),
+    ".dart_tool": ("pubspec.yaml",),
+    ".build": ("Package.swift",),
+}
+
+
+@dataclass(frozen=True)
+class Regenerable:
+    """A directory that can be deleted and rebuilt, and why we think so."""
+
+    path: Path
+    reason: str
+
+
+def match_name(name: str, siblings: Collection[str], names: Collection[str]) -> str | None:
+    """Why directory ``name`` is regenerable, judging by its parent's listing.
+
+    ``siblings`` are the names in that listing (the directory's own name
+    included); ``names`` the fixed names always treated as regenerable.
+    Returns None if nothing matches.
+    """
+    if name in names:
+        return f"name ({name})"
+    for marker in SIBLING_MARKERS.get(name, ()):
+        if marker in siblings:
+            return f"{name}/ beside {marker}"
+    return None
+
+
+def match_contents(children: Collection[str]) -> str | None:
+    """Why a directory listing ``children`` is regenerable, judging by marker files."""
+    for marker, reason in CONTENT_MARKERS.items():
+        if marker in children:
+            return reason
+    return None
+
+
+def find_regenerable(root: Path, names: Collection[str]) -> list[Regenerable]:
+    """Every regenerable directory under ``root``, in walk order.
+
+    One ``os.scandir`` per directory; symlinks are never followed and
+    matches aren't descended into (nothing regenerable nests usefully
+    inside another).
+    """
+    found: list[Regenerable] = []
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        listing = [e.name for e in entries]
+        if directory != root:
+            reason = match_contents(listing)
+            if reason is not None:
+                found.append(Regenerable(directory, reason))
+                continue
+        subdirs: list[Path] = []
+        for entry in entries:
+            if entry.is_symlink() or not entry.is_dir(follow_symlinks=False):
+                continue
+            reason = match_name(entry.name, listing, names)
+            if reason is not None:
+                found.append(Regenerable(Path(entry.path), reason))
+            else:
+                subdirs.append(Path(entry.path))
+        # Reversed so the stack pops them in name order.
+        stack.extend(reversed(subdirs))
+    return found
+
+
+def rank_by_size(found: list[Regenerable]) -> list[tuple[Regenerable, int]]:
+    """``found`` paired with sizes, largest first."""
+    sizes = dir_sizes(r.path for r in found)
+    return sorted(((r, sizes[r.path]) for r in found), key=lambda pair: -pair[1])
@@ -0,0 +1,295 @@
+"""Cold-storage bundles for old files in a runtime-bucket mirror.
+
+Used by ``sync_private_runtime`` for ``~/.claude/projects``: conversation
+JSONL files stop changing once a session ends, yet every sync tick still
+stats each one on both sides. Files whose whole calendar month is older
+than the cutoff are packed into one ``<YYYY-MM>.tar.gz`` per month in an
+archive directory inside the bucket, and their live mirror copies are
+removed. The local originals are left in place.
+
+An ``index.json`` next to the bundles maps each archived relpath to its
+bundle and the (size, mtime) it was archived at. The sync treats an
+archived file as out of scope only while the local copy still has that
+size and mtime (or is gone), so a session that is resumed and appended to
+goes back into the live set automatically and is re-archived later.
+
+Bundles are gzip'd tarballs: the stdlib has no zstd before Python 3.14.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import stat
+import tarfile
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import cast
+
+INDEX_NAME = "index.json"
+
+
+@dataclass
+class ArchiveResult:
+    """What one ``archive_old_files`` call packed."""
+
+    bundles: list[str] = field(default_factory=list)
+    files: int = 0
+    bytes: int = 0
+    removed: int = 0
+
+
+@dataclass(frozen=True)
+class ArchivedFile:
+    """One index entry: where a file went and what it looked like then."""
+
+    bundle: str
+    size: int
+    mtime: int  # whole seconds, like the sync's quick check
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+
+def load_index(archive_dir: Path) -> dict[str, ArchivedFile]:
+    """relpath → ``ArchivedFile``; empty if the index is missing or unreadable."""
+    try:
+        with (archive_dir / INDEX_NAME).open("r", encoding="utf-8") as f:
+            data: object = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    files = cast("dict[str, object]", data).get("files") if isinstance(data, dict) else None
+    if not isinstance(files, dict):
+        return {}
+    index: dict[str, ArchivedFile] = {}
+    for rel, raw in cast("dict[str, object]", files).items():
+        if not isinstance(raw, dict):
+            continue
+        entry = cast("dict[str, object]", raw)
+        bundle, size, mtime = entry.get("bundle"), entry.get("size"), entry.get("mtime")
+        if isinstance(bundle, str) and isinstance(size, int) and isinstance(mtime, int):
+            index[rel] = ArchivedFile(bundle, size, mtime)
+    return index
+
+
+def _save_index(archive_dir: Path, index: dict[str, ArchivedFile]) -> None:
+    payload = {
+        "files": {
+            rel: {"bundle": a.bundle, "size": a.size, "mtime": a.mtime}
+            for rel, a in sorted(index.items())
+        }
+    }
+    tmp = archive_dir / f".{INDEX_NAME}.tmp"
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=1, sort_keys=True)
+    tmp.replace(archive_dir / INDEX_NAME)
+
+
+def _matches(st: os.stat_result, archived: ArchivedFile) -> bool:
+    return st.st_size == archived.size and int(st.st_mtime) == archived.mtime
+
+
+def archived_unchanged(index: dict[str, ArchivedFile], local_root: Path) -> frozenset[str]:
+    """Archived relpaths whose local copy is untouched since archiving (or absent).
+
+    These are the files the live sync should leave alone. One local
+    ``stat`` per archived file; the cloud side is never touched.
+    """
+    keep: set[str] = set()
+    for rel, archived in index.items():
+        try:
+            st = (local_root / rel).stat()
+        except FileNotFoundError:
+            keep.add(rel)
+            continue
+        except OSError:
+            continue
+        if _matches(st, archived):
+            keep.add(rel)
+    return frozenset(keep)
+
+
+# ---------------------------------------------------------------------------
+# Archive
+# ---------------------------------------------------------------------------
+
+
+def _month(mtime: float) -> str:
+    return datetime.fromtimestamp(mtime).strftime("%Y-%m")
+
+
+def _month_end(month: str) -> float:
+    """Epoch of the first instant after ``month`` (local time)."""
+    year, mon = (int(x) for x in month.split("-"))
+    year, mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    return datetime(year, mon, 1).timestamp()
+
+
+def _candidates(
+    local_root: Path,
+    index: dict[str, ArchivedFile],
+    cutoff: float,
+    exclude: Callable[[str], bool],
+) -> dict[str, list[tuple[str, os.stat_result]]]:
+    """Unarchived local files grouped by month, for months ending before ``cutoff``."""
+    by_month: dict[str, list[tuple[str, os.stat_result]]] = {}
+    for dirpath, dirnames, filenames in os.walk(local_root):
+        dirnames[:] = sorted(d for d in dirnames if not exclude(d))
+        here = Path(dirpath)
+        base = here.relative_to(local_root)
+        for name in sorted(filenames):
+            if exclude(name):
+                continue
+            rel = (base / name).as_posix()
+            try:
+                st = (here / name).lstat()
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            archived = index.get(rel)
+            if archived is not None and _matches(st, archived):
+                continue
+            month = _month(st.st_mtime)
+            if _month_end(month) <= cutoff:
+                by_month.setdefault(month, []).append((rel, st))
+    return by_month
+
+
+def _bundle_name(archive_dir: Path, month: str) -> str:
+    """``<month>.tar.gz``, or ``<month>.<n>.tar.gz`` if files of that month show up again."""
+    name = f"{month}.tar.gz"
+    n = 1
+    while (archive_dir / name).exists():
+        n += 1
+        name = f"{month}.{n}.tar.gz"
+    return name
+
+
+def _write_bundle(
+    archive_dir: Path, name: str, local_root: Path, members: list[tuple[str, os.stat_result]]
+) -> None:
+    """Write the tarball to a temp file in ``archive_dir`` and rename it into place."""
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{name}.", dir=archive_dir)
+    os.close(fd)
+    tmp = Path(tmp_name)
+    try:
+        with tarfile.open(tmp, "w:gz") as tar:
+            for rel, _st in members:
+                tar.add(str(local_root / rel), arcname=rel, recursive=False)
+        tmp.replace(archive_dir / name)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            tmp.unlink()
+        raise
+
+
+def archive_old_files(
+    local_root: Path,
+    mirror_root: Path,
+    archive_dir: Path,
+    *,
+    older_than_days: int,
+    exclude: Callable[[str], bool],
+) -> ArchiveResult:
+    """Bundle ``local_root`` files from months older than the cutoff; prune the mirror.
+
+    Order matters for crash safety: bundle, then index, then mirror
+    deletions. An interruption leaves at worst a stray bundle or mirror
+    copies that the next run cleans up.
+    """
+    result = ArchiveResult()
+    if not local_root.is_dir():
+        return result
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    index = load_index(archive_dir)
+    cutoff = time.time() - older_than_days * 86400
+    by_month = _candidates(local_root, index, cutoff, exclude)
+
+    for month in sorted(by_month):
+        members = by_month[month]
+        name = _bundle_name(archive_dir, month)
+        _write_bundle(archive_dir, name, local_root, members)
+        for rel, st in members:
+            index[rel] = ArchivedFile(name, st.st_size, int(st.st_mtime))
+            result.bytes += st.st_size
+        result.files += len(members)
+        result.bundles.append(name)
+    if result.bundles:
+        _save_index(archive_dir, index)
+
+    for rel in archived_unchanged(index, local_root):
+        with contextlib.suppress(FileNotFoundError):
+            (mirror_root / rel).unlink()
+            result.removed += 1
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Restore
+# ---------------------------------------------------------------------------
+
+
+def _safe_member(member: tarfile.TarInfo) -> bool:
+    """Regular files with relative, non-escaping names only."""
+    parts = Path(member.name).parts
+    return member.isfile() and not Path(member.name).is_absolute() and ".." not in parts
+
+
+def restore_month(archive_dir: Path, month: str, local_root: Path) -> tuple[int, int]:
+    """Unpack every bundle of ``month`` into ``local_root``.
+
+    Files that exist locally with an mtime at least as new as the archived
+    one are left alone. Returns ``(restored, skipped)``.
+    """
+    bundles = sorted(archive_dir.glob(f"{month}.tar.gz")) + sorted(
+        archive_dir.glob(f"{month}.*.tar.gz")
+    )
+    if not bundles:
+        raise FileNotFoundError(f"no archive bundle for {month} in {archive_dir}")
+    restored = skipped = 0
+    for bundle in bundles:
+        with tarfile.open(bundle, "r:gz") as tar:
+            for member in tar:
+                if not _safe_member(member):
+                    skipped += 1
+                    continue
+                dest = local_root / member.name
+                try:
+                    if int(dest.stat().st_mtime) >= int(member.mtime):
+                        skipped += 1
+                        continue
+                except FileNotFoundError:
+                    pass
+                src = tar.extractfile(member)
+                if src is None:
+                    skipped += 1
+                    continue
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_name = tempfile.mkstemp(prefix=f".{dest.name}.", dir=dest.parent)
+                tmp = Path(tmp_name)
+                try:
+                    with os.fdopen(fd, "wb") as out:
+                        while chunk := src.read(1024 * 1024):
+                            out.write(chunk)
+                    tmp.chmod(member.mode & 0o7777)
+                    os.utime(tmp, (member.mtime, member.mtime))
+                    tmp.replace(dest)
+                except BaseException:
+                    with contextlib.suppress(OSError):
+                        tmp.unlink()
+                    raise
+                restored += 1
+    return restored, skipped
+
+
+def list_months(archive_dir: Path) -> list[str]:
+    """Months that have at least one bundle, oldest first."""
+    return sorted({p.name.split(".", 1)[0] for p in archive_dir.glob("*.tar.gz")})
@@ -11,21 +11,24 @@ behind it. The filename is kept as ``setup_dropbox.py`` so the registered
 
 from __future__ import annotations
 
+import os
 import platform
 import subprocess
 import sys
+from collections.abc import Mapping, Sequence
 from pathlib import Path
 
-import yaml
-
+from dotfiles_scripts.home_crawl import crawl_home
 from dotfiles_scripts.setup_device_id import get_device_id, get_hierarchy_levels
 from dotfiles_scripts.setup_utils import (
+    DOTFILES_YAML,
     DROPBOX_DIR,
     PRIVATE_DOTFILES,
     SKIP_FILES,
     create_symlink,
     ensure_private_dotfiles_symlink,
     get_private_dotfiles,
+    load_dotfiles_yaml,
     print_header,
     print_step,
     print_success,
@@ -33,9 +36,6 @@ from dotfiles_scripts.setup_utils import (
     symlink_home_dir,
 )
 
-# Config file for directory-specific settings
-DOTFILES_CONFIG = ".dotfiles.yaml"
-
 
 def is_mac() -> bool:
     return platform.system() == "Darwin"
@@ -81,7 +81,7 @@ def setup_wsl_dropbox() -> None:
         print_warning(f"Could not setup WSL Dropbox: {e}")
 
 
-def apply_chmod_config(directory: Path, chmod_config: dict[int | str, str | list[str]]) -> int:
+def apply_chmod_config(directory: Path, chmod_config: Mapping[str, Sequence[str]]) -> int:
     """Apply chmod settings from a .dotfiles.yaml config.
 
     Format:
@@ -95,14 +95,11 @@ def apply_chmod_config(directory: Path, chmod_config: dict[int | str, str | list
     count = 0
     for mode_str, globs in chmod_config.items():
         try:
-            mode = int(str(mode_str), 8)
+            mode = int(mode_str, 8)
         except ValueError:
             print_warning(f"Invalid mode: {mode_str}")
             continue
 
-        if isinstance(globs, str):
-            globs = [globs]
-
         for pattern in globs:
             # Handle "." specially - chmod the directory itself
             if pattern == ".":
@@ -132,23 +129,21 @@ def apply_chmod_config(directory: Path, chmod_config: dict[int | str, str | list
 
 
 def fix_permissions(home_dir: Path) -> None:
-    """Apply permissions based on .dotfiles.yaml config files."""
+    """Apply permissions based on .dotfiles.yaml config files.
+
+    Configs come from ``load_dotfiles_yaml``, so the ones ``symlink_home_dir``
+    just read aren't parsed a second time.
+    """
     print_step("Applying permissions from .dotfiles.yaml configs...")
 
     total = 0
-    for config_file in home_dir.rglob(DOTFILES_CONFIG):
-        try:
-            config: dict[str, dict[int | str, str | list[str]]] = (
-                yaml.safe_load(config_file.read_text()) or {}
-            )
-        except yaml.YAMLError as e:
-            print_warning(f"Invalid YAML in {config_file}: {e}")
+    for dirpath, dirnames, filenames in os.walk(home_dir):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_FILES]
+        if DOTFILES_YAML not in filenames:
             continue
-
-        chmod_config = config.get("chmod")
+        chmod_config = load_dotfiles_yaml(Path(dirpath)).chmod
         if chmod_config:
-            count = apply_chmod_config(config_file.parent, chmod_config)
-            total += count
+            total += apply_chmod_config(Path(dirpath), chmod_config)
 
     if total:
         print_success(f"Applied chmod to {total} path(s)")
@@ -157,41 +152,22 @@ def fix_permissions(home_dir: Path) -> None:
 
 
 def check_stale_symlinks(home_dir: Path) -> None:
-    """Warn about symlinks pointing to removed cloud dotfiles."""
+    """Warn about symlinks pointing to removed cloud dotfiles.
+
+    Looks at dot-named entries of $HOME and everything below dot-named
+    directories, filtered from the shared ``home_crawl`` walk.
+    """
     print_step("Checking for stale symlinks...")
 
     home = Path.home()
     stale: list[Path] = []
-
-    def check_dir(directory: Path) -> None:
-        """Recursively check for stale symlinks."""
-        try:
-            for path in directory.iterdir():
-                if path.is_symlink():
-                    # Check if symlink points into the cloud dotfiles tree but target is gone
-                    try:
-                        target_str = str(path.readlink())
-                    except OSError:
-                        continue
-                    if str(home_dir) in target_str and not path.exists():
-                        stale.append(path)
-                elif path.is_dir() and not path.is_symlink():
-                    # Only recurse into real directories, not symlinked ones
-                    check_dir(path)
-        except PermissionError:
-            pass
-
-    # Check common dotfile locations
-    for item in home.iterdir():
-        if item.name.startswith(".") and item.is_symlink():
-            try:
-                target_str = str(item.readlink())
-            except OSError:
-                continue
-            if str(home_dir) in target_str and not item.exists():
-                stale.append(item)
-        elif item.name.startswith(".") and item.is_dir() and not item.is_symlink():
-            check_dir(item)
+    for link in crawl_home(home, snapshot=True):
+        if not link.path.relative_to(home).parts[0].startswith("."):
+            continue
+        # Points into the cloud dotfiles tree but the target is gone. Existence
+        # is re-checked: the crawl may come from a snapshot.
+        if str(home_dir) in link.target and not link.path.exists():
+            stale.append(link.path)
 
     if stale:
         print_warning(f"Found {len(stale)} stale symlink(s) pointing to removed cloud files:")
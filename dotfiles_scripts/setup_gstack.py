@@ -35,8 +35,6 @@ idempotent).
 
 from __future__ import annotations
 
-import contextlib
-import os
 import shutil
 import subprocess
 import sys
@@ -44,6 +42,7 @@ from pathlib import Path
 
 import click
 
+from dotfiles_scripts.disk_usage import dir_size
 from dotfiles_scripts.setup_utils import (
     PRIVATE_DOTFILES,
     print_error,
@@ -108,7 +107,7 @@ def _clean_pollution() -> None:
     # 1. The 1 GB stale gstack source under skills/gstack/ — gstack now lives at ~/gstack.
     stale_gstack = DOTFILES_SKILLS_DIR / "gstack"
     if stale_gstack.exists() and not stale_gstack.is_symlink():
-        size_mb = _dir_size_mb(stale_gstack)
+        size_mb = dir_size(stale_gstack) // (1024 * 1024)
         print_step(f"removing stale gstack source: {stale_gstack} (~{size_mb} MB)")
         shutil.rmtree(stale_gstack)
         print_success("removed stale gstack source")
@@ -131,15 +130,6 @@ def _clean_pollution() -> None:
     print_success(f"removed {len(shadows)} shadow dir(s)")
 
 
-def _dir_size_mb(p: Path) -> int:
-    total = 0
-    for root, _dirs, files in os.walk(p, followlinks=False):
-        for name in files:
-            with contextlib.suppress(OSError):
-                total += (Path(root) / name).stat().st_size
-    return total // (1024 * 1024)
-
-
 # ---------------------------------------------------------------------------
 # Split ~/.claude/skills
 # ---------------------------------------------------------------------------
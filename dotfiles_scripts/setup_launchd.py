@@ -5,6 +5,12 @@ Each ``home/Library/LaunchAgents/*.plist`` file in the repo is symlinked to
 ``~/Library/LaunchAgents/`` by the regular home-symlink walk. This module
 makes sure they're also *loaded* (so the schedules actually run) and
 re-loaded if their content changed since the last run.
+
+Agents listed in ``OPT_IN_AGENTS`` ship with ``Disabled`` set, so launchd
+doesn't start them at login by itself. They're loaded (``load -w``, which
+overrides ``Disabled``) only when their config key is ``1`` in
+``.dotfiles-config``; otherwise they're unloaded with ``-w`` so they stay
+disabled, and turning a key off takes effect on the next setup run.
 """
 
 from __future__ import annotations
@@ -19,11 +25,18 @@ from dotfiles_scripts.setup_utils import (
     print_step,
     print_success,
     print_warning,
+    read_dotfiles_config,
 )
 
 LAUNCH_AGENTS_DIR = Path.home() / "Library" / "LaunchAgents"
 DOTFILES_LABEL_PREFIX = "com.dotfiles-private."
 
+# label → ``.dotfiles-config`` key that must be "1" for the agent to load.
+# The symlink watcher keeps a process resident, so it isn't on by default.
+OPT_IN_AGENTS = {
+    "com.dotfiles-private.symlink-watch": "SYMLINK_WATCH",
+}
+
 
 def _is_mac() -> bool:
     return platform.system() == "Darwin"
@@ -55,6 +68,21 @@ def _load_plist(plist: Path) -> bool:
     return True
 
 
+def _opted_in(label: str) -> bool:
+    key = OPT_IN_AGENTS.get(label)
+    return key is None or (read_dotfiles_config(key) or "").strip() == "1"
+
+
+def _unload_plist(plist: Path) -> None:
+    # -w records the agent as disabled, so launchd won't load it at login.
+    subprocess.run(
+        ["launchctl", "unload", "-w", str(plist)],
+        check=False,
+        capture_output=True,
+    )
+    print_step(f"skipped LaunchAgent: {plist.stem} (set {OPT_IN_AGENTS[plist.stem]}=1 to enable)")
+
+
 def main() -> int:
     """Main entry point."""
     print_header("Loading LaunchAgents")
@@ -72,7 +100,10 @@ def main() -> int:
         print_step("No dotfiles LaunchAgents found")
         return 0
     for plist in plists:
-        _load_plist(plist)
+        if _opted_in(plist.stem):
+            _load_plist(plist)
+        else:
+            _unload_plist(plist)
     return 0
 
 
@@ -2,14 +2,25 @@
 
 from __future__ import annotations
 
+import contextlib
+import heapq
+import json
+import os
 import platform
 import re
 import subprocess
 import sys
+import threading
+import time
+from collections.abc import Callable, Collection, Iterable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any, cast
 
+from dotfiles_scripts.symlink_state import SymlinkStateCache, yaml_digest
+
 
 def is_mac() -> bool:
     """True on macOS (Darwin)."""
@@ -132,6 +143,43 @@ def get_backup_dir() -> Path:
     return _backup_dir
 
 
+# ---------------------------------------------------------------------------
+# Undo journals
+# ---------------------------------------------------------------------------
+#
+# A journal is a JSON list of string→string entries, oldest first, that a
+# command's ``--rollback`` replays in reverse. Symlink entries carry
+# ``symlink``/``old_target``/``new_target`` (an empty ``old_target`` means
+# the link was created and rollback removes it); ``apply_symlink_plan``
+# adds ``action: backup`` (``path`` moved to ``backup``) and ``action:
+# mkdir`` entries.
+
+
+def journal_path(command: str) -> Path:
+    """A fresh ``/tmp/<command>-<timestamp>.log`` path for one run's journal.
+
+    Gets a ``.<n>`` suffix if a run in the same second already wrote one.
+    """
+    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = Path(f"/tmp/{command}-{ts}.log")
+    n = 1
+    while path.exists():
+        n += 1
+        path = Path(f"/tmp/{command}-{ts}.{n}.log")
+    return path
+
+
+def write_journal(path: Path, entries: list[dict[str, str]]) -> None:
+    """Write ``entries`` to ``path`` atomically (temp file + rename)."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(entries, indent=2))
+    tmp.replace(path)
+
+
+def read_journal(path: Path) -> list[dict[str, str]]:
+    return json.loads(path.read_text())
+
+
 def print_header(msg: str) -> None:
     """Print a section header."""
     print(f"\n{'='*60}")
@@ -216,23 +264,115 @@ SKIP_FILES = {
 SKIP_SUFFIXES = (".pyc", ".pyo", ".egg-info")
 
 
-def _read_dotfiles_yaml(directory: Path) -> dict[str, Any]:
-    """Read ``.dotfiles.yaml`` from ``directory``; return an empty dict on miss."""
+@dataclass(frozen=True)
+class DotfilesYaml:
+    """Typed view of one directory's ``.dotfiles.yaml``.
+
+    Malformed entries are dropped here so consumers only see well-typed
+    values:
+
+    * ``symlinks`` — home-side name → ``use:`` template (may contain
+      ``${device_id}``); see ``_resolve_symlinks_directives``.
+    * ``exclude`` — device id → names excluded on that device.
+    * ``chmod`` — octal mode string → globs; see
+      ``setup_dropbox.apply_chmod_config``.
+    """
+
+    symlinks: dict[str, str] = field(default_factory=dict)
+    exclude: dict[str, tuple[str, ...]] = field(default_factory=dict)
+    chmod: dict[str, tuple[str, ...]] = field(default_factory=dict)
+
+
+_EMPTY_DOTFILES_YAML = DotfilesYaml()
+
+# Parsed configs by file path, tagged with the (mtime_ns, size) they were
+# parsed at. The walker, its exclude handling, and setup_dropbox's chmod
+# pass all ask for the same files; each is parsed once per process.
+_DOTFILES_YAML_CACHE: dict[Path, tuple[tuple[int, int], DotfilesYaml]] = {}
+
+
+def _str_list(raw: object) -> tuple[str, ...]:
+    if isinstance(raw, str):
+        return (raw,)
+    if isinstance(raw, list):
+        return tuple(x for x in cast("list[object]", raw) if isinstance(x, str))
+    return ()
+
+
+def _parse_dotfiles_yaml(loaded: object) -> DotfilesYaml:
+    if not isinstance(loaded, dict):
+        return _EMPTY_DOTFILES_YAML
+    data = cast("dict[object, object]", loaded)
+    symlinks: dict[str, str] = {}
+    raw_symlinks = data.get("symlinks")
+    if isinstance(raw_symlinks, dict):
+        for home_name, spec in cast("dict[object, object]", raw_symlinks).items():
+            if not isinstance(home_name, str) or not isinstance(spec, dict):
+                continue
+            use = cast("dict[object, object]", spec).get("use")
+            if isinstance(use, str):
+                symlinks[home_name] = use
+    exclude: dict[str, tuple[str, ...]] = {}
+    raw_exclude = data.get("exclude")
+    if isinstance(raw_exclude, dict):
+        for device, names in cast("dict[object, object]", raw_exclude).items():
+            if isinstance(device, str) and isinstance(names, list):
+                exclude[device] = _str_list(names)
+    chmod: dict[str, tuple[str, ...]] = {}
+    raw_chmod = data.get("chmod")
+    if isinstance(raw_chmod, dict):
+        # YAML reads ``600:`` as the int 600; keep the digits as written.
+        for mode, globs in cast("dict[object, object]", raw_chmod).items():
+            chmod[str(mode)] = _str_list(globs)
+    return DotfilesYaml(symlinks, exclude, chmod)
+
+
+def load_dotfiles_yaml(directory: Path) -> DotfilesYaml:
+    """Parsed ``directory/.dotfiles.yaml``; empty when missing or unreadable.
+
+    Memoized per process by path and (mtime, size), and parsed with
+    PyYAML's C loader when libyaml is available.
+    """
     config_file = directory / DOTFILES_YAML
-    if not config_file.is_file():
-        return {}
+    try:
+        st = config_file.stat()
+    except OSError:
+        return _EMPTY_DOTFILES_YAML
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _DOTFILES_YAML_CACHE.get(config_file)
+    if cached is not None and cached[0] == key:
+        return cached[1]
     try:
         import yaml
-
-        loaded = yaml.safe_load(config_file.read_text())
-    except (yaml.YAMLError, ImportError, OSError) as exc:
+    except ImportError as exc:
         print_warning(f"Could not read {config_file}: {exc}")
-        return {}
-    return loaded if isinstance(loaded, dict) else {}
+        return _EMPTY_DOTFILES_YAML
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        parsed = _parse_dotfiles_yaml(yaml.load(config_file.read_text(), Loader=loader))
+    except OSError as exc:
+        print_warning(f"Could not read {config_file}: {exc}")
+        parsed = _EMPTY_DOTFILES_YAML
+    except yaml.YAMLError as exc:
+        print_warning(f"Invalid YAML in {config_file}: {exc}")
+        parsed = _EMPTY_DOTFILES_YAML
+    _DOTFILES_YAML_CACHE[config_file] = (key, parsed)
+    return parsed
+
+
+def _scan_dir(directory: Path) -> list[os.DirEntry[str]]:
+    """One ``scandir`` of ``directory``, sorted by name.
+
+    The entries carry the file type from the directory read itself, so
+    ``is_dir``/``is_symlink`` on them cost no further syscalls (except
+    ``is_dir`` on a symlink, which has to follow it).
+    """
+    with os.scandir(directory) as it:
+        return sorted(it, key=lambda e: e.name)
 
 
 def _resolve_symlinks_directives(
-    directory: Path, device_id: str
+    directory: Path, device_id: str, names: Collection[str]
 ) -> tuple[dict[str, str], set[str]]:
     """Parse the ``symlinks:`` block of ``directory/.dotfiles.yaml``.
 
@@ -241,8 +381,8 @@ def _resolve_symlinks_directives(
     * ``active`` maps the home-side filename to the repo-side filename for
       the current device. Each entry overrides the default same-name
       symlinking for that one file.
-    * ``variants`` is the set of filenames in ``directory`` that match any
-      ``use:`` template (treating ``${device_id}`` as a wildcard). The
+    * ``variants`` is the set of ``names`` (the directory's listing) that
+      match any ``use:`` template (treating ``${device_id}`` as a wildcard). The
       walker should skip these during normal iteration so other devices'
       copies do not get auto-symlinked into ``$HOME``.
 
@@ -252,32 +392,22 @@ def _resolve_symlinks_directives(
           manifest.toml:
             use: manifest.toml.${device_id}
     """
-    config = _read_dotfiles_yaml(directory)
-    raw = config.get("symlinks")
-    if not isinstance(raw, dict):
-        return {}, set()
-
+    symlinks = load_dotfiles_yaml(directory).symlinks
     active: dict[str, str] = {}
     variants: set[str] = set()
 
-    for home_name, spec in raw.items():
-        if not isinstance(home_name, str) or not isinstance(spec, dict):
-            continue
-        use_template = spec.get("use")
-        if not isinstance(use_template, str):
-            continue
-
+    for home_name, use_template in symlinks.items():
         active[home_name] = use_template.replace("${device_id}", device_id)
 
         if "${device_id}" in use_template:
             prefix, _, suffix = use_template.partition("${device_id}")
-            for f in directory.iterdir():
-                if (
-                    f.name.startswith(prefix)
-                    and f.name.endswith(suffix)
-                    and len(f.name) > len(prefix) + len(suffix)
-                ):
-                    variants.add(f.name)
+            variants.update(
+                name
+                for name in names
+                if name.startswith(prefix)
+                and name.endswith(suffix)
+                and len(name) > len(prefix) + len(suffix)
+            )
         else:
             variants.add(use_template)
 
@@ -299,14 +429,7 @@ def _resolve_excludes(directory: Path, device_id: str) -> set[str]:
     """
     if not device_id:
         return set()
-    config = _read_dotfiles_yaml(directory)
-    raw = config.get("exclude")
-    if not isinstance(raw, dict):
-        return set()
-    names = raw.get(device_id)
-    if not isinstance(names, list):
-        return set()
-    return {name for name in names if isinstance(name, str)}
+    return set(load_dotfiles_yaml(directory).exclude.get(device_id, ()))
 
 
 def _read_device_id() -> str:
@@ -456,111 +579,707 @@ def get_private_repo_gh() -> str:
     return value
 
 
-def create_symlink(source: Path, target: Path, backup_dir: Path | None = None) -> bool:
-    """Create a symlink, backing up existing files if needed."""
-    # Don't create broken symlinks
+# ---------------------------------------------------------------------------
+# Symlink plan / apply
+# ---------------------------------------------------------------------------
+
+# Actions a SymlinkAction can carry. "ok" is the no-op (already linked);
+# "missing" is a source that doesn't exist and counts as a failure.
+SYMLINK_ACTIONS = ("ok", "link", "replace", "mkdir", "missing")
+
+
+@dataclass(frozen=True)
+class SymlinkAction:
+    """One planned step: make ``target`` (in $HOME) point at ``source``.
+
+    ``mkdir`` creates ``target`` as a real directory to recurse into;
+    ``replace`` backs up whatever is at ``target`` before linking.
+    """
+
+    source: Path
+    target: Path
+    action: str
+    detail: str = ""
+
+
+# How many of the slowest directories and link checks a WalkResult keeps.
+WALK_SLOWEST = 10
+
+
+@dataclass
+class WalkResult:
+    """What one tree's walk did and where its time went.
+
+    ``counts`` has one entry per ``SymlinkAction.action`` in the plan ("ok"
+    is the no-op). Directory times are each directory's own listing and
+    link checks, excluding its subdirectories. A link check is one
+    ``plan_symlink`` call: the stat/readlink/resolve round-trips that are
+    slow on a cloud mount.
+    """
+
+    tree: Path
+    counts: dict[str, int] = field(default_factory=lambda: dict.fromkeys(SYMLINK_ACTIONS, 0))
+    dirs: int = 0
+    cached_dirs: int = 0
+    cached_links: int = 0
+    plan_seconds: float = 0.0
+    apply_seconds: float = 0.0
+    success: bool = True
+    rolled_back: bool = False
+    # Min-heaps of (seconds, path), trimmed to WALK_SLOWEST.
+    _slow_dirs: list[tuple[float, str]] = field(default_factory=list, repr=False)
+    _slow_checks: list[tuple[float, str]] = field(default_factory=list, repr=False)
+    # Subtrees are planned on a thread pool; recording goes through the lock.
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _keep(self, heap: list[tuple[float, str]], seconds: float, path: Path) -> None:
+        with self._lock:
+            if len(heap) < WALK_SLOWEST:
+                heapq.heappush(heap, (seconds, str(path)))
+            elif seconds > heap[0][0]:
+                heapq.heapreplace(heap, (seconds, str(path)))
+
+    def record_dir(self, src_dir: Path, seconds: float, *, cached: int | None = None) -> None:
+        """One directory planned; ``cached`` is its link count if the cache vouched for it."""
+        with self._lock:
+            self.dirs += 1
+            if cached is not None:
+                self.cached_dirs += 1
+                self.cached_links += cached
+        self._keep(self._slow_dirs, seconds, src_dir)
+
+    def record_check(self, target: Path, seconds: float) -> None:
+        self._keep(self._slow_checks, seconds, target)
+
+    def count(self, plan: list[SymlinkAction]) -> None:
+        for step in plan:
+            self.counts[step.action] = self.counts.get(step.action, 0) + 1
+
+    def slowest_dirs(self) -> list[tuple[float, str]]:
+        return sorted(self._slow_dirs, reverse=True)
+
+    def slowest_checks(self) -> list[tuple[float, str]]:
+        return sorted(self._slow_checks, reverse=True)
+
+    def as_json(self) -> dict[str, object]:
+        """Plain-data form for ``--json`` output."""
+        return {
+            "tree": str(self.tree),
+            "success": self.success,
+            "rolled_back": self.rolled_back,
+            "counts": dict(self.counts),
+            "dirs": self.dirs,
+            "cached_dirs": self.cached_dirs,
+            "cached_links": self.cached_links,
+            "plan_seconds": round(self.plan_seconds, 4),
+            "apply_seconds": round(self.apply_seconds, 4),
+            "slowest_dirs": [
+                {"path": p, "seconds": round(t, 4)} for t, p in self.slowest_dirs()
+            ],
+            "slowest_checks": [
+                {"path": p, "seconds": round(t, 4)} for t, p in self.slowest_checks()
+            ],
+        }
+
+
+def _links_to(target: Path, source: Path) -> bool:
+    """True if ``target`` already reaches ``source``.
+
+    Compares the raw link text first, which is what a re-run almost always
+    finds; only falls back to ``resolve()`` (which walks every component,
+    slow on cloud-backed trees) for relative or indirect links.
+    """
+    try:
+        if target.readlink() == source:
+            return True
+    except OSError:
+        pass
+    return target.resolve() == source.resolve()
+
+
+def plan_symlink(source: Path, target: Path) -> SymlinkAction:
+    """Decide what linking ``target`` → ``source`` needs, without touching anything."""
     if not source.exists():
-        print_warning(f"Skipping {target.name}: source does not exist ({source})")
-        return False
+        return SymlinkAction(source, target, "missing", f"source does not exist ({source})")
+    if target.is_symlink():
+        if _links_to(target, source):
+            return SymlinkAction(source, target, "ok")
+        return SymlinkAction(source, target, "replace")
+    if target.exists():
+        # Already routed via a wholesale-symlinked ancestor: target itself
+        # isn't a symlink, but it resolves to the same file as source.
+        # Replacing it would rename the source out from under ourselves and
+        # then create a self-referential symlink in its place.
+        if target.resolve() == source.resolve():
+            return SymlinkAction(source, target, "ok")
+        return SymlinkAction(source, target, "replace")
+    return SymlinkAction(source, target, "link")
+
+
+def _backup_path(backup_dir: Path, target: Path) -> Path:
+    """Where ``target`` goes in ``backup_dir``: its path under $HOME, else its name."""
+    home = Path.home()
+    if home in target.parents:
+        return backup_dir / target.relative_to(home)
+    return backup_dir / target.name
+
+
+def _journal_entries(
+    plan: list[SymlinkAction], backup_dir: Path
+) -> tuple[list[dict[str, str]], list[Path]]:
+    """The journal for applying ``plan``, in apply order, and the dirs to create.
+
+    Backups come first, then every directory the links need (explicit
+    ``mkdir`` steps and missing link parents, each once, parents before
+    children), then the links.
+    """
+    backups: list[dict[str, str]] = []
+    links: list[dict[str, str]] = []
+    wanted: set[Path] = set()
+    for step in plan:
+        if step.action == "mkdir":
+            wanted.add(step.target)
+            continue
+        if step.action not in ("link", "replace"):
+            continue
+        if step.action == "replace":
+            backup = _backup_path(backup_dir, step.target)
+            backups.append({"action": "backup", "path": str(step.target), "backup": str(backup)})
+        wanted.add(step.target.parent)
+        links.append(
+            {"symlink": str(step.target), "old_target": "", "new_target": str(step.source)}
+        )
+    # Every missing directory on the way to a wanted one, shallowest first.
+    mkdirs: set[Path] = set()
+    for directory in wanted:
+        for d in (directory, *directory.parents):
+            if d in mkdirs or d.is_dir():
+                break
+            mkdirs.add(d)
+    ordered = sorted(mkdirs, key=lambda d: (len(d.parts), str(d)))
+    entries = [*backups, *({"action": "mkdir", "path": str(d)} for d in ordered), *links]
+    return entries, ordered
+
+
+def _apply_journal_entry(entry: dict[str, str]) -> None:
+    action = entry.get("action")
+    if action == "backup":
+        backup = Path(entry["backup"])
+        backup.parent.mkdir(parents=True, exist_ok=True)
+        Path(entry["path"]).rename(backup)
+    elif action == "mkdir":
+        Path(entry["path"]).mkdir(exist_ok=True)
+    else:
+        Path(entry["symlink"]).symlink_to(entry["new_target"])
 
-    # Already correct symlink?
-    if target.is_symlink() and target.resolve() == source.resolve():
-        print(f"  {target.name} already linked")
-        return True
 
-    # Already routed via a wholesale-symlinked ancestor: target itself isn't
-    # a symlink, but its resolved path is the same file as source. Treat as
-    # a no-op so we don't rename the source out from under ourselves and
-    # then create a self-referential symlink in its place.
-    if target.exists() and target.resolve() == source.resolve():
+def revert_journal_entry(entry: dict[str, str]) -> bool:
+    """Undo one journal entry if disk still shows it applied. Returns True if it did.
+
+    Checks before acting, so replaying a journal from a run that stopped
+    partway (or was already rolled back) only touches what that run did.
+    """
+    action = entry.get("action")
+    if action == "backup":
+        path, backup = Path(entry["path"]), Path(entry["backup"])
+        if os.path.lexists(path) or not os.path.lexists(backup):
+            return False
+        backup.rename(path)
         return True
+    if action == "mkdir":
+        try:
+            Path(entry["path"]).rmdir()  # only if still empty
+        except OSError:
+            return False
+        return True
+    symlink, old_target = Path(entry["symlink"]), entry.get("old_target") or ""
+    try:
+        if symlink.readlink() != Path(entry["new_target"]):
+            return False
+    except OSError:
+        return False
+    symlink.unlink()
+    if old_target:
+        symlink.symlink_to(old_target)
+    return True
+
 
-    # Backup existing file/directory
-    if target.exists() or target.is_symlink():
+def rollback_journal(path: Path) -> int:
+    """Replay ``path`` in reverse; returns how many entries were undone."""
+    undone = 0
+    for entry in reversed(read_journal(path)):
+        try:
+            if revert_journal_entry(entry):
+                undone += 1
+        except OSError as exc:
+            print_warning(f"Could not undo {entry}: {exc}")
+    return undone
+
+
+def apply_symlink_plan(
+    plan: list[SymlinkAction],
+    *,
+    dry_run: bool = False,
+    backup_dir: Path | None = None,
+    journal: Path | None = None,
+) -> bool:
+    """Apply ``plan`` as one batch. Returns False if any step failed.
+
+    See ``_apply_symlink_plan``.
+    """
+    return _apply_symlink_plan(plan, dry_run=dry_run, backup_dir=backup_dir, journal=journal)[0]
+
+
+def _apply_symlink_plan(
+    plan: list[SymlinkAction],
+    *,
+    dry_run: bool,
+    backup_dir: Path | None,
+    journal: Path | None,
+) -> tuple[bool, bool]:
+    """Apply ``plan``; returns ``(success, rolled_back)``.
+
+    Backups run first, then each needed directory is created once, then
+    the links. With ``journal``, the whole batch is written there (appended
+    to any entries already in it) before anything changes, so ``--rollback``
+    can undo it even after a crash. If a step raises, everything this batch
+    already did is rolled back. With ``dry_run``, prints what would happen
+    and changes nothing.
+    """
+    success = True
+    unchanged = 0
+    for step in plan:
+        if step.action == "ok":
+            unchanged += 1
+        elif step.action == "missing":
+            print_warning(f"Skipping {step.target.name}: {step.detail}")
+            success = False
+
+    entries, mkdirs = _journal_entries(plan, backup_dir or get_backup_dir())
+
+    if dry_run:
+        for d in mkdirs:
+            print_step(f"Would create directory {d}")
+        for entry in entries:
+            if entry.get("action") == "backup":
+                print_warning(f"Would back up {entry['path']} → {entry['backup']}")
+            elif entry.get("action") is None:
+                print_step(f"Would link {entry['symlink']} → {entry['new_target']}")
+    elif entries:
+        if journal is not None:
+            previous = read_journal(journal) if journal.exists() else []
+            write_journal(journal, previous + entries)
+        done: list[dict[str, str]] = []
+        try:
+            for entry in entries:
+                _apply_journal_entry(entry)
+                done.append(entry)
+                if entry.get("action") == "backup":
+                    print_warning(f"Backing up {entry['path']} → {entry['backup']}")
+                elif entry.get("action") is None:
+                    print_success(f"Linked {entry['symlink']} → {entry['new_target']}")
+        except OSError as exc:
+            print_error(f"Symlink apply failed: {exc}")
+            print_step(f"Rolling back {len(done)} change(s)...")
+            for entry in reversed(done):
+                try:
+                    revert_journal_entry(entry)
+                except OSError as undo_exc:
+                    print_warning(f"Could not undo {entry}: {undo_exc}")
+            return False, True
+    if unchanged:
+        print(f"  {unchanged} already linked")
+    return success, False
+
+
+def create_symlink(source: Path, target: Path, backup_dir: Path | None = None) -> bool:
+    """Create a symlink, backing up existing files if needed."""
+    step = plan_symlink(source, target)
+    if step.action == "ok":
+        # Reached through a wholesale-symlinked ancestor: nothing to say.
+        if target.is_symlink():
+            print(f"  {target.name} already linked")
+        return True
+    if step.action == "replace":
+        # A single link's backup goes straight into the backup dir, by name.
         if backup_dir is None:
             backup_dir = get_backup_dir()
         backup_dir.mkdir(parents=True, exist_ok=True)
         backup_path = backup_dir / target.name
         print_warning(f"Backing up {target} → {backup_path}")
         target.rename(backup_path)
+        step = SymlinkAction(source, target, "link")
+    return apply_symlink_plan([step])
 
-    # Create parent directory if needed
-    target.parent.mkdir(parents=True, exist_ok=True)
 
-    # Create symlink
-    target.symlink_to(source)
-    print_success(f"Linked {target} → {source}")
-    return True
+# Threads planning top-level subtrees of the home trees concurrently. Planning
+# is all stat/readlink latency (slow on a cloud mount), not CPU.
+SYMLINK_PLAN_WORKERS = 8
 
 
-def symlink_home_dir(home_dir: Path) -> bool:
+def plan_symlink_home_dir(
+    home_dir: Path,
+    cache: SymlinkStateCache | None = None,
+    pool: ThreadPoolExecutor | None = None,
+    start: Path | None = None,
+    result: WalkResult | None = None,
+) -> list[SymlinkAction]:
     """
-    Traverse home_dir and symlink everything to $HOME.
+    Plan symlinking everything under home_dir into $HOME, in apply order.
 
-    If a directory contains .symlink-dir, symlink the directory itself.
-    Otherwise, recurse into it and symlink children.
+    If a directory contains .symlink-dir, the directory itself is linked.
+    Otherwise the walker recurses into it (planning a ``mkdir`` if the
+    $HOME side doesn't exist yet) and links children individually.
 
     A directory may also contain a ``.dotfiles.yaml`` with a ``symlinks:``
     block to remap individual files (e.g., pick a per-device variant); see
     ``_resolve_symlinks_directives``.
 
-    Returns True if every symlink succeeded, False otherwise.
-    """
-    success = True
-    device_id = _read_device_id()
+    With a ``cache``, directories it vouches for contribute no actions
+    (only their recorded subdirectories are descended into), and every
+    directory planned in full is recorded in it for ``commit``.
+
+    With a ``pool``, each top-level subdirectory is planned as its own task
+    on it; the pieces are stitched back together in walk order, so the
+    result is the same as a serial walk.
 
-    def process_dir(src_dir: Path, target_dir: Path) -> None:
-        nonlocal success
+    ``start`` (a directory under ``home_dir``) plans just that subtree, as
+    the full walk would once it got there; see ``reconcile_symlink_paths``.
 
-        active, variants = _resolve_symlinks_directives(src_dir, device_id)
+    With a ``result``, per-directory and per-link-check timings are
+    recorded in it.
+
+    Read-only: nothing on disk changes until ``apply_symlink_plan``.
+    """
+    device_id = _read_device_id()
+    home = Path.home()
+    # Walk-order pieces of the plan: a subtree planned on ``pool`` fills its
+    # own piece while the top level carries on in the next one.
+    pieces: list[list[SymlinkAction]] = [[]]
+    futures: list[Future[float]] = []
+
+    def descend(
+        src_dir: Path, target_dir: Path, plan: list[SymlinkAction]
+    ) -> tuple[list[SymlinkAction], float]:
+        """Plan a subdirectory; returns the list to append to next and seconds spent inline."""
+        if pool is None or target_dir.parent != home:
+            return plan, process_dir(src_dir, target_dir, plan)
+        subtree: list[SymlinkAction] = []
+        rest: list[SymlinkAction] = []
+        pieces.extend((subtree, rest))
+        futures.append(pool.submit(process_dir, src_dir, target_dir, subtree))
+        return rest, 0.0
+
+    def from_cache(
+        cache: SymlinkStateCache,
+        src_dir: Path,
+        target_dir: Path,
+        digest: str,
+        plan: list[SymlinkAction],
+    ) -> tuple[int, float] | None:
+        """On a hit, ``(links vouched for, seconds in subdirectories)``."""
+        state = cache.lookup(src_dir, target_dir, digest)
+        # A subdirectory that gained a .symlink-dir tag changes how *this*
+        # directory links it, but only bumps the subdirectory's own mtime.
+        if state is None or any((src_dir / n / SYMLINK_DIR_TAG).exists() for n in state.subdirs):
+            return None
+        cache.cached(src_dir, target_dir, state)
+        nested = 0.0
+        for name in state.subdirs:
+            plan, seconds = descend(src_dir / name, target_dir / name, plan)
+            nested += seconds
+        return state.linked, nested
+
+    def add(plan: list[SymlinkAction], step: SymlinkAction, src_dir: Path) -> None:
+        plan.append(step)
+        if cache is not None:
+            cache.add_link(src_dir, step.action != "missing")
+
+    def check(source: Path, target: Path) -> SymlinkAction:
+        if result is None:
+            return plan_symlink(source, target)
+        started = time.perf_counter()
+        step = plan_symlink(source, target)
+        result.record_check(target, time.perf_counter() - started)
+        return step
+
+    def process_dir(src_dir: Path, target_dir: Path, plan: list[SymlinkAction]) -> float:
+        """Plan one directory (and, inline, its subdirectories); returns elapsed seconds."""
+        started = time.perf_counter()
+        nested = 0.0
+
+        def done(cached: int | None = None) -> float:
+            elapsed = time.perf_counter() - started
+            if result is not None:
+                result.record_dir(src_dir, elapsed - nested, cached=cached)
+            return elapsed
+
+        if cache is not None:
+            digest = yaml_digest(src_dir / DOTFILES_YAML)
+            hit = from_cache(cache, src_dir, target_dir, digest, plan)
+            if hit is not None:
+                linked, nested = hit
+                return done(cached=linked)
+            cache.begin(src_dir, target_dir, digest)
+
+        # One listing per directory, shared by variant matching, excludes
+        # and the loop below.
+        entries = _scan_dir(src_dir)
+        active, variants = _resolve_symlinks_directives(
+            src_dir, device_id, [e.name for e in entries]
+        )
         excludes = _resolve_excludes(src_dir, device_id)
 
-        for src in sorted(src_dir.iterdir()):
-            if src.name in excludes:
+        for entry in entries:
+            if entry.name in excludes:
                 continue
-            if src.name in SKIP_FILES or src.name.endswith(SKIP_SUFFIXES):
+            if entry.name in SKIP_FILES or entry.name.endswith(SKIP_SUFFIXES):
                 continue
             # Skip files that are device-keyed variants (other devices' copies,
             # or the current device's copy which is handled via `active` below).
-            if src.name in variants:
+            if entry.name in variants:
                 continue
 
-            target = target_dir / src.name
+            src = src_dir / entry.name
+            target = target_dir / entry.name
 
-            if src.is_dir():
+            if entry.is_dir():
                 if (src / SYMLINK_DIR_TAG).exists():
-                    if not create_symlink(src, target):
-                        success = False
-                elif target.is_symlink() and target.resolve() == src.resolve():
+                    add(plan, check(src, target), src_dir)
+                elif target.is_symlink() and _links_to(target, src):
                     # Some ancestor in $HOME is already wholesale-symlinked to
                     # this source dir — recursing would loop back through the
                     # symlink and corrupt the repo. Treat as already linked.
                     continue
                 else:
-                    target.mkdir(parents=True, exist_ok=True)
-                    process_dir(src, target)
+                    if not target.exists():
+                        plan.append(SymlinkAction(src, target, "mkdir"))
+                    if cache is not None:
+                        cache.add_subdir(src_dir, entry.name)
+                    plan, seconds = descend(src, target, plan)
+                    nested += seconds
             else:
-                if not create_symlink(src, target):
-                    success = False
+                add(plan, check(src, target), src_dir)
 
         # Apply explicit per-file overrides (e.g., manifest.toml -> manifest.toml.mac.primary).
         for home_name, repo_filename in active.items():
             repo_path = src_dir / repo_filename
             if not repo_path.is_file():
                 if not device_id:
-                    print_warning(
+                    detail = (
                         f"~/.device_id missing; cannot resolve symlinks "
                         f"directive for {src_dir / home_name}"
                     )
                 else:
-                    print_warning(
+                    detail = (
                         f"symlinks override: {repo_path} not found "
-                        f"(device_id={device_id!r}); skipping {home_name}"
+                        f"(device_id={device_id!r})"
                     )
-                success = False
+                step = SymlinkAction(repo_path, target_dir / home_name, "missing", detail)
+                add(plan, step, src_dir)
                 continue
-            if not create_symlink(repo_path, target_dir / home_name):
-                success = False
+            add(plan, check(repo_path, target_dir / home_name), src_dir)
+        return done()
+
+    start = start or home_dir
+    process_dir(start, home / start.relative_to(home_dir), pieces[0])
+    for future in futures:
+        future.result()
+    return [step for piece in pieces for step in piece]
+
 
-    process_dir(home_dir, Path.home())
-    return success
+def _walker_reaches(home_dir: Path, src_dir: Path, device_id: str) -> bool:
+    """Whether the full walk would plan ``src_dir``'s entries itself.
+
+    False when some directory on the way down (``src_dir`` included) is
+    skipped, excluded or a device variant in its parent, is linked
+    wholesale (``.symlink-dir``), or is already reached through a
+    wholesale-symlinked ancestor in $HOME.
+    """
+    home = Path.home()
+    parent = home_dir
+    for name in src_dir.relative_to(home_dir).parts:
+        if name in SKIP_FILES or name.endswith(SKIP_SUFFIXES):
+            return False
+        if name in _resolve_excludes(parent, device_id):
+            return False
+        if name in _resolve_symlinks_directives(parent, device_id, [name])[1]:
+            return False
+        child = parent / name
+        if (child / SYMLINK_DIR_TAG).exists():
+            return False
+        target = home / child.relative_to(home_dir)
+        if target.is_symlink() and _links_to(target, child):
+            return False
+        parent = child
+    return True
+
+
+def reconcile_symlink_paths(
+    home_dirs: Sequence[Path], changed: Iterable[Path], *, journal: Path | None = None
+) -> bool:
+    """Bring $HOME in line with ``changed`` source paths, without a full walk.
+
+    Each changed path re-plans the directory whose listing it is in (a
+    tagged ``.symlink-dir`` directory re-plans its parent, which links
+    it); paths outside ``home_dirs`` are ignored. A removed source also
+    removes the $HOME link that pointed straight at it. Unchanged
+    subdirectories below a re-planned one are served from the
+    symlink-state cache as usual. Returns False if anything failed.
+    """
+    device_id = _read_device_id()
+    home = Path.home()
+    by_tree: dict[Path, set[Path]] = {}
+    for path in changed:
+        root = next((r for r in home_dirs if path == r or r in path.parents), None)
+        if root is None:
+            continue
+        if path != root and not os.path.lexists(path):
+            target = home / path.relative_to(root)
+            with contextlib.suppress(OSError):
+                if target.readlink() == path:
+                    target.unlink()
+                    print_step(f"Removed {target} (source {path} is gone)")
+        directory = path if path == root else path.parent
+        while directory != root and (directory / SYMLINK_DIR_TAG).exists():
+            directory = directory.parent
+        by_tree.setdefault(root, set()).add(directory)
+
+    ok = True
+    cache = SymlinkStateCache(device_id)
+    applied: list[Path] = []
+    for root, dirs in by_tree.items():
+        # A re-planned directory covers everything below it.
+        tops = [d for d in dirs if not any(a in dirs for a in d.parents)]
+        plan: list[SymlinkAction] = []
+        for directory in sorted(tops):
+            if directory.is_dir() and _walker_reaches(root, directory, device_id):
+                plan.extend(plan_symlink_home_dir(root, cache, start=directory))
+        if not any(step.action != "ok" for step in plan):
+            applied.append(root)
+            continue
+        success, rolled_back = _apply_symlink_plan(
+            plan, dry_run=False, backup_dir=None, journal=journal
+        )
+        ok = ok and success
+        if not rolled_back:
+            applied.append(root)
+    cache.commit(*applied, prune=False)
+    return ok
+
+
+def _replan_written(
+    plan: list[SymlinkAction], written: set[Path], *, dry_run: bool
+) -> list[SymlinkAction]:
+    """``plan`` with the steps an earlier tree's apply has overtaken planned again.
+
+    Trees are planned together against $HOME as it was before any of them
+    applied, so a file both trees ship was planned as a plain link by the
+    later one. Steps whose target (or a target's ancestor) is in ``written``
+    are checked again now, which turns that link into a ``replace`` and
+    lets the later tree win, as if the trees had run one after another.
+    In ``dry_run`` nothing was written, so such links become ``replace``
+    without looking.
+    """
+    replanned: list[SymlinkAction] = []
+    for step in plan:
+        target = step.target
+        overtaken = target in written or any(p in written for p in target.parents)
+        if overtaken and step.action == "mkdir":
+            if target in written or target.exists():
+                continue
+        elif overtaken and step.action != "missing":
+            if dry_run:
+                if target in written and step.action == "link":
+                    step = SymlinkAction(step.source, target, "replace")
+            else:
+                step = plan_symlink(step.source, target)
+        replanned.append(step)
+    return replanned
+
+
+def symlink_home_dirs(
+    home_dirs: Sequence[Path],
+    *,
+    dry_run: bool = False,
+    full: bool = False,
+    before_apply: Callable[[Path], None] | None = None,
+    results: list[WalkResult] | None = None,
+) -> list[bool]:
+    """
+    Symlink several home trees into $HOME; one success flag per tree.
+
+    Every tree, and every top-level subtree within it, is planned
+    concurrently, so a tree on a slow cloud mount doesn't hold up the
+    others. Plans are then applied one tree at a time in the given order:
+    output comes out as if the trees ran serially, and no two writes to
+    $HOME race. Steps an earlier tree has since written over are checked
+    again before a later tree applies (``_replan_written``), so where two
+    trees ship the same file the later one wins. ``before_apply`` runs
+    just before each tree's apply (e.g. to print a header). Each tree is
+    applied as one batch (see ``apply_symlink_plan``) recorded in a shared
+    undo journal.
+
+    Only steps that change something are applied, so an already-linked
+    tree costs one read-only pass. Directories unchanged since the last
+    verified run are taken from the symlink-state cache (``symlink_state``);
+    ``full`` ignores it and re-verifies everything.
+
+    With ``results``, one ``WalkResult`` per tree (counts and timings) is
+    appended to it.
+    """
+    cache = SymlinkStateCache(_read_device_id(), full=full)
+    walks = [WalkResult(d) for d in home_dirs]
+
+    def plan_tree(walk: WalkResult, pool: ThreadPoolExecutor) -> list[SymlinkAction]:
+        started = time.perf_counter()
+        plan = plan_symlink_home_dir(walk.tree, cache, pool, result=walk)
+        walk.plan_seconds = time.perf_counter() - started
+        return plan
+
+    # Tree-level tasks block on their subtree tasks, so they get their own
+    # pool; sharing one could leave every worker waiting.
+    with ThreadPoolExecutor(max_workers=SYMLINK_PLAN_WORKERS) as subtrees, ThreadPoolExecutor(
+        max_workers=max(len(home_dirs), 1)
+    ) as trees:
+        futures = [trees.submit(plan_tree, walk, subtrees) for walk in walks]
+        plans = [f.result() for f in futures]
+
+    journal = None if dry_run else journal_path("symlink-home-files")
+    applied: list[Path] = []
+    # $HOME paths earlier trees' applies linked, replaced or created.
+    written: set[Path] = set()
+    for walk, plan in zip(walks, plans):
+        if written:
+            plan = _replan_written(plan, written, dry_run=dry_run)
+        walk.count(plan)
+        if before_apply is not None:
+            before_apply(walk.tree)
+        started = time.perf_counter()
+        walk.success, walk.rolled_back = _apply_symlink_plan(
+            plan, dry_run=dry_run, backup_dir=None, journal=journal
+        )
+        walk.apply_seconds = time.perf_counter() - started
+        if not walk.rolled_back:
+            applied.append(walk.tree)
+            written.update(
+                step.target for step in plan if step.action in ("link", "replace", "mkdir")
+            )
+    if cache.hits:
+        print(f"  {cache.cached_links} link(s) in {cache.hits} unchanged dir(s) skipped (cached)")
+    if journal is not None and journal.exists():
+        print_step(f"Journal written to {journal} (undo: symlink-home-files --rollback {journal})")
+    if not dry_run:
+        cache.commit(*applied)
+    if results is not None:
+        results.extend(walks)
+    return [walk.success for walk in walks]
+
+
+def symlink_home_dir(home_dir: Path, *, dry_run: bool = False, full: bool = False) -> bool:
+    """
+    Traverse home_dir and symlink everything to $HOME.
+
+    See ``symlink_home_dirs``. Returns True if every symlink succeeded.
+    """
+    return symlink_home_dirs([home_dir], dry_run=dry_run, full=full)[0]
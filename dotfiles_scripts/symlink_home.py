@@ -2,18 +2,102 @@
 """
 Automatically symlink files from $DOTFILES/home/ and $DOTFILES_PRIVATE/home/ to $HOME.
 
-Uses the shared symlink_home_dir function which supports .symlink-dir tags:
+Uses the shared symlink_home_dirs function, which plans both trees
+concurrently and applies them in order. It supports .symlink-dir tags:
 directories containing a .symlink-dir file are symlinked as a whole,
 otherwise the function recurses into them and symlinks children individually.
+
+Each run's changes are applied as a batch and recorded in a journal under
+/tmp; ``--rollback <journal>`` undoes that run.
+
+``--watch`` keeps running after the initial pass: it watches both trees
+(inotify on Linux, mtime polling elsewhere; see ``fs_watch``) and
+reconciles only the directories where files appeared or disappeared, so
+files added on another machine show up in $HOME within seconds. The
+``com.dotfiles-private.symlink-watch`` LaunchAgent runs it; it is opt-in
+via ``SYMLINK_WATCH=1`` in ``.dotfiles-config`` (see ``setup_launchd``).
 """
 
+from __future__ import annotations
+
 import sys
+import time
+from pathlib import Path
 
 import click
 
-from dotfiles_scripts.setup_utils import PRIVATE_DOTFILES, symlink_home_dir
+from dotfiles_scripts.fs_watch import make_watcher
+from dotfiles_scripts.setup_utils import (
+    DOTFILES_YAML,
+    PRIVATE_DOTFILES,
+    SKIP_FILES,
+    SKIP_SUFFIXES,
+    SYMLINK_DIR_TAG,
+    journal_path,
+    print_header,
+    print_step,
+    print_success,
+    print_warning,
+    reconcile_symlink_paths,
+    rollback_journal,
+    symlink_home_dirs,
+)
 from dotfiles_scripts.utils import get_dotfiles_dir
 
+# --watch: reconcile once the trees have been quiet this long (a cloud
+# client lands a batch of files as a burst of events), but never hold a
+# change back longer than the max delay while events keep streaming in
+# (an editor or sync client touching files in the tree).
+WATCH_DEBOUNCE_SECONDS = 5.0
+WATCH_MAX_DELAY_SECONDS = 60.0
+# How often the polling fallback re-stats the trees.
+WATCH_POLL_SECONDS = 10.0
+
+
+def _watch_ignored(name: str) -> bool:
+    """Build/cache dirs the walker skips; its own control files still count."""
+    if name in (DOTFILES_YAML, SYMLINK_DIR_TAG):
+        return False
+    return name in SKIP_FILES or name.endswith(SKIP_SUFFIXES)
+
+
+def _watch(trees: list[Path]) -> int:
+    """Converge once, then reconcile changed paths as they arrive. Runs until killed."""
+    if not all(symlink_home_dirs(trees)):
+        print_warning("Initial pass had failures; watching anyway")
+    watcher = make_watcher(trees, ignore=_watch_ignored, poll_interval=WATCH_POLL_SECONDS)
+    print_step(f"Watching {len(trees)} tree(s) with {type(watcher).__name__}")
+    pending: set[Path] = set()
+    first_change = last_change = 0.0
+    try:
+        while True:
+            changed = watcher.wait_paths(WATCH_DEBOUNCE_SECONDS if pending else 3600.0)
+            now = time.monotonic()
+            if changed:
+                if not pending:
+                    first_change = now
+                pending |= changed
+                last_change = now
+            if not pending:
+                continue
+            quiet = now - last_change >= WATCH_DEBOUNCE_SECONDS
+            overdue = now - first_change >= WATCH_MAX_DELAY_SECONDS
+            if not (quiet or overdue):
+                continue
+            print_step(f"Reconciling {len(pending)} changed path(s)")
+            start = time.perf_counter()
+            journal = journal_path("symlink-home-files")
+            if not reconcile_symlink_paths(trees, pending, journal=journal):
+                print_warning("Reconcile had failures")
+            if journal.exists():
+                print_step(f"Journal written to {journal}")
+            print_step(f"Reconciled in {time.perf_counter() - start:.2f}s")
+            pending.clear()
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()
+
 
 @click.command()
 @click.option(
@@ -21,9 +105,25 @@ from dotfiles_scripts.utils import get_dotfiles_dir
     is_flag=True,
     help="Show what would be done without making any changes",
 )
-def cli(dry_run: bool) -> None:
+@click.option(
+    "--rollback",
+    "rollback",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Undo a previous run from the journal file it printed.",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="After linking, keep watching both trees and link changes as they happen.",
+)
+def cli(dry_run: bool, rollback: Path | None, watch: bool) -> None:
     """Symlink all files from home/ (public + private) to $HOME."""
-    ok = True
+    if rollback is not None:
+        print_header(f"Rolling back from {rollback}")
+        undone = rollback_journal(rollback)
+        print_success(f"Rollback complete ({undone} change(s) undone)")
+        return
 
     dotfiles = get_dotfiles_dir()
     home_dir = dotfiles / "home"
@@ -32,17 +132,17 @@ def cli(dry_run: bool) -> None:
         sys.exit(1)
 
     if dry_run:
-        click.echo("DRY RUN MODE - showing what would be done (not yet supported, running normally)\n")
-
-    if not symlink_home_dir(home_dir):
-        ok = False
+        click.echo("DRY RUN MODE - showing what would be done\n")
 
+    trees = [home_dir]
     private_home = PRIVATE_DOTFILES / "home"
     if private_home.is_dir():
-        if not symlink_home_dir(private_home):
-            ok = False
+        trees.append(private_home)
+
+    if watch:
+        sys.exit(_watch(trees))
 
-    if not ok:
+    if not all(symlink_home_dirs(trees, dry_run=dry_run)):
         sys.exit(1)
 
 
@@ -0,0 +1,215 @@
+"""On-disk record of the last verified symlink walk.
+
+``symlink_home_dir`` consults this to skip re-verifying directories
+that can't have changed since they were last found fully linked. One
+entry per source directory the walker visited, keyed by:
+
+* the source directory's mtime (an entry added, removed or renamed),
+* the ``$HOME``-side directory's mtime (a link deleted or replaced),
+* a digest of the directory's ``.dotfiles.yaml`` (edits to ``symlinks:``
+  or ``exclude:`` don't touch the directory mtime),
+* the device id (variant and exclude selection depend on it).
+
+A hit costs two ``stat`` calls plus a read of a small YAML file, instead of
+a ``readlink``/``resolve`` per file. Each entry also lists the subdirectories
+the walker recursed into, so a hit still descends into them. Any mismatch
+is a miss and the directory is re-planned in full.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import cast
+
+SYMLINK_STATE_FILE = Path.home() / ".cache" / "dotfiles-private" / "symlink-state.json"
+
+# Bump when the walker's decisions change so old entries are ignored.
+_FORMAT_VERSION = 1
+
+
+def _mtime_ns(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def yaml_digest(path: Path) -> str:
+    """sha1 of ``path``'s bytes, or ``""`` if it doesn't exist."""
+    try:
+        return hashlib.sha1(path.read_bytes()).hexdigest()
+    except OSError:
+        return ""
+
+
+def load_managed_dirs(path: Path = SYMLINK_STATE_FILE) -> list[Path]:
+    """Source directories recorded in the cache, for any device; empty if none."""
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data: object = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return []
+    dirs = cast("dict[str, object]", data).get("dirs") if isinstance(data, dict) else None
+    if not isinstance(dirs, dict):
+        return []
+    return [Path(key) for key in cast("dict[str, object]", dirs)]
+
+
+@dataclass
+class DirState:
+    """What a fully linked source directory looked like when last verified."""
+
+    src_mtime_ns: int
+    target_mtime_ns: int
+    yaml: str
+    subdirs: list[str]
+    linked: int
+
+
+def _parse_state(raw: object) -> DirState | None:
+    if not isinstance(raw, dict):
+        return None
+    entry = cast("dict[str, object]", raw)
+    src, target = entry.get("src_mtime_ns"), entry.get("target_mtime_ns")
+    linked, yaml, subdirs = entry.get("linked"), entry.get("yaml"), entry.get("subdirs")
+    if not (isinstance(src, int) and isinstance(target, int) and isinstance(linked, int)):
+        return None
+    if not isinstance(yaml, str) or not isinstance(subdirs, list):
+        return None
+    return DirState(src, target, yaml, [str(x) for x in cast("list[object]", subdirs)], linked)
+
+
+@dataclass
+class _Visit:
+    src_dir: Path
+    target_dir: Path
+    src_mtime_ns: int
+    yaml: str
+    subdirs: list[str] = field(default_factory=list)
+    linked: int = 0
+    failed: bool = False
+
+
+class SymlinkStateCache:
+    """Load once, look up during planning, ``commit`` after a successful apply."""
+
+    def __init__(self, device_id: str, path: Path = SYMLINK_STATE_FILE, *, full: bool = False):
+        self.path = path
+        self.device_id = device_id
+        # Never hit: re-verify everything, but still record the results.
+        self.full = full
+        self.hits = 0
+        self.cached_links = 0
+        # Planning runs subtrees on a thread pool; visits are per directory
+        # (one thread each), only the shared counters need the lock.
+        self._lock = threading.Lock()
+        self._dirs: dict[str, DirState] = {}
+        self._visits: dict[Path, _Visit] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                data: object = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(data, dict):
+            return
+        top = cast("dict[str, object]", data)
+        if top.get("version") != _FORMAT_VERSION or top.get("device_id") != self.device_id:
+            return
+        dirs = top.get("dirs")
+        if not isinstance(dirs, dict):
+            return
+        for key, raw in cast("dict[str, object]", dirs).items():
+            state = _parse_state(raw)
+            if state is not None:
+                self._dirs[key] = state
+
+    def lookup(self, src_dir: Path, target_dir: Path, yaml: str) -> DirState | None:
+        """The cached state for ``src_dir`` if it still matches disk, else None."""
+        state = None if self.full else self._dirs.get(str(src_dir))
+        if state is None or state.yaml != yaml:
+            return None
+        if _mtime_ns(src_dir) != state.src_mtime_ns:
+            return None
+        if _mtime_ns(target_dir) != state.target_mtime_ns:
+            return None
+        with self._lock:
+            self.hits += 1
+            self.cached_links += state.linked
+        return state
+
+    def begin(self, src_dir: Path, target_dir: Path, yaml: str) -> None:
+        """Start recording a directory being planned in full."""
+        mtime = _mtime_ns(src_dir)
+        if mtime is not None:
+            self._visits[src_dir] = _Visit(src_dir, target_dir, mtime, yaml)
+
+    def cached(self, src_dir: Path, target_dir: Path, state: DirState) -> None:
+        """Carry a cache hit forward so ``commit`` keeps it."""
+        self._visits[src_dir] = _Visit(
+            src_dir,
+            target_dir,
+            state.src_mtime_ns,
+            state.yaml,
+            list(state.subdirs),
+            state.linked,
+        )
+
+    def add_subdir(self, src_dir: Path, name: str) -> None:
+        visit = self._visits.get(src_dir)
+        if visit is not None:
+            visit.subdirs.append(name)
+
+    def add_link(self, src_dir: Path, ok: bool) -> None:
+        visit = self._visits.get(src_dir)
+        if visit is None:
+            return
+        if ok:
+            visit.linked += 1
+        else:
+            visit.failed = True
+
+    def commit(self, *roots: Path, prune: bool = True) -> None:
+        """Persist every directory visited under ``roots`` that ended fully linked.
+
+        ``$HOME``-side mtimes are read now, after apply, since creating the
+        links is itself what bumps them. With ``prune``, entries under
+        ``roots`` that weren't visited this run (directories since removed)
+        are dropped; pass False after a partial walk. Visits under other
+        roots (a tree whose apply was rolled back) are discarded.
+        """
+        prefixes = [str(root) for root in roots]
+
+        def under_roots(key: str) -> bool:
+            return any(key == p or key.startswith(p + os.sep) for p in prefixes)
+
+        dirs = {k: v for k, v in self._dirs.items() if not (prune and under_roots(k))}
+        for visit in self._visits.values():
+            target_mtime = _mtime_ns(visit.target_dir)
+            if visit.failed or target_mtime is None or not under_roots(str(visit.src_dir)):
+                continue
+            dirs[str(visit.src_dir)] = DirState(
+                visit.src_mtime_ns, target_mtime, visit.yaml, visit.subdirs, visit.linked
+            )
+        payload = {
+            "version": _FORMAT_VERSION,
+            "device_id": self.device_id,
+            "dirs": {k: vars(v) for k, v in sorted(dirs.items())},
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".json.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(payload, f, sort_keys=True)
+            tmp.replace(self.path)
+        except OSError:
+            return  # a cache; the next run just re-verifies
+        self._dirs = dirs
+        self._visits.clear()
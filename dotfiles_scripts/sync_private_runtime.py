@@ -24,6 +24,28 @@ Sync sources are split into two lists:
   not part of the repo. Mirrored under
   ``${device_id}/home/<path-relative-to-$HOME>``.
 
+``.claude/projects`` is synced per project (see ``SHARDED_PATHS``): each
+project directory is its own job with its own timeout and state, and a
+run that leaves some unsynced resumes with the rest next time.
+
+Copies go through rsync by default; ``SYNC_RUNTIME_ENGINE=native`` (or
+``--engine native``) switches to the in-process copier in ``delta_copy``.
+
+Claude sessions from months older than ``SYNC_RUNTIME_ARCHIVE_DAYS`` are
+moved out of the live mirror into per-month tarballs once a day (see
+``runtime_archive``); ``--restore YYYY-MM`` unpacks one month locally.
+
+``--watch`` runs as a long-lived daemon instead: it subscribes to
+filesystem change notifications for the local side of every runtime path
+(inotify on Linux, polling elsewhere), debounces bursts of writes, and
+pushes only the paths that changed. It takes the same per-path locks and
+records into the same state file as the interval-driven runs, so both can
+be active at once.
+
+Locking is per runtime path (``~/.cache/dotfiles-private/locks/``): a pull of
+``.claude/projects`` and a push of shell history run concurrently, and a
+path another run holds is skipped for this run rather than waited on.
+
 Exit codes are always 0 (launchd-friendly). Persistent failures
 (crossing the 1h threshold) emit a single macOS notification with
 its own cooldown.
@@ -32,26 +54,47 @@ its own cooldown.
 from __future__ import annotations
 
 import fcntl
+import functools
+import hashlib
 import json
+import math
+import os
 import platform
+import re
 import shlex
 import subprocess
 import sys
+import tarfile
+import tempfile
+import threading
 import time
-from collections.abc import Callable, Iterator
-from contextlib import contextmanager
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager, suppress
+from dataclasses import dataclass
 from datetime import datetime
+from fnmatch import fnmatch
 from pathlib import Path
 from typing import cast
 
 import click
 
+from dotfiles_scripts.delta_copy import CopyStats, append_tail, prefix_digest, sync_tree
 from dotfiles_scripts.detach_cloud_cache import DEFAULT_PATTERNS as CACHE_DIR_PATTERNS
+from dotfiles_scripts.fs_watch import make_watcher
+from dotfiles_scripts.runtime_archive import (
+    archive_old_files,
+    archived_unchanged,
+    list_months,
+    load_index,
+    restore_month,
+)
 from dotfiles_scripts.setup_utils import (
     DEFAULT_SSH_IDENTITY_BACKEND,
     DROPBOX_DIR,
     PRIVATE_DOTFILES,
     gdrive_candidates,
+    print_error,
     print_header,
     print_step,
     print_success,
@@ -63,10 +106,28 @@ from dotfiles_scripts.setup_utils import (
 # ---------------------------------------------------------------------------
 
 CACHE_DIR = Path.home() / ".cache" / "dotfiles-private"
-LOCK_FILE = CACHE_DIR / "sync-runtime.lock"
+# One lock file per runtime path (see _lock_key). Runs touching disjoint
+# paths proceed concurrently; a path already held by another run is skipped
+# for this run, as the old single sync-runtime.lock skipped the whole tick.
+LOCK_DIR = CACHE_DIR / "locks"
+# Held (blocking, briefly) around every read-modify-write of the state,
+# manifest, and append-state files, now that several runs can finish at once.
+STATE_LOCK_FILE = CACHE_DIR / "sync-runtime-state.lock"
 STATE_FILE = CACHE_DIR / "sync-runtime-state.json"
+# Per-path fingerprints (size/mtime/inode of every file on both sides) as of
+# the last successful sync. A path whose local and remote fingerprints both
+# still match is skipped without spawning rsync.
+MANIFEST_FILE = CACHE_DIR / "sync-runtime-manifest.json"
+# Per-file (offset, prefix digest) for APPEND_ONLY_PATHS as of the last sync.
+APPEND_STATE_FILE = CACHE_DIR / "sync-runtime-append.json"
 LOG_FILE = CACHE_DIR / "sync-runtime.log"
 LOG_MAX_BYTES = 1_000_000
+# One JSON line per tick: wall time plus per-path timing, skip flag, and
+# files/bytes moved. Like the log, rotated to ``<name>.1`` past the cap.
+METRICS_FILE = CACHE_DIR / "sync-runtime-metrics.jsonl"
+METRICS_MAX_BYTES = 2_000_000
+# ``--status`` percentiles cover each path's most recent samples.
+METRICS_WINDOW = 100
 
 RUNTIME_DIR_NAME = "dotfiles-runtime"
 # Backwards-compat alias — older callers (e.g. setup_private_repo) imported the
@@ -77,6 +138,8 @@ GDRIVE_RUNTIME_DIR_NAME = RUNTIME_DIR_NAME
 # directory (no device_id segment) used for identity that's the same across
 # all of the user's machines. Currently: SSH private keys on opt-out devices.
 SHARED_DIR_NAME = "dotfiles-shared"
+# Path-lock key (see _lock_key) for the SSH key syncs into the shared bucket.
+SSH_LOCK_KEY = "shared/ssh"
 
 # Glob patterns under the dotfiles-private repo root that participate in the
 # shared bucket when SSH_IDENTITY_BACKEND=disk-keys. ``id_*`` covers both
@@ -90,8 +153,26 @@ SSH_DISK_KEY_PATTERNS: tuple[str, ...] = (
 # (Claude projects 248 MB on first run); push is normally tiny deltas.
 PULL_TIMEOUT_SECONDS = 1800  # 30 min — accommodates the initial 248 MB ~/.claude/projects pull
 PUSH_TIMEOUT_SECONDS = 600  # 10 min
+# Single-file runtime paths (histories, known_hosts) are tiny. A wedged rsync
+# on one of them shouldn't hold a worker for the full directional timeout.
+FILE_TIMEOUT_SECONDS = 120
+
+# Runtime paths are independent source/dest pairs, so a tick fans them out
+# over a small worker pool: the big ``.claude/projects`` transfer no longer
+# blocks the tiny history files queued behind it. Bounded so a tick doesn't
+# open a dozen concurrent FileProvider streams. Override per machine with
+# ``SYNC_RUNTIME_CONCURRENCY`` in ``.dotfiles-config`` or ``--jobs``.
+DEFAULT_CONCURRENCY = 4
 
 INTERVAL_SECONDS = 300  # matches the launchd schedule
+
+# --watch: push once a changed path has been quiet this long, but never hold
+# a change back longer than the max delay while writes keep streaming in
+# (an active Claude session appends to its JSONL continuously).
+WATCH_DEBOUNCE_SECONDS = 5.0
+WATCH_MAX_DELAY_SECONDS = 60.0
+# How often the polling fallback re-stats the watched paths.
+WATCH_POLL_SECONDS = 10.0
 FAILURE_THRESHOLD_SECONDS = 3600  # 1 h
 NOTIFY_COOLDOWN_SECONDS = 3600
 
@@ -103,6 +184,12 @@ NOTIFY_COOLDOWN_SECONDS = 3600
 _BREW_RSYNC = Path("/opt/homebrew/bin/rsync")
 RSYNC_BIN = str(_BREW_RSYNC) if _BREW_RSYNC.is_file() else "rsync"
 
+# Sync engines. "rsync" spawns RSYNC_BIN per path; "native" copies in-process
+# via delta_copy (same --update semantics, no subprocess, no dependency on a
+# particular rsync build). Selected by SYNC_RUNTIME_ENGINE or --engine.
+SYNC_ENGINES: tuple[str, ...] = ("rsync", "native")
+DEFAULT_SYNC_ENGINE = "rsync"
+
 # Prefer terminal-notifier over osascript for failure notifications. osascript
 # notifications are stuck under the "Script Editor" sender with no click action;
 # terminal-notifier surfaces its own sender and supports -group (collapse repeats)
@@ -137,6 +224,47 @@ HOME_RUNTIME_PATHS: tuple[str, ...] = (
     ".claude/history.jsonl",
 )
 
+# Job labels (``repo/<rel>`` / ``home/<rel>``) whose files only ever grow at
+# the end. These get tail sync: if the destination still matches what was
+# synced last time, only the newly appended bytes are copied. Anything else
+# (a rewrite, a truncation) falls back to a full copy via the engine. In a
+# directory, regular files at any depth are tailed and other entries
+# (symlinks) are copied by the engine.
+APPEND_ONLY_PATHS: frozenset[str] = frozenset(
+    {
+        "repo/zsh_history/",
+        "repo/home/.pry_history",
+        "repo/home/.node_repl_history",
+        "repo/home/.psql_history",
+        "home/.claude/history.jsonl",
+    }
+)
+
+# Job labels synced as one job per top-level entry (per Claude project)
+# instead of one job for the whole tree. Each shard gets its own timeout,
+# manifest entry, and state record, so one slow project can't fail the rest.
+SHARDED_PATHS: frozenset[str] = frozenset({"home/.claude/projects"})
+
+# A first pass (the sharded tree's destination missing or empty) that leaves
+# shards unsynced (timeout, failure) opens a "round": later runs skip the
+# shards that already finished until every shard has succeeded once, so an
+# interrupted first pull resumes instead of restarting. A resumed run that
+# finishes no new shard closes the round (what's left is failing, not
+# interrupted), and outside a round every shard syncs every tick, the
+# fingerprint manifest skipping unchanged ones cheaply. Bounded so a round
+# abandoned long ago doesn't keep hiding new writes to its finished shards.
+SHARD_ROUND_MAX_AGE_SECONDS = 24 * 3600
+
+# Cold storage for ``.claude/projects`` (see runtime_archive): files from
+# months that ended more than SYNC_RUNTIME_ARCHIVE_DAYS ago are packed into
+# per-month tarballs under ``${device_id}/<ARCHIVE_SUBDIR>`` and dropped from
+# the live mirror. 0 disables it. The default tick runs the stage at most
+# once per ARCHIVE_INTERVAL_SECONDS; ``--archive`` runs it on demand.
+ARCHIVE_LABEL = "home/.claude/projects"
+ARCHIVE_SUBDIR = "archive/claude-projects"
+DEFAULT_ARCHIVE_DAYS = 90
+ARCHIVE_INTERVAL_SECONDS = 24 * 3600
+
 # ---------------------------------------------------------------------------
 # State / log
 # ---------------------------------------------------------------------------
@@ -185,28 +313,49 @@ def _save_state(state: dict[str, object]) -> None:
     tmp.replace(STATE_FILE)
 
 
-def _log(line: str) -> None:
-    _ensure_cache_dir()
+# Path workers log concurrently; serialize so rotation and appends from
+# different threads don't interleave.
+_LOG_LOCK = threading.Lock()
+
+
+def _rotated(path: Path) -> Path:
+    return path.with_name(path.name + ".1")
+
+
+def _rotate(path: Path, max_bytes: int) -> None:
+    """Move ``path`` to ``<name>.1`` once it outgrows ``max_bytes``.
+
+    A rename rather than rewriting the tail in memory: constant cost however
+    big the file got, and a reader never sees a half-written file.
+    """
     try:
-        if LOG_FILE.exists() and LOG_FILE.stat().st_size > LOG_MAX_BYTES:
-            data = LOG_FILE.read_bytes()[-LOG_MAX_BYTES // 2 :]
-            LOG_FILE.write_bytes(data)
-        with LOG_FILE.open("a", encoding="utf-8") as f:
-            f.write(f"{_now()} {line}\n")
-    except OSError:
+        if path.stat().st_size > max_bytes:
+            path.replace(_rotated(path))
+    except FileNotFoundError:
         pass
 
 
+def _log(line: str) -> None:
+    _ensure_cache_dir()
+    with _LOG_LOCK:
+        try:
+            _rotate(LOG_FILE, LOG_MAX_BYTES)
+            with LOG_FILE.open("a", encoding="utf-8") as f:
+                f.write(f"{_now()} {line}\n")
+        except OSError:
+            pass
+
+
 # ---------------------------------------------------------------------------
 # Locking
 # ---------------------------------------------------------------------------
 
 
 @contextmanager
-def _flock_or_skip() -> Iterator[bool]:
-    """Yield True if we hold the sync lock, False if another run is in progress."""
-    _ensure_cache_dir()
-    f = LOCK_FILE.open("w")
+def _flock_or_skip(lock_file: Path) -> Iterator[bool]:
+    """Yield True if we hold ``lock_file``, False if another run holds it."""
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    f = lock_file.open("w")
     try:
         try:
             fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
@@ -219,6 +368,46 @@ def _flock_or_skip() -> Iterator[bool]:
         f.close()
 
 
+@contextmanager
+def _state_lock() -> Iterator[None]:
+    """Serialize read-modify-write of the JSON state files across processes.
+
+    Blocking, but only ever held for a load + save. Not reentrant: flock
+    locks belong to the open file, so nesting this deadlocks.
+    """
+    _ensure_cache_dir()
+    with STATE_LOCK_FILE.open("w") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _lock_key(label: str) -> str:
+    """Lock granularity: a top-level runtime path; shards share their tree's lock.
+
+    Watch mode syncs ``.claude/projects`` unsharded, so shard-level locks
+    wouldn't see it conflicting with a sharded pull.
+    """
+    return _shard_parent(label) or label
+
+
+def _lock_path(key: str) -> Path:
+    return LOCK_DIR / (re.sub(r"[^A-Za-z0-9._-]+", "_", key.strip("/")) + ".lock")
+
+
+@contextmanager
+def _path_locks(keys: Iterable[str]) -> Iterator[set[str]]:
+    """Try every key's lock without blocking; yield the set actually held."""
+    held: set[str] = set()
+    with ExitStack() as stack:
+        for key in sorted(set(keys)):
+            if stack.enter_context(_flock_or_skip(_lock_path(key))):
+                held.add(key)
+        yield held
+
+
 # ---------------------------------------------------------------------------
 # Notification
 # ---------------------------------------------------------------------------
@@ -400,6 +589,16 @@ def _trail(p: Path) -> str:
 # ---------------------------------------------------------------------------
 
 
+# Entry names never synced, at any depth. Shared by the rsync filter and the
+# manifest fingerprint walk so both see the same tree.
+_EXCLUDE_NAMES: frozenset[str] = frozenset((*CACHE_DIR_PATTERNS, ".git", ".DS_Store"))
+_EXCLUDE_GLOBS: tuple[str, ...] = ("*.lock",)
+
+
+def _is_excluded(name: str) -> bool:
+    return name in _EXCLUDE_NAMES or any(fnmatch(name, g) for g in _EXCLUDE_GLOBS)
+
+
 def _rsync_excludes() -> list[str]:
     args = [f"--exclude={p}" for p in CACHE_DIR_PATTERNS]
     args.extend(
@@ -413,6 +612,23 @@ def _rsync_excludes() -> list[str]:
     return args
 
 
+@contextmanager
+def _exclude_from(skip: frozenset[str]) -> Iterator[list[str]]:
+    """``--exclude-from`` args anchoring each ``skip`` relpath at the transfer root."""
+    if not skip:
+        yield []
+        return
+    _ensure_cache_dir()
+    fd, name = tempfile.mkstemp(prefix="rsync-skip.", suffix=".txt", dir=CACHE_DIR)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(f"/{rel}\n" for rel in sorted(skip))
+        yield [f"--exclude-from={name}"]
+    finally:
+        with suppress(OSError):
+            Path(name).unlink()
+
+
 def _run_rsync(args: list[str], timeout: int) -> tuple[int, str]:
     try:
         result = subprocess.run(
@@ -430,37 +646,125 @@ def _run_rsync(args: list[str], timeout: int) -> tuple[int, str]:
     return result.returncode, out.strip()
 
 
-def sync_path(
+@functools.cache
+def _rsync_reports_stats() -> bool:
+    """True if RSYNC_BIN is GNU rsync, whose ``--stats`` block we know how to parse.
+
+    openrsync (``/usr/bin/rsync`` on macOS) doesn't accept every GNU flag, so
+    ``--stats`` is only passed once ``--version`` confirms the real thing.
+    """
+    code, out = _run_rsync([RSYNC_BIN, "--version"], timeout=10)
+    return code == 0 and "openrsync" not in out and "rsync  version" in out
+
+
+# GNU rsync --stats lines; 3.1+ groups digits with commas.
+_RSYNC_STAT_PATTERNS: dict[str, re.Pattern[str]] = {
+    "files_seen": re.compile(r"^Number of files: ([\d,]+)", re.MULTILINE),
+    "files_copied": re.compile(
+        r"^Number of (?:regular )?files transferred: ([\d,]+)", re.MULTILINE
+    ),
+    "bytes_copied": re.compile(r"^Total transferred file size: ([\d,]+)", re.MULTILINE),
+}
+
+
+def _parse_rsync_stats(output: str) -> CopyStats | None:
+    """Counters from an ``rsync --stats`` report, or None if it isn't there."""
+    values: dict[str, int] = {}
+    for field, pattern in _RSYNC_STAT_PATTERNS.items():
+        m = pattern.search(output)
+        if m is None:
+            return None
+        values[field] = int(m.group(1).replace(",", ""))
+    return CopyStats(**values)
+
+
+def _sync_engine() -> str:
+    """Engine from ``SYNC_RUNTIME_ENGINE``, else ``DEFAULT_SYNC_ENGINE``."""
+    raw = read_dotfiles_config("SYNC_RUNTIME_ENGINE")
+    if raw is None:
+        return DEFAULT_SYNC_ENGINE
+    if raw not in SYNC_ENGINES:
+        _log(f"ignoring unknown SYNC_RUNTIME_ENGINE={raw!r}")
+        return DEFAULT_SYNC_ENGINE
+    return raw
+
+
+def _sync_path_native(
+    source: Path, dest: Path, timeout: int, skip: frozenset[str]
+) -> tuple[bool, str, CopyStats | None]:
+    try:
+        stats = sync_tree(source, dest, exclude=_is_excluded, skip=skip, timeout=timeout)
+    except TimeoutError as e:
+        return False, f"FAIL (124): {source} → {dest}: {e}", None
+    except OSError as e:
+        return False, f"FAIL (native): {source} → {dest}: {e}", None
+    return True, (
+        f"ok: {source} → {dest} "
+        f"({stats.files_copied}/{stats.files_seen} file(s), {stats.bytes_copied} B)"
+    ), stats
+
+
+def _sync_path_stats(
     source: Path,
     dest: Path,
     timeout: int,
-) -> tuple[bool, str]:
-    """Sync a single source path to dest. Skips silently if source is missing."""
+    engine: str | None = None,
+    skip: frozenset[str] = frozenset(),
+) -> tuple[bool, str, CopyStats | None]:
+    """``sync_path`` plus transfer counters (None when the engine didn't report any).
+
+    ``skip`` lists POSIX relpaths under a directory ``source`` to leave out.
+    """
     if not source.exists():
-        return True, f"skip (source absent): {source}"
+        return True, f"skip (source absent): {source}", CopyStats()
     dest.parent.mkdir(parents=True, exist_ok=True)
+    if (engine or _sync_engine()) == "native":
+        return _sync_path_native(source, dest, timeout, skip)
+    stats_args = ["--stats"] if _rsync_reports_stats() else []
     if source.is_dir():
-        args = [
-            RSYNC_BIN,
-            "-a",
-            "--update",
-            *_rsync_excludes(),
-            _trail(source),
-            _trail(dest),
-        ]
+        with _exclude_from(skip) as skip_args:
+            code, out = _run_rsync(
+                [
+                    RSYNC_BIN,
+                    "-a",
+                    "--update",
+                    *stats_args,
+                    *_rsync_excludes(),
+                    *skip_args,
+                    _trail(source),
+                    _trail(dest),
+                ],
+                timeout=timeout,
+            )
     else:
         args = [
             RSYNC_BIN,
             "-a",
             "--update",
+            *stats_args,
             *_rsync_excludes(),
             str(source),
             str(dest),
         ]
-    code, out = _run_rsync(args, timeout=timeout)
+        code, out = _run_rsync(args, timeout=timeout)
     if code == 0:
-        return True, f"ok: {source} → {dest}"
-    return False, f"FAIL ({code}): {source} → {dest}: {out[-300:]}"
+        stats = _parse_rsync_stats(out) if stats_args else None
+        return True, f"ok: {source} → {dest}", stats
+    return False, f"FAIL ({code}): {source} → {dest}: {out[-300:]}", None
+
+
+def sync_path(
+    source: Path,
+    dest: Path,
+    timeout: int,
+    engine: str | None = None,
+) -> tuple[bool, str]:
+    """Sync a single source path to dest. Skips silently if source is missing.
+
+    ``engine`` is one of ``SYNC_ENGINES``; ``None`` reads the configured one.
+    """
+    ok, msg, _stats = _sync_path_stats(source, dest, timeout, engine)
+    return ok, msg
 
 
 def _ssh_filename_matches_patterns(name: str) -> bool:
@@ -539,122 +843,936 @@ def _sync_ssh_keys_push(repo: Path) -> tuple[int, list[str]]:
     return successes, failures
 
 
-def _do_pull() -> tuple[bool, str]:
-    """GDrive runtime → local. Returns (ok, summary_line)."""
-    runtime = _resolve_runtime_root()
-    if runtime is None:
-        return False, "runtime root unavailable (missing ~/.device_id or no cloud storage mounted)"
-    if not runtime.is_dir():
-        # First-ever run on this machine before any push happened. Not an error.
-        return True, f"runtime root does not yet exist: {runtime}"
-    repo = _repo_root()
-    if repo is None:
-        return False, f"repo root unavailable: {PRIVATE_DOTFILES} not a directory"
+# ---------------------------------------------------------------------------
+# Change-detection manifest
+# ---------------------------------------------------------------------------
 
-    failures: list[str] = []
-    successes = 0
-    for rel in REPO_RUNTIME_PATHS:
-        src = runtime / "repo" / rel
-        dst = repo / rel
-        ok, msg = sync_path(src, dst, timeout=PULL_TIMEOUT_SECONDS)
-        _log(msg)
+
+def _fingerprint(path: Path, skip: frozenset[str] = frozenset()) -> tuple[str, str] | None:
+    """Digests of every file under ``path``: ``(identity, shape)``.
+
+    ``identity`` covers (relpath, size, mtime, inode) and changes whenever
+    anything on this side is touched. ``shape`` drops the inode and rounds
+    mtime to whole seconds (cloud mounts don't keep nanoseconds), so a source
+    and its rsync'd mirror produce the same ``shape``. ``None`` when ``path``
+    is absent. Only ``lstat`` data is read — no file contents — and excluded
+    names and ``skip`` relpaths are pruned exactly as the engines prune them.
+    """
+    try:
+        st = path.lstat()
+    except OSError:
+        return None
+    identity, shape = hashlib.sha1(), hashlib.sha1()
+
+    def add(rel: str, est: os.stat_result) -> None:
+        shape.update(f"{rel}\0{est.st_size}\0{est.st_mtime_ns // 1_000_000_000}\n".encode())
+        identity.update(f"{rel}\0{est.st_size}\0{est.st_mtime_ns}\0{est.st_ino}\n".encode())
+
+    if not path.is_dir():
+        add(".", st)
+        return identity.hexdigest(), shape.hexdigest()
+    stack: list[tuple[str, str]] = [(str(path), "")]
+    while stack:
+        directory, rel = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            identity.update(f"{rel}\0unreadable\n".encode())
+            continue
+        for entry in entries:
+            entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+            if _is_excluded(entry.name) or entry_rel in skip:
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, entry_rel))
+                    continue
+                add(entry_rel, entry.stat(follow_symlinks=False))
+            except OSError:
+                continue
+    return identity.hexdigest(), shape.hexdigest()
+
+
+def _load_manifest() -> dict[str, dict[str, str]]:
+    if not MANIFEST_FILE.is_file():
+        return {}
+    try:
+        with MANIFEST_FILE.open("r", encoding="utf-8") as f:
+            data: object = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    manifest: dict[str, dict[str, str]] = {}
+    for label, entry in cast("dict[str, object]", data).items():
+        if isinstance(entry, dict):
+            manifest[label] = {
+                str(k): str(v) for k, v in cast("dict[object, object]", entry).items()
+            }
+    return manifest
+
+
+def _save_manifest(manifest: dict[str, dict[str, str]]) -> None:
+    _ensure_cache_dir()
+    tmp = MANIFEST_FILE.with_suffix(".json.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    tmp.replace(MANIFEST_FILE)
+
+
+def _fingerprint_pair(
+    source: Path, dest: Path, skip: frozenset[str] = frozenset()
+) -> dict[str, str] | None:
+    """Manifest entry for a source/dest pair, or None if they aren't in sync.
+
+    Only a pair whose two sides mirror each other is worth remembering: if
+    something was written to either side while rsync ran (zsh appending to
+    history mid-pull), the shapes differ, nothing is recorded, and the next
+    tick syncs again. Keyed by path string rather than "source"/"dest" so a
+    pull's entry also matches the push that follows it in the same tick.
+    """
+    src = _fingerprint(source, skip)
+    dst = _fingerprint(dest, skip)
+    if src is None or dst is None or src[1] != dst[1]:
+        return None
+    return {str(source): src[0], str(dest): dst[0]}
+
+
+# ---------------------------------------------------------------------------
+# Append-only tail sync
+# ---------------------------------------------------------------------------
+
+
+def _load_append_state() -> dict[str, dict[str, object]]:
+    if not APPEND_STATE_FILE.is_file():
+        return {}
+    try:
+        with APPEND_STATE_FILE.open("r", encoding="utf-8") as f:
+            data: object = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        str(k): cast("dict[str, object]", v)
+        for k, v in cast("dict[object, object]", data).items()
+        if isinstance(v, dict)
+    }
+
+
+def _save_append_state(records: dict[str, dict[str, object]]) -> None:
+    _ensure_cache_dir()
+    tmp = APPEND_STATE_FILE.with_suffix(".json.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(records, f, indent=2, sort_keys=True)
+    tmp.replace(APPEND_STATE_FILE)
+
+
+def _append_key(source: Path, dest: Path) -> str:
+    return f"{source} -> {dest}"
+
+
+def _tail_pairs(source: Path, dest: Path) -> tuple[list[tuple[Path, Path]], bool]:
+    """The (src, dst) regular-file pairs under an append-only job, at any depth.
+
+    The flag is True if the tree also holds entries that aren't regular
+    files (symlinks and the like), which need the engine's normal copy.
+    """
+    if not source.is_dir():
+        return [(source, dest)], False
+    pairs: list[tuple[Path, Path]] = []
+    others = False
+    stack = [(source, dest)]
+    while stack:
+        src_dir, dst_dir = stack.pop()
+        with os.scandir(src_dir) as it:
+            for entry in it:
+                if _is_excluded(entry.name):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((Path(entry.path), dst_dir / entry.name))
+                elif entry.is_file(follow_symlinks=False):
+                    pairs.append((Path(entry.path), dst_dir / entry.name))
+                else:
+                    others = True
+    return pairs, others
+
+
+def _try_tail(src: Path, dst: Path, record: dict[str, object] | None) -> int | None:
+    """Append ``src``'s new bytes to ``dst`` if it's safe. None means "needs a full copy"."""
+    if record is None:
+        return None
+    offset, digest, mtime = record.get("offset"), record.get("digest"), record.get("mtime_ns")
+    if not isinstance(offset, int) or not isinstance(digest, str):
+        return None
+    try:
+        s_st, d_st = src.stat(), dst.stat()
+    except OSError:
+        return None
+    if d_st.st_size != offset or s_st.st_size < offset:
+        return None
+    if s_st.st_size == offset:
+        # Nothing appended. Same size *and* same mtime means untouched;
+        # a same-size rewrite gets the full copy.
+        return 0 if s_st.st_mtime_ns == mtime else None
+    if prefix_digest(src, offset) != digest or prefix_digest(dst, offset) != digest:
+        return None
+    return append_tail(src, dst, offset, s_st.st_size)
+
+
+def _record_tail(src: Path, dst: Path, records: dict[str, dict[str, object]]) -> None:
+    """Remember ``dst`` as a synced prefix of ``src``, or forget the pair."""
+    key = _append_key(src, dst)
+    try:
+        s_st, d_st = src.stat(), dst.stat()
+    except OSError:
+        records.pop(key, None)
+        return
+    if s_st.st_size != d_st.st_size:
+        records.pop(key, None)
+        return
+    records[key] = {
+        "offset": d_st.st_size,
+        "digest": prefix_digest(dst, d_st.st_size),
+        "mtime_ns": s_st.st_mtime_ns,
+    }
+
+
+def _tail_sync(
+    job: SyncJob, records: dict[str, dict[str, object]], engine: str
+) -> tuple[bool, str, CopyStats | None]:
+    """Sync an append-only job, copying only appended bytes where possible."""
+    if not job.source.exists():
+        return True, f"skip (source absent): {job.source}", CopyStats()
+    job.dest.parent.mkdir(parents=True, exist_ok=True)
+    pairs, others = _tail_pairs(job.source, job.dest)
+    tail = CopyStats(files_seen=len(pairs))
+    needs_full = False
+    for src, dst in pairs:
+        try:
+            n = _try_tail(src, dst, records.get(_append_key(src, dst)))
+        except OSError as e:
+            _log(f"tail sync of {src} failed, falling back to full copy: {e}")
+            n = None
+        if n is None:
+            needs_full = True
+        elif n:
+            tail.files_copied += 1
+            tail.bytes_copied += n
+    if needs_full:
+        ok, msg, stats = _sync_path_stats(job.source, job.dest, job.timeout, engine)
+    elif others:
+        # Every file was tailed; the engine copies the rest around them.
+        tailed = frozenset(src.relative_to(job.source).as_posix() for src, _dst in pairs)
+        ok, msg, stats = _sync_path_stats(job.source, job.dest, job.timeout, engine, tailed)
+        msg = f"{msg}; tail +{tail.bytes_copied} B"
+        if stats is not None:
+            stats.files_seen += tail.files_seen
+            stats.files_copied += tail.files_copied
+            stats.bytes_copied += tail.bytes_copied
+    else:
+        ok, msg = True, f"ok (tail): {job.source} → {job.dest} (+{tail.bytes_copied} B)"
+        stats = tail
+    for src, dst in pairs:
         if ok:
-            successes += 1
+            _record_tail(src, dst, records)
         else:
-            failures.append(msg)
+            records.pop(_append_key(src, dst), None)
+    return ok, msg, stats
+
+
+# ---------------------------------------------------------------------------
+# Worker pool
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class SyncJob:
+    """One independent source → dest sync, run on the worker pool."""
+
+    # Bucket-relative name, e.g. ``repo/zsh_history/`` or ``home/.claude/projects``.
+    label: str
+    source: Path
+    dest: Path
+    timeout: int
+    # POSIX relpaths under a directory source left out of the sync
+    # (archived sessions, see runtime_archive).
+    skip: frozenset[str] = frozenset()
+
+
+@dataclass(frozen=True)
+class PathResult:
+    """Outcome of a single ``SyncJob``."""
+
+    label: str
+    ok: bool
+    message: str
+    elapsed: float
+    # True when the manifest showed nothing changed and rsync never ran.
+    skipped: bool = False
+    # Post-sync manifest entry; None drops the path from the manifest.
+    fingerprint: dict[str, str] | None = None
+    # Transfer counters from the engine; None if it didn't report them
+    # (openrsync, failures).
+    stats: CopyStats | None = None
+    # True when another run held this path's lock, so it was left alone.
+    locked: bool = False
+
+
+@dataclass(frozen=True)
+class SyncOptions:
+    """Knobs for one pull/push run, resolved from config and CLI flags."""
+
+    concurrency: int = DEFAULT_CONCURRENCY
+    # Ignore the manifest and rsync every path.
+    force: bool = False
+    engine: str = DEFAULT_SYNC_ENGINE
+
+
+def _concurrency() -> int:
+    """Worker pool size from ``SYNC_RUNTIME_CONCURRENCY``, else the default."""
+    raw = read_dotfiles_config("SYNC_RUNTIME_CONCURRENCY")
+    if raw is None:
+        return DEFAULT_CONCURRENCY
+    try:
+        value = int(raw)
+    except ValueError:
+        _log(f"ignoring invalid SYNC_RUNTIME_CONCURRENCY={raw!r}")
+        return DEFAULT_CONCURRENCY
+    return max(1, value)
+
+
+def _job_timeout(source: Path, direction_timeout: int) -> int:
+    """Per-path timeout: directories get the direction budget, files a short one."""
+    if source.is_dir():
+        return direction_timeout
+    return min(FILE_TIMEOUT_SECONDS, direction_timeout)
+
+
+def _shard_parent(label: str) -> str | None:
+    """The ``SHARDED_PATHS`` entry a shard label belongs to, if any."""
+    parent = label.rpartition("/")[0]
+    return parent if parent in SHARDED_PATHS else None
+
+
+def _shard_jobs(
+    label: str, source: Path, dest: Path, direction_timeout: int, skip: frozenset[str]
+) -> list[SyncJob]:
+    """One job per non-excluded top-level entry of ``source``.
+
+    ``skip`` relpaths are re-rooted onto the shard they fall in; a
+    top-level file that is itself skipped gets no job.
+    """
+    jobs: list[SyncJob] = []
+    with os.scandir(source) as it:
+        names = sorted(e.name for e in it if not _is_excluded(e.name))
+    for name in names:
+        if name in skip:
+            continue
+        prefix = f"{name}/"
+        shard_skip = frozenset(rel[len(prefix) :] for rel in skip if rel.startswith(prefix))
+        src = source / name
+        jobs.append(
+            SyncJob(
+                f"{label}/{name}",
+                src,
+                dest / name,
+                _job_timeout(src, direction_timeout),
+                shard_skip,
+            )
+        )
+    return jobs
+
+
+def _archive_dir(runtime: Path) -> Path:
+    return runtime / ARCHIVE_SUBDIR
+
+
+def _archived_skip(runtime: Path) -> frozenset[str]:
+    """Relpaths under ``.claude/projects`` that live in cold storage, not the mirror."""
+    index = load_index(_archive_dir(runtime))
+    if not index:
+        return frozenset()
+    return archived_unchanged(index, Path.home() / ARCHIVE_LABEL.removeprefix("home/"))
+
+
+def _build_jobs(kind: str, runtime: Path, repo: Path, *, shard: bool = True) -> list[SyncJob]:
+    """Expand REPO_/HOME_RUNTIME_PATHS into jobs for one direction.
+
+    With ``shard``, each ``SHARDED_PATHS`` tree is split by its source-side
+    top-level entries (see ``_shard_jobs``).
+    """
+    direction_timeout = PULL_TIMEOUT_SECONDS if kind == "pull" else PUSH_TIMEOUT_SECONDS
+    pairs: list[tuple[str, Path, Path]] = []
+    for rel in REPO_RUNTIME_PATHS:
+        local, remote = repo / rel, runtime / "repo" / rel
+        pairs.append((f"repo/{rel}", local, remote))
     for rel in HOME_RUNTIME_PATHS:
-        src = runtime / "home" / rel
-        dst = Path.home() / rel
-        ok, msg = sync_path(src, dst, timeout=PULL_TIMEOUT_SECONDS)
-        _log(msg)
-        if ok:
-            successes += 1
+        local, remote = Path.home() / rel, runtime / "home" / rel
+        pairs.append((f"home/{rel}", local, remote))
+
+    jobs: list[SyncJob] = []
+    for label, local, remote in pairs:
+        source, dest = (remote, local) if kind == "pull" else (local, remote)
+        skip = _archived_skip(runtime) if label == ARCHIVE_LABEL else frozenset()
+        if shard and label in SHARDED_PATHS and source.is_dir():
+            jobs.extend(_shard_jobs(label, source, dest, direction_timeout, skip))
+            continue
+        jobs.append(
+            SyncJob(label, source, dest, _job_timeout(source, direction_timeout), skip)
+        )
+    return jobs
+
+
+def _valid_round(state: dict[str, object], kind: str) -> dict[str, object] | None:
+    rounds = state.get("shard_rounds")
+    if not isinstance(rounds, dict):
+        return None
+    current = cast("dict[str, object]", rounds).get(kind)
+    if not isinstance(current, dict):
+        return None
+    current = cast("dict[str, object]", current)
+    started = current.get("started")
+    if not isinstance(started, (int, float)):
+        return None
+    if _now_epoch() - started > SHARD_ROUND_MAX_AGE_SECONDS:
+        return None
+    return current
+
+
+def _round_done(current: dict[str, object] | None) -> set[str]:
+    done = current.get("done") if current is not None else None
+    return {str(x) for x in cast("list[object]", done)} if isinstance(done, list) else set()
+
+
+def _first_pass(jobs: list[SyncJob]) -> bool:
+    """Whether a sharded tree's destination is missing or empty (nothing synced yet)."""
+    for dest in {j.dest.parent for j in jobs if _shard_parent(j.label)}:
+        try:
+            with os.scandir(dest) as it:
+                if next(it, None) is None:
+                    return True
+        except FileNotFoundError:
+            return True
+        except OSError:
+            continue
+    return False
+
+
+def _resume_shards(kind: str, jobs: list[SyncJob]) -> list[SyncJob]:
+    """Drop shards already finished in this direction's open round."""
+    done = _round_done(_valid_round(_load_state(), kind))
+    if not done:
+        return jobs
+    remaining = [j for j in jobs if not (_shard_parent(j.label) and j.label in done)]
+    _log(f"{kind}: resuming first pass, {len(jobs) - len(remaining)} shard(s) already done")
+    return remaining
+
+
+def _advance_shards(
+    kind: str, jobs: list[SyncJob], results: list[PathResult], *, first_pass: bool
+) -> None:
+    """Record per-shard outcomes and move this direction's round forward.
+
+    ``jobs`` is the full (pre-resume) job list, so the round closes once
+    every current shard has succeeded at least once since it opened. A
+    round only opens on a ``first_pass`` (see ``_first_pass``, checked
+    before the run), and closes early when a resumed run finishes nothing.
+    """
+    shard_labels = {j.label for j in jobs if _shard_parent(j.label)}
+    if not shard_labels:
+        return
+    with _state_lock():
+        state = _load_state()
+
+        all_shards = state.get("shards")
+        shards = cast("dict[str, object]", all_shards) if isinstance(all_shards, dict) else {}
+        previous = shards.get(kind)
+        records = cast("dict[str, object]", previous) if isinstance(previous, dict) else {}
+        # Forget shards whose project no longer exists on the source side.
+        records = {k: v for k, v in records.items() if k in shard_labels}
+        for r in results:
+            if r.label not in shard_labels or r.locked:
+                continue
+            old = records.get(r.label)
+            record = dict(cast("dict[str, object]", old)) if isinstance(old, dict) else {}
+            if r.ok:
+                record["last_ok"] = _now()
+                record["failures"] = 0
+            else:
+                failures = record.get("failures", 0)
+                record["failures"] = (failures if isinstance(failures, int) else 0) + 1
+            records[r.label] = record
+        shards[kind] = records
+        state["shards"] = shards
+
+        all_rounds = state.get("shard_rounds")
+        rounds = cast("dict[str, object]", all_rounds) if isinstance(all_rounds, dict) else {}
+        current = _valid_round(state, kind)
+        finished = {r.label for r in results if r.ok and not r.locked} & shard_labels
+        done = _round_done(current) | finished
+        # In a resumed round, nothing new finishing means the rest is failing.
+        close = not first_pass if current is None else not finished
+        if close or shard_labels <= done:
+            rounds.pop(kind, None)
         else:
-            failures.append(msg)
+            started = current["started"] if current is not None else _now_epoch()
+            rounds[kind] = {"started": started, "done": sorted(done & shard_labels)}
+        state["shard_rounds"] = rounds
+        _save_state(state)
+
+
+def _run_job(
+    job: SyncJob,
+    previous: dict[str, str] | None,
+    options: SyncOptions,
+    tail_records: dict[str, dict[str, object]],
+) -> PathResult:
+    start = time.monotonic()
+    if not options.force and previous is not None:
+        current = _fingerprint_pair(job.source, job.dest, job.skip)
+        if current == previous:
+            return PathResult(
+                job.label,
+                True,
+                f"unchanged: {job.source}",
+                time.monotonic() - start,
+                skipped=True,
+                fingerprint=current,
+            )
+    if job.label in APPEND_ONLY_PATHS:
+        ok, msg, stats = _tail_sync(job, tail_records, options.engine)
+    else:
+        ok, msg, stats = _sync_path_stats(
+            job.source, job.dest, job.timeout, options.engine, job.skip
+        )
+    _log(msg)
+    fingerprint = _fingerprint_pair(job.source, job.dest, job.skip) if ok else None
+    return PathResult(
+        job.label, ok, msg, time.monotonic() - start, fingerprint=fingerprint, stats=stats
+    )
 
-    if _ssh_backend() == "disk-keys":
-        ssh_ok, ssh_failures = _sync_ssh_keys_pull(repo)
-        successes += ssh_ok
-        failures.extend(ssh_failures)
 
+def _run_jobs(kind: str, jobs: list[SyncJob], options: SyncOptions) -> list[PathResult]:
+    """Run ``jobs`` on a bounded thread pool; results come back in job order.
+
+    Each worker just waits on its own rsync subprocess (whose timeout is the
+    job's), so threads are enough. Directory jobs are submitted first so the
+    long transfers start immediately instead of queueing behind small files.
+
+    Each path's lock (see ``_lock_key``) is taken for the whole run; paths
+    another run holds come back as ``locked`` results without being touched.
+
+    Paths whose fingerprints match the manifest are skipped; the manifest is
+    updated once all workers finish, and the tick's per-path timings and
+    counters are appended to ``METRICS_FILE``.
+    """
+    if not jobs:
+        return []
+    tick_start = time.monotonic()
+    manifest = _load_manifest()
+    # Workers only touch the records of their own job's files.
+    tail_records = _load_append_state()
+    tail_before = dict(tail_records)
+    results: list[PathResult | None] = [None] * len(jobs)
+    with _path_locks(_lock_key(j.label) for j in jobs) as held:
+        for key in sorted({_lock_key(j.label) for j in jobs} - held):
+            _log(f"{kind} of {key} skipped: lock held")
+        runnable: list[int] = []
+        for i, job in enumerate(jobs):
+            if _lock_key(job.label) in held:
+                runnable.append(i)
+                continue
+            results[i] = PathResult(
+                job.label, True, f"locked: {job.source}", 0.0, skipped=True, locked=True
+            )
+        runnable.sort(key=lambda i: not jobs[i].source.is_dir())
+        if runnable:
+            with ThreadPoolExecutor(max_workers=min(options.concurrency, len(runnable))) as pool:
+                futures = {
+                    i: pool.submit(
+                        _run_job, jobs[i], manifest.get(jobs[i].label), options, tail_records
+                    )
+                    for i in runnable
+                }
+                for i, future in futures.items():
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:  # one bad path must not sink the whole tick
+                        msg = f"FAIL (worker): {jobs[i].source} → {jobs[i].dest}: {e}"
+                        _log(msg)
+                        results[i] = PathResult(jobs[i].label, False, msg, 0.0)
+        done = [r for r in results if r is not None]
+        # Re-read under the state lock and apply only this run's paths, so a
+        # concurrent run's entries for other paths survive.
+        touched = {
+            k for k in tail_before.keys() | tail_records.keys()
+            if tail_before.get(k) != tail_records.get(k)
+        }
+        try:
+            with _state_lock():
+                manifest = _load_manifest()
+                for r in done:
+                    if r.locked:
+                        continue
+                    if r.fingerprint is None:
+                        manifest.pop(r.label, None)
+                    else:
+                        manifest[r.label] = r.fingerprint
+                _save_manifest(manifest)
+                if touched:
+                    merged = _load_append_state()
+                    for k in touched:
+                        if k in tail_records:
+                            merged[k] = tail_records[k]
+                        else:
+                            merged.pop(k, None)
+                    _save_append_state(merged)
+        except OSError as e:
+            _log(f"manifest write failed: {e}")
+    _record_metrics(kind, done, time.monotonic() - tick_start)
+    return done
+
+
+def _summarize(
+    kind: str, results: list[PathResult], extra_ok: int, extra_failures: list[str]
+) -> tuple[bool, str]:
+    failures = [r.message for r in results if not r.ok] + extra_failures
+    successes = sum(1 for r in results if r.ok) + extra_ok
     if failures:
         return False, (
-            f"pull: {len(failures)} failure(s); {successes} ok; "
+            f"{kind}: {len(failures)} failure(s); {successes} ok; "
             f"first error: {failures[0]}"
         )
-    return True, f"pull: {successes} path(s) synced"
+    locked = sum(1 for r in results if r.locked)
+    skipped = sum(1 for r in results if r.skipped) - locked
+    slowest = max(results, key=lambda r: r.elapsed, default=None)
+    tail = f" (slowest: {slowest.label} {slowest.elapsed:.1f}s)" if slowest else ""
+    busy = f", {locked} locked by another run" if locked else ""
+    return True, f"{kind}: {successes - locked} path(s) ok, {skipped} unchanged{busy}{tail}"
+
+
+SyncOutcome = tuple[bool, str, list[PathResult]]
+
+
+def pull(options: SyncOptions | None = None) -> SyncOutcome:
+    """GDrive runtime → local. Returns (ok, summary_line, per-path results)."""
+    runtime = _resolve_runtime_root()
+    if runtime is None:
+        return (
+            False,
+            "runtime root unavailable (missing ~/.device_id or no cloud storage mounted)",
+            [],
+        )
+    if not runtime.is_dir():
+        # First-ever run on this machine before any push happened. Not an error.
+        return True, f"runtime root does not yet exist: {runtime}", []
+    repo = _repo_root()
+    if repo is None:
+        return False, f"repo root unavailable: {PRIVATE_DOTFILES} not a directory", []
+
+    jobs = _build_jobs("pull", runtime, repo)
+    first_pass = _first_pass(jobs)
+    results = _run_jobs("pull", _resume_shards("pull", jobs), options or SyncOptions())
+    _advance_shards("pull", jobs, results, first_pass=first_pass)
+
+    ssh_ok, ssh_failures = 0, []
+    if _ssh_backend() == "disk-keys":
+        with _flock_or_skip(_lock_path(SSH_LOCK_KEY)) as held:
+            if held:
+                ssh_ok, ssh_failures = _sync_ssh_keys_pull(repo)
+            else:
+                _log("ssh key pull skipped: lock held")
+
+    ok, summary = _summarize("pull", results, ssh_ok, ssh_failures)
+    return ok, summary, results
 
 
-def _do_push() -> tuple[bool, str]:
-    """Local → GDrive runtime. Returns (ok, summary_line)."""
+def push(options: SyncOptions | None = None) -> SyncOutcome:
+    """Local → GDrive runtime. Returns (ok, summary_line, per-path results)."""
     runtime = _resolve_runtime_root()
     if runtime is None:
-        return False, "runtime root unavailable (missing ~/.device_id or no cloud storage mounted)"
+        return (
+            False,
+            "runtime root unavailable (missing ~/.device_id or no cloud storage mounted)",
+            [],
+        )
     repo = _repo_root()
     if repo is None:
-        return False, f"repo root unavailable: {PRIVATE_DOTFILES} not a directory"
+        return False, f"repo root unavailable: {PRIVATE_DOTFILES} not a directory", []
     runtime.mkdir(parents=True, exist_ok=True)
 
-    failures: list[str] = []
-    successes = 0
-    for rel in REPO_RUNTIME_PATHS:
-        src = repo / rel
-        dst = runtime / "repo" / rel
-        ok, msg = sync_path(src, dst, timeout=PUSH_TIMEOUT_SECONDS)
-        _log(msg)
-        if ok:
-            successes += 1
-        else:
-            failures.append(msg)
-    for rel in HOME_RUNTIME_PATHS:
-        src = Path.home() / rel
-        dst = runtime / "home" / rel
-        ok, msg = sync_path(src, dst, timeout=PUSH_TIMEOUT_SECONDS)
-        _log(msg)
+    jobs = _build_jobs("push", runtime, repo)
+    first_pass = _first_pass(jobs)
+    results = _run_jobs("push", _resume_shards("push", jobs), options or SyncOptions())
+    _advance_shards("push", jobs, results, first_pass=first_pass)
+
+    ssh_ok, ssh_failures = 0, []
+    if _ssh_backend() == "disk-keys":
+        with _flock_or_skip(_lock_path(SSH_LOCK_KEY)) as held:
+            if held:
+                ssh_ok, ssh_failures = _sync_ssh_keys_push(repo)
+            else:
+                _log("ssh key push skipped: lock held")
+
+    ok, summary = _summarize("push", results, ssh_ok, ssh_failures)
+    return ok, summary, results
+
+
+def _record_result(
+    kind: str, ok: bool, message: str, results: list[PathResult] | None = None
+) -> None:
+    with _state_lock():
+        state = _load_state()
+        counter_key = f"consecutive_{kind}_failures"
+        last_ok_key = f"last_{kind}_ok"
+        if results is not None:
+            state[f"last_{kind}_failed_paths"] = [r.label for r in results if not r.ok]
         if ok:
-            successes += 1
+            state[counter_key] = 0
+            state[last_ok_key] = _now()
+            _log(f"{kind} ok: {message[:200]}")
         else:
-            failures.append(msg)
+            prev = state.get(counter_key, 0)
+            state[counter_key] = (prev if isinstance(prev, int) else 0) + 1
+            _log(f"{kind} FAIL: {message[:500]}")
+            _maybe_notify(state, kind)
+        _save_state(state)
 
-    if _ssh_backend() == "disk-keys":
-        ssh_ok, ssh_failures = _sync_ssh_keys_push(repo)
-        successes += ssh_ok
-        failures.extend(ssh_failures)
 
-    if failures:
-        return False, (
-            f"push: {len(failures)} failure(s); {successes} ok; "
-            f"first error: {failures[0]}"
-        )
-    return True, f"push: {successes} path(s) synced"
+def _record_outcome(kind: str, outcome: SyncOutcome) -> bool:
+    """Record a pull/push unless every path was locked by another run (a skip)."""
+    ok, msg, results = outcome
+    if results and all(r.locked for r in results):
+        _log(f"{kind} skipped: lock held")
+        return ok
+    _record_result(kind, ok, msg, results)
+    return ok
 
 
-def _record_result(kind: str, ok: bool, message: str) -> None:
-    state = _load_state()
-    counter_key = f"consecutive_{kind}_failures"
-    last_ok_key = f"last_{kind}_ok"
-    if ok:
-        state[counter_key] = 0
-        state[last_ok_key] = _now()
-        _log(f"{kind} ok: {message[:200]}")
-    else:
-        prev = state.get(counter_key, 0)
-        state[counter_key] = (prev if isinstance(prev, int) else 0) + 1
-        _log(f"{kind} FAIL: {message[:500]}")
-        _maybe_notify(state, kind)
-    _save_state(state)
+# ---------------------------------------------------------------------------
+# Cold-storage archive
+# ---------------------------------------------------------------------------
+
+
+def _archive_days() -> int:
+    """Archive age from ``SYNC_RUNTIME_ARCHIVE_DAYS``, else the default. 0 = off."""
+    raw = read_dotfiles_config("SYNC_RUNTIME_ARCHIVE_DAYS")
+    if raw is None:
+        return DEFAULT_ARCHIVE_DAYS
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        _log(f"ignoring invalid SYNC_RUNTIME_ARCHIVE_DAYS={raw!r}")
+        return DEFAULT_ARCHIVE_DAYS
 
 
-def _run_with_lock(kind: str, op: Callable[[], tuple[bool, str]]) -> int:
-    with _flock_or_skip() as held:
+def _do_archive() -> tuple[bool, str]:
+    """Pack old ``.claude/projects`` sessions into the bucket's per-month bundles."""
+    days = _archive_days()
+    if days == 0:
+        return True, "archive: disabled (SYNC_RUNTIME_ARCHIVE_DAYS=0)"
+    runtime = _resolve_runtime_root()
+    if runtime is None:
+        return False, "archive: runtime root unavailable"
+    rel = ARCHIVE_LABEL.removeprefix("home/")
+    with _flock_or_skip(_lock_path(_lock_key(ARCHIVE_LABEL))) as held:
         if not held:
-            _log(f"{kind} skipped: lock held")
-            return 0
-        ok, msg = op()
-        _record_result(kind, ok, msg)
+            return True, f"archive: skipped, {ARCHIVE_LABEL} locked by another run"
+        try:
+            result = archive_old_files(
+                Path.home() / rel,
+                runtime / "home" / rel,
+                _archive_dir(runtime),
+                older_than_days=days,
+                exclude=_is_excluded,
+            )
+        except (OSError, tarfile.TarError) as e:
+            return False, f"archive: FAIL: {e}"
+    with _state_lock():
+        state = _load_state()
+        state["last_archive_ts"] = _now_epoch()
+        _save_state(state)
+    bundles = ", ".join(result.bundles) or "none"
+    return True, (
+        f"archive: {result.files} file(s), {result.bytes} B into {bundles}; "
+        f"{result.removed} mirror file(s) removed"
+    )
+
+
+def _maybe_archive() -> None:
+    """Run the archive stage if it hasn't run in ARCHIVE_INTERVAL_SECONDS."""
+    last = _load_state().get("last_archive_ts")
+    if isinstance(last, (int, float)) and _now_epoch() - last < ARCHIVE_INTERVAL_SECONDS:
+        return
+    _ok, msg = _do_archive()
+    _log(msg)
+
+
+def _do_restore(month: str) -> int:
+    """Unpack one month's bundles into ``~/.claude/projects``."""
+    runtime = _resolve_runtime_root()
+    if runtime is None:
+        print_error("runtime root unavailable (missing ~/.device_id or no cloud storage mounted)")
+        return 1
+    rel = ARCHIVE_LABEL.removeprefix("home/")
+    try:
+        restored, skipped = restore_month(_archive_dir(runtime), month, Path.home() / rel)
+    except FileNotFoundError as e:
+        print_error(str(e))
+        months = list_months(_archive_dir(runtime))
+        if months:
+            print_step(f"archived months: {', '.join(months)}")
+        return 1
+    except (OSError, tarfile.TarError) as e:
+        print_error(f"restore of {month} failed: {e}")
+        return 1
+    _log(f"restore {month}: {restored} file(s) restored, {skipped} skipped")
+    print_success(f"{month}: {restored} file(s) restored, {skipped} already present")
     return 0
 
 
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+
+def _record_metrics(kind: str, results: list[PathResult], elapsed: float) -> None:
+    """Append one tick's per-path timings and transfer counters to ``METRICS_FILE``."""
+    paths: list[dict[str, object]] = []
+    for r in results:
+        entry: dict[str, object] = {
+            "label": r.label,
+            "ok": r.ok,
+            "skipped": r.skipped,
+            "seconds": round(r.elapsed, 3),
+        }
+        if r.stats is not None:
+            entry["files_seen"] = r.stats.files_seen
+            entry["files"] = r.stats.files_copied
+            entry["bytes"] = r.stats.bytes_copied
+        paths.append(entry)
+    line = {
+        "ts": _now(),
+        "kind": kind,
+        "seconds": round(elapsed, 3),
+        "skipped": sum(1 for r in results if r.skipped),
+        "paths": paths,
+    }
+    _ensure_cache_dir()
+    try:
+        _rotate(METRICS_FILE, METRICS_MAX_BYTES)
+        with METRICS_FILE.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(line, sort_keys=True) + "\n")
+    except OSError as e:
+        _log(f"metrics write failed: {e}")
+
+
+def _load_metrics() -> list[dict[str, object]]:
+    """All recorded ticks, oldest first (rotated generation, then current)."""
+    ticks: list[dict[str, object]] = []
+    for path in (_rotated(METRICS_FILE), METRICS_FILE):
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            continue
+        for raw in lines:
+            try:
+                data: object = json.loads(raw)
+            except json.JSONDecodeError:
+                continue  # torn line from a killed run
+            if isinstance(data, dict):
+                ticks.append(cast("dict[str, object]", data))
+    return ticks
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending, non-empty list."""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _path_timings(ticks: list[dict[str, object]]) -> dict[tuple[str, str], list[float]]:
+    """Last ``METRICS_WINDOW`` durations per (kind, label)."""
+    timings: dict[tuple[str, str], list[float]] = {}
+    for tick in ticks:
+        kind = str(tick.get("kind"))
+        paths = tick.get("paths")
+        if not isinstance(paths, list):
+            continue
+        for entry in cast("list[object]", paths):
+            if not isinstance(entry, dict):
+                continue
+            fields = cast("dict[str, object]", entry)
+            seconds = fields.get("seconds")
+            if isinstance(seconds, (int, float)):
+                timings.setdefault((kind, str(fields.get("label"))), []).append(float(seconds))
+    return {key: values[-METRICS_WINDOW:] for key, values in timings.items()}
+
+
+# ---------------------------------------------------------------------------
+# Watch mode
+# ---------------------------------------------------------------------------
+
+
+def _do_watch(options: SyncOptions) -> int:
+    """Push changed runtime paths as filesystem events arrive. Runs until killed."""
+    runtime = _resolve_runtime_root()
+    repo = _repo_root()
+    if runtime is None or repo is None:
+        _log("watch: runtime or repo root unavailable; exiting")
+        return 0
+    runtime.mkdir(parents=True, exist_ok=True)
+
+    # Unsharded: the watcher's roots are fixed at startup, and a project dir
+    # created later must still be covered by the ``.claude/projects`` root.
+    jobs = {job.source: job for job in _build_jobs("push", runtime, repo, shard=False)}
+    # Session transcripts grow by appends, which the polling fallback only
+    # sees if it stats files, not just directories.
+    watcher = make_watcher(
+        jobs, ignore=_is_excluded, poll_interval=WATCH_POLL_SECONDS, poll_files=True
+    )
+    _log(f"watch: {type(watcher).__name__} on {len(jobs)} path(s)")
+
+    pending: dict[str, SyncJob] = {}
+    first_change = last_change = 0.0
+    try:
+        while True:
+            changed = watcher.wait(WATCH_DEBOUNCE_SECONDS if pending else INTERVAL_SECONDS)
+            now = time.monotonic()
+            for root in changed:
+                job = jobs[root]
+                if not pending:
+                    first_change = now
+                pending[job.label] = job
+                last_change = now
+            if not pending:
+                continue
+            quiet = now - last_change >= WATCH_DEBOUNCE_SECONDS
+            overdue = now - first_change >= WATCH_MAX_DELAY_SECONDS
+            if not (quiet or overdue):
+                continue
+            results = _run_jobs("push", list(pending.values()), options)
+            ran = [r for r in results if not r.locked]
+            if ran:
+                ok, msg = _summarize("push", ran, 0, [])
+                _record_result("push", ok, f"watch {msg}", ran)
+            locked = {r.label for r in results if r.locked}
+            if locked:
+                # A pull/push tick holds these paths; keep them and retry
+                # after another debounce window.
+                _log(f"watch: push of {len(locked)} path(s) deferred: lock held")
+                pending = {label: job for label, job in pending.items() if label in locked}
+                last_change = now
+                continue
+            pending.clear()
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()
+
+
 # ---------------------------------------------------------------------------
 # Status
 # ---------------------------------------------------------------------------
@@ -673,10 +1791,54 @@ def _do_status() -> int:
     print(f"  last push ok    : {state.get('last_push_ok') or 'never'}")
     print(f"  pull failures   : {state.get('consecutive_pull_failures', 0)}")
     print(f"  push failures   : {state.get('consecutive_push_failures', 0)}")
+    for kind in ("pull", "push"):
+        failed = state.get(f"last_{kind}_failed_paths")
+        if isinstance(failed, list) and failed:
+            names = ", ".join(str(x) for x in cast("list[object]", failed))
+            print(f"  {kind} failed on  : {names}")
     last_notify = state.get("last_notify_ts")
     if isinstance(last_notify, (int, float)):
         ago = int(_now_epoch() - last_notify)
         print(f"  last notify     : {ago}s ago")
+    shards = state.get("shards")
+    for kind in ("pull", "push"):
+        per_kind = cast("dict[str, object]", shards).get(kind) if isinstance(shards, dict) else None
+        if not isinstance(per_kind, dict):
+            continue
+        records = cast("dict[str, object]", per_kind)
+        failing = sorted(
+            label
+            for label, record in records.items()
+            if isinstance(record, dict) and cast("dict[str, object]", record).get("failures")
+        )
+        line = f"  {kind} shards     : {len(records)} tracked, {len(failing)} failing"
+        current = _valid_round(state, kind)
+        if current is not None:
+            line += f"; round in progress ({len(_round_done(current))} done)"
+        print(line)
+        for label in failing:
+            print(f"    failing: {label}")
+    last_archive = state.get("last_archive_ts")
+    if isinstance(last_archive, (int, float)):
+        print(f"  last archive    : {int(_now_epoch() - last_archive)}s ago")
+    if runtime is not None:
+        months = list_months(_archive_dir(runtime))
+        if months:
+            print(f"  archived months : {months[0]} … {months[-1]} ({len(months)})")
+    timings = _path_timings(_load_metrics())
+    if timings:
+        print()
+        print(f"  path timings (last {METRICS_WINDOW} runs, slowest p95 first):")
+        rows = sorted(
+            ((kind, label, sorted(values)) for (kind, label), values in timings.items()),
+            key=lambda row: _percentile(row[2], 95),
+            reverse=True,
+        )
+        for kind, label, values in rows:
+            print(
+                f"    {kind:<4} {label:<32} p50 {_percentile(values, 50):7.2f}s  "
+                f"p95 {_percentile(values, 95):7.2f}s  (n={len(values)})"
+            )
     if runtime and runtime.is_dir():
         print()
         print_success(f"runtime root present at {runtime}")
@@ -697,7 +1859,53 @@ def _do_status() -> int:
     is_flag=True,
     help="Print state and recent sync results.",
 )
-def cli(action_pull: bool, action_push: bool, action_status: bool) -> None:
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help=f"Max concurrent path syncs (default: SYNC_RUNTIME_CONCURRENCY or {DEFAULT_CONCURRENCY}).",
+)
+@click.option(
+    "--watch",
+    "action_watch",
+    is_flag=True,
+    help="Run continuously, pushing runtime paths as they change.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(SYNC_ENGINES),
+    default=None,
+    help=f"Copy engine (default: SYNC_RUNTIME_ENGINE or {DEFAULT_SYNC_ENGINE}).",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Ignore the change-detection manifest and rsync every path.",
+)
+@click.option(
+    "--archive",
+    "action_archive",
+    is_flag=True,
+    help="Pack old Claude sessions into the bucket's per-month archive now.",
+)
+@click.option(
+    "--restore",
+    "restore_month_",
+    metavar="YYYY-MM",
+    default=None,
+    help="Unpack one archived month into ~/.claude/projects.",
+)
+def cli(
+    action_pull: bool,
+    action_push: bool,
+    action_status: bool,
+    action_watch: bool,
+    jobs: int | None,
+    engine: str | None,
+    force: bool,
+    action_archive: bool,
+    restore_month_: str | None,
+) -> None:
     """Sync runtime state to a per-machine subdir on Google Drive.
 
     With no flags: pull then push (the launchd-driven default). Order
@@ -705,25 +1913,39 @@ def cli(action_pull: bool, action_push: bool, action_status: bool) -> None:
     Drive copy: pull is mtime-based ``--update``, so newer-local files
     are not overwritten.
     """
-    if sum([action_pull, action_push, action_status]) > 1:
-        raise click.UsageError("--pull, --push, and --status are mutually exclusive")
+    actions = [action_pull, action_push, action_status, action_watch, action_archive]
+    if sum(actions) + (restore_month_ is not None) > 1:
+        raise click.UsageError(
+            "--pull, --push, --status, --watch, --archive, and --restore are mutually exclusive"
+        )
 
     if action_status:
         sys.exit(_do_status())
+    if restore_month_ is not None:
+        sys.exit(_do_restore(restore_month_))
+    if action_archive:
+        ok, msg = _do_archive()
+        _log(msg)
+        (print_success if ok else print_error)(msg)
+        sys.exit(0 if ok else 1)
+    options = SyncOptions(
+        concurrency=jobs if jobs is not None else _concurrency(),
+        force=force,
+        engine=engine or _sync_engine(),
+    )
     if action_pull:
-        sys.exit(_run_with_lock("pull", _do_pull))
+        _record_outcome("pull", pull(options))
+        sys.exit(0)
     if action_push:
-        sys.exit(_run_with_lock("push", _do_push))
-
-    # Default: pull then push.
-    with _flock_or_skip() as held:
-        if not held:
-            _log("default sync skipped: lock held")
-            sys.exit(0)
-        pull_ok, pull_msg = _do_pull()
-        _record_result("pull", pull_ok, pull_msg)
-        push_ok, push_msg = _do_push()
-        _record_result("push", push_ok, push_msg)
+        _record_outcome("push", push(options))
+        sys.exit(0)
+    if action_watch:
+        sys.exit(_do_watch(options))
+
+    # Default: pull then push. Each takes its paths' locks as it runs.
+    _record_outcome("pull", pull(options))
+    if _record_outcome("push", push(options)):
+        _maybe_archive()
     sys.exit(0)
 
 
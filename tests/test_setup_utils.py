@@ -0,0 +1,48 @@
+"""Tests for the home-tree symlink walker in ``setup_utils``."""
+
+from __future__ import annotations
+
+import functools
+from pathlib import Path
+
+import pytest
+
+from dotfiles_scripts import setup_utils
+
+
+@pytest.fixture
+def home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A throwaway $HOME; the walker's state cache, backups and journal live under it."""
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setattr(
+        setup_utils,
+        "SymlinkStateCache",
+        functools.partial(setup_utils.SymlinkStateCache, path=tmp_path / "symlink-state.json"),
+    )
+    monkeypatch.setattr(setup_utils, "_backup_dir", None)
+    monkeypatch.setattr(setup_utils, "journal_path", lambda _command: tmp_path / "journal.log")
+    return home
+
+
+def _tree(root: Path, files: dict[str, str]) -> Path:
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return root
+
+
+def test_same_file_in_both_trees_later_tree_wins(home: Path, tmp_path: Path) -> None:
+    public = _tree(tmp_path / "public", {".foo": "public", ".config/app/x": "x"})
+    private = _tree(tmp_path / "private", {".foo": "private", ".config/app/y": "y"})
+
+    assert setup_utils.symlink_home_dirs([public, private]) == [True, True]
+
+    assert (home / ".foo").readlink() == private / ".foo"
+    assert (home / ".config/app/x").readlink() == public / ".config/app/x"
+    assert (home / ".config/app/y").readlink() == private / ".config/app/y"
+    # The public tree's link was backed up, not lost.
+    backups = list(home.glob(".dotfiles.*.bck/.foo"))
+    assert [b.readlink() for b in backups] == [public / ".foo"]